@@ -0,0 +1,124 @@
+"""
+Messages per second through the WebSocket decoding path, before and after the
+fast decoder and typed events.
+
+    python benchmarks/ws_decode_benchmark.py [--frames 20000]
+
+Frames mimic busy market channel traffic: mostly price_change batches, with book
+snapshots, trades and order updates mixed in. Every JSON decoder that is installed
+(json, orjson, msgspec) is measured.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.ws_events import DECODERS, EventDecoder
+
+TOKENS = ["62697312879578878537492465609249634498018844363287127652537828808816942160117",
+          "58869207313910862764544355046372409163802584381615059274538220105674199390869"]
+
+
+def make_frames(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+
+    def level():
+        return {"price": f"{rng.randint(1, 99) / 100:.2f}", "size": f"{rng.uniform(1, 5000):.2f}"}
+
+    frames = [json.dumps([{"event_type": "book", "asset_id": token, "market": "0xabc", "timestamp": "1",
+                           "hash": "0x0", "bids": [level() for _ in range(40)], "asks": [level() for _ in range(40)]}
+                          for token in TOKENS]).encode()]
+    for i in range(count - 1):
+        kind = rng.random()
+        if kind < 0.85:
+            event = {"event_type": "price_change", "market": "0xabc", "timestamp": str(i), "price_changes": [
+                dict(level(), asset_id=rng.choice(TOKENS), side=rng.choice(["BUY", "SELL"]), hash="0x1",
+                     best_bid="0.49", best_ask="0.51") for _ in range(rng.randint(1, 6))]}
+        elif kind < 0.9:
+            event = {"event_type": "book", "asset_id": rng.choice(TOKENS), "market": "0xabc", "timestamp": str(i),
+                     "hash": "0x0", "bids": [level() for _ in range(40)], "asks": [level() for _ in range(40)]}
+        elif kind < 0.95:
+            event = {"event_type": "trade", "id": str(i), "asset_id": TOKENS[0], "side": "BUY", "size": "10",
+                     "price": "0.5", "status": "MATCHED", "taker_order_id": "0x2",
+                     "maker_orders": [{"order_id": f"0x{j}", "matched_amount": "5", "price": "0.5"} for j in range(2)]}
+        else:
+            event = {"event_type": "order", "id": f"0x{i}", "asset_id": TOKENS[0], "type": "UPDATE", "side": "BUY",
+                     "price": "0.5", "original_size": "10", "size_matched": "5"}
+        frames.append(json.dumps([event]).encode())
+    return frames
+
+
+def measure(frames: list, handle, repeat: int = 3) -> float:
+    """Best messages per second over repeat runs."""
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for frame in frames:
+            handle(frame)
+        best = max(best, len(frames) / (time.perf_counter() - started))
+    return best
+
+
+def dict_handler(frame):
+    """Before: json.loads, then every handler looks its fields up in the dicts."""
+    message = json.loads(frame)
+    for msg in message if isinstance(message, list) else [message]:
+        event_type = msg.get("event_type")
+        if event_type == "price_change":
+            for change in msg.get("price_changes", []):
+                change.get("asset_id"), change["side"], change["price"], change["size"]
+        elif event_type == "book":
+            msg.get("asset_id"), msg.get("bids", msg.get("buys")), msg.get("asks", msg.get("sells"))
+        elif event_type == "trade":
+            for maker_order in msg.get("maker_orders", []):
+                maker_order.get("order_id"), float(maker_order.get("matched_amount", 0))
+        elif event_type == "order":
+            msg.get("order_id", msg.get("id")), float(msg.get("matched_amount", msg.get("size_matched", 0)))
+
+
+def typed_handler(decoder):
+    """After: decoded straight into typed events, handlers read attributes."""
+    def handle(frame):
+        for event in decoder(frame):
+            event_type = event.event_type
+            if event_type == "price_change":
+                for change in event.changes:
+                    change.asset_id, change.side, change.price, change.size
+            elif event_type == "book":
+                event.asset_id, event.bids, event.asks
+            elif event_type == "trade":
+                for maker_order in event.maker_orders:
+                    maker_order.order_id, maker_order.matched_amount
+            elif event_type == "order":
+                event.order_id, event.matched_amount
+    return handle
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+    frames = make_frames(args.frames)
+
+    print(f"{len(frames)} frames, best of 3 runs")
+    print(f"{'stage':<20}{'path':<28}{'msgs/s':>12}{'vs before':>11}")
+
+    before = measure(frames, json.loads)
+    print(f"{'decode':<20}{'json.loads (before)':<28}{before:>12,.0f}{1:>10.2f}x")
+    for name in sorted(DECODERS):
+        rate = measure(frames, DECODERS[name])
+        print(f"{'decode':<20}{name:<28}{rate:>12,.0f}{rate / before:>10.2f}x")
+
+    before = measure(frames, dict_handler)
+    print(f"{'decode + dispatch':<20}{'json dicts (before)':<28}{before:>12,.0f}{1:>10.2f}x")
+    for name in sorted(DECODERS):
+        rate = measure(frames, typed_handler(EventDecoder(name)))
+        print(f"{'decode + dispatch':<20}{name + ' typed events':<28}{rate:>12,.0f}{rate / before:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Type, Union
+
+import numpy as np
+import pandas as pd
+
+from src.backtest.trade_dips_backtest import load_market
+from src.data_streamer.storage import TOKENS, MarketData, columnar_directory
+from src.strategy.base_strategy import BaseStrategy
+
+TRADE_FIELDS = ["market", "index", "timestamp", "token_id", "side", "price", "quantity"]
+
+
+def discover_markets(root: str) -> List[str]:
+    """
+    Returns the recorded market folders under root: every <slug>/ holding a
+    <slug>_combined.csv or its columnar equivalent.
+    """
+    markets = []
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        slug = entry.name
+        if (os.path.exists(os.path.join(entry.path, f"{slug}_combined.csv"))
+                or os.path.isdir(columnar_directory(entry.path, slug))):
+            markets.append(entry.path)
+    return markets
+
+
+def market_rows(data: MarketData, token_ids: Sequence[str]) -> Iterator[dict]:
+    """Yields the rows in the layout TradingBot.process_row hands to strategies."""
+    columns = {token: {field: data[f"{token}_{field}"].tolist() for field in ("midpoint", "best_buy", "best_sell")}
+               for token in TOKENS}
+    timestamps = data["timestamp"]
+    for i in range(len(data)):
+        row = {"timestamp": timestamps[i]}
+        for token, token_id in zip(TOKENS, token_ids):
+            row[token_id] = columns[token]["midpoint"][i]
+            row[f"{token_id}_best_buy"] = columns[token]["best_buy"][i]
+            row[f"{token_id}_best_sell"] = columns[token]["best_sell"][i]
+        yield row
+
+
+def replay_market(strategy: BaseStrategy, data: MarketData, token_ids: Sequence[str]):
+    """
+    Feeds a market to a strategy row by row and fills every signal at its price on
+    the same tick (BUY fills are reported back through record_buy, as TradingBot
+    does). Returns (stats, trades); PnL is marked at the best bid.
+    """
+    bids = {token_id: data[f"{token}_best_buy"] for token, token_id in zip(TOKENS, token_ids)}
+    record_buy = getattr(strategy, "record_buy", None)
+    holdings = {token_id: 0.0 for token_id in token_ids}
+    cash_flow = 0.0
+    peak = 0.0
+    drawdown = 0.0
+    pnl = 0.0
+    trades = []
+
+    for i, row in enumerate(market_rows(data, token_ids)):
+        strategy.update_data(row)
+        signal = strategy.generate_signal()
+        if signal:
+            token_id, price, quantity = signal["token_id"], signal["price"], signal["quantity"]
+            if signal["side"] == "SELL":
+                quantity = min(quantity, holdings.get(token_id, 0.0))
+            if price > 0 and quantity > 0:
+                if signal["side"] == "BUY":
+                    holdings[token_id] = holdings.get(token_id, 0.0) + quantity
+                    cash_flow -= quantity * price
+                    if record_buy:
+                        record_buy(price=price, shares=quantity, cash_value=quantity * price)
+                else:
+                    holdings[token_id] -= quantity
+                    cash_flow += quantity * price
+                trades.append({"index": i, "timestamp": str(row["timestamp"]), "token_id": token_id,
+                               "side": signal["side"], "price": price, "quantity": quantity})
+
+        marked = cash_flow + sum(shares * bids[token_id][i] for token_id, shares in holdings.items() if shares)
+        if not np.isnan(marked):
+            pnl = marked
+            peak = max(peak, pnl)
+            drawdown = max(drawdown, peak - pnl)
+
+    stats = {
+        "ticks": len(data),
+        "start": str(data["timestamp"][0]) if len(data) else None,
+        "end": str(data["timestamp"][-1]) if len(data) else None,
+        "trades": len(trades),
+        "buys": sum(t["side"] == "BUY" for t in trades),
+        "sells": sum(t["side"] == "SELL" for t in trades),
+        "pnl": pnl,
+        "max_drawdown": drawdown,
+        "open_shares": sum(holdings.values()),
+    }
+    return stats, trades
+
+
+def run_market(path: str, strategy_class: Type[BaseStrategy], strategy_kwargs: dict) -> dict:
+    """Loads one market, replays a fresh strategy on it and returns its stats and trades."""
+    started = time.perf_counter()
+    slug = os.path.basename(os.path.normpath(path))
+    data = load_market(path)
+    token_ids = [data.token_ids.get(token, token) for token in TOKENS]
+    strategy = strategy_class(token1_id=token_ids[0], token2_id=token_ids[1], **strategy_kwargs)
+    stats, trades = replay_market(strategy, data, token_ids)
+    for trade in trades:
+        trade["market"] = slug
+    return {"market": slug, **stats, "elapsed_ms": (time.perf_counter() - started) * 1000, "trade_list": trades}
+
+
+def _quiet_worker():
+    # Strategies log every tick at INFO
+    logging.disable(logging.INFO)
+
+
+@dataclass
+class PortfolioReport:
+    """Per-market results and the portfolio view built from them."""
+    markets: pd.DataFrame
+    equity: pd.DataFrame
+    summary: Dict[str, object]
+
+    def save(self, folder: str):
+        """Writes markets.csv, equity.csv and summary.json to folder."""
+        os.makedirs(folder, exist_ok=True)
+        self.markets.to_csv(os.path.join(folder, "markets.csv"), index=False)
+        self.equity.to_csv(os.path.join(folder, "equity.csv"), index=False)
+        with open(os.path.join(folder, "summary.json"), "w") as f:
+            json.dump(self.summary, f, indent=2, default=str)
+
+
+def portfolio_report(results: List[dict], elapsed: float = 0.0) -> PortfolioReport:
+    """Merges per-market results; the portfolio equity adds each market's PnL when it ends."""
+    markets = pd.DataFrame(results)
+    if markets.empty:
+        return PortfolioReport(markets, pd.DataFrame(columns=["end", "market", "pnl", "cumulative_pnl"]),
+                               {"markets": 0, "pnl": 0.0})
+    markets = markets.sort_values("pnl", ascending=False, kind="stable").reset_index(drop=True)
+
+    equity = markets[["end", "market", "pnl"]].sort_values(["end", "market"], kind="stable").reset_index(drop=True)
+    equity["cumulative_pnl"] = equity["pnl"].cumsum()
+    running_peak = equity["cumulative_pnl"].cummax().clip(lower=0.0)
+
+    traded = markets[markets["trades"] > 0]
+    summary = {
+        "markets": len(markets),
+        "markets_traded": len(traded),
+        "ticks": int(markets["ticks"].sum()),
+        "trades": int(markets["trades"].sum()),
+        "pnl": float(markets["pnl"].sum()),
+        "mean_pnl_per_traded_market": float(traded["pnl"].mean()) if len(traded) else 0.0,
+        "win_rate": float((traded["pnl"] > 0).mean()) if len(traded) else 0.0,
+        "best_market": markets["market"].iloc[0],
+        "worst_market": markets["market"].iloc[-1],
+        "max_drawdown": float((running_peak - equity["cumulative_pnl"]).max()),
+        "elapsed_seconds": elapsed,
+    }
+    return PortfolioReport(markets, equity, summary)
+
+
+class BatchBacktestRunner:
+    """
+    Runs a strategy over many recorded markets in parallel and merges the results.
+
+    Markets are streamed through a process pool: at most max_in_flight are loaded or
+    running at any time, and each worker returns only its summary and trades (which
+    are written to trades_path straight away), so memory does not grow with the size
+    of the archive.
+    """
+
+    def __init__(
+        self,
+        markets: Union[str, Sequence[str]],
+        strategy_class: Type[BaseStrategy],
+        strategy_kwargs: Optional[dict] = None,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        trades_path: Optional[str] = None
+    ):
+        """
+        Args:
+            markets (str or list): A folder to discover markets in, or market paths.
+            strategy_class (type): BaseStrategy subclass taking token1_id and token2_id keyword arguments.
+            strategy_kwargs (dict, optional): Other constructor arguments of the strategy.
+            max_workers (int, optional): Worker processes. Defaults to the CPU count.
+            max_in_flight (int, optional): Markets submitted at once. Defaults to twice the workers.
+            trades_path (str, optional): CSV file receiving every trade. Defaults to not keeping trades.
+        """
+        self.markets = discover_markets(markets) if isinstance(markets, str) else list(markets)
+        self.strategy_class = strategy_class
+        self.strategy_kwargs = strategy_kwargs or {}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.trades_path = trades_path
+
+    def run(self) -> PortfolioReport:
+        started = time.perf_counter()
+        results = []
+        pending = iter(self.markets)
+        trades_file = open(self.trades_path, "w", newline="") if self.trades_path else None
+        trades_writer = csv.DictWriter(trades_file, fieldnames=TRADE_FIELDS) if trades_file else None
+        if trades_writer:
+            trades_writer.writeheader()
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_quiet_worker) as executor:
+                in_flight = {}
+
+                def submit_next():
+                    path = next(pending, None)
+                    if path is not None:
+                        future = executor.submit(run_market, path, self.strategy_class, self.strategy_kwargs)
+                        in_flight[future] = path
+                    return path is not None
+
+                while len(in_flight) < self.max_in_flight and submit_next():
+                    pass
+                while in_flight:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        path = in_flight.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            logging.error(f"Backtest of {path} failed: {e}")
+                        else:
+                            trades = result.pop("trade_list")
+                            if trades_writer:
+                                trades_writer.writerows(trades)
+                            results.append(result)
+                            logging.info(f"{result['market']}: {result['trades']} trades, PnL {result['pnl']:.4f}")
+                        submit_next()
+        finally:
+            if trades_file:
+                trades_file.close()
+
+        return portfolio_report(results, elapsed=time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    from src.strategy.trade_dips_strategy import TradeDipsStrategy
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    runner = BatchBacktestRunner(
+        os.getcwd(),
+        TradeDipsStrategy,
+        strategy_kwargs=dict(buy_threshold=-0.05, sell_threshold=0.05, initial_cash=4.0, max_trades=4),
+        trades_path="batch_trades.csv"
+    )
+    report = runner.run()
+    report.save("batch_report")
+    print(json.dumps(report.summary, indent=2, default=str))
@@ -0,0 +1,208 @@
+import glob
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from src.backtest.trade_dips_backtest import TradeDipsBacktest, load_market
+
+# The TradeDipsStrategy knobs a sweep can vary
+PARAMETERS = (
+    "buy_threshold",
+    "sell_threshold",
+    "take_profit_pct",
+    "stop_loss_pct",
+    "max_trades",
+    "initial_cash",
+    "order_value",
+)
+
+# Metrics where lower is better; ranked_table puts their smallest values first
+COST_METRICS = ("max_drawdown", "stop_losses")
+
+
+def parameter_grid(**values: Sequence) -> List[dict]:
+    """Every combination of the given values, e.g. parameter_grid(buy_threshold=[-0.02, -0.04], ...)."""
+    unknown = set(values) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+
+def random_parameters(space: Dict[str, object], samples: int, seed: Optional[int] = None) -> List[dict]:
+    """
+    Random parameter sets. A list in space is sampled from, a (low, high) tuple is
+    drawn uniformly (as an int when both bounds are ints).
+    """
+    rng = random.Random(seed)
+    parameter_sets = []
+    for _ in range(samples):
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                params[name] = rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) \
+                    else rng.uniform(low, high)
+            else:
+                params[name] = rng.choice(list(values))
+        parameter_sets.append(params)
+    return parameter_sets
+
+
+def parameter_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def market_set_key(markets: Iterable[str]) -> str:
+    """Short hash identifying a set of market paths, whatever their order."""
+    paths = sorted(os.path.abspath(path) for path in markets)
+    return hashlib.sha1(json.dumps(paths).encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _cached_market(path: str):
+    # Lives in the worker process, so every market is read once per worker
+    return load_market(path)
+
+
+def evaluate(params: dict, markets: Sequence[str]) -> dict:
+    """Backtests one parameter set on every market and aggregates the stats."""
+    backtest = TradeDipsBacktest(**params)
+    stats = [backtest.run(_cached_market(path)).stats for path in markets]
+    pnls = [s["pnl"] for s in stats]
+    return {
+        "params": params,
+        "markets": len(stats),
+        "pnl": sum(pnls),
+        "mean_return_pct": sum(s["return_pct"] for s in stats) / len(stats) if stats else 0.0,
+        "win_rate": sum(pnl > 0 for pnl in pnls) / len(stats) if stats else 0.0,
+        "worst_pnl": min(pnls) if pnls else 0.0,
+        "max_drawdown": max((s["max_drawdown"] for s in stats), default=0.0),
+        "trades": sum(s["trades"] for s in stats),
+        "take_profits": sum(s["take_profits"] for s in stats),
+        "stop_losses": sum(s["stop_losses"] for s in stats),
+    }
+
+
+def ranked_table(results: Iterable[dict], sort_by: str = "pnl") -> pd.DataFrame:
+    """
+    One row per parameter set (parameters then metrics), best sort_by first: highest
+    first, or lowest first for COST_METRICS.
+    """
+    rows = [{**result["params"], **{k: v for k, v in result.items() if k not in ("params", "market_set")}}
+            for result in results]
+    if not rows:
+        return pd.DataFrame()
+    table = pd.DataFrame(rows).sort_values(sort_by, ascending=sort_by in COST_METRICS, kind="stable")
+    return table.reset_index(drop=True)
+
+
+class ParameterSweep:
+    """
+    Evaluates TradeDipsStrategy parameter sets over recorded markets on a process pool.
+
+    Each parameter set is one task; workers keep the markets they loaded, so a market
+    is read at most once per worker whatever the number of parameter sets. Finished
+    results are appended to a JSON lines checkpoint as they arrive, tagged with a hash
+    of the market set, and a new sweep over the same checkpoint skips the parameter
+    sets already evaluated on the same markets.
+    """
+
+    def __init__(
+        self,
+        markets: Sequence[str],
+        parameter_sets: Iterable[dict],
+        checkpoint_path: Optional[str] = None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            markets (list): Market files or folders, see load_market.
+            parameter_sets (iterable): Keyword arguments for TradeDipsBacktest.
+            checkpoint_path (str, optional): JSON lines file with finished results. Defaults to no checkpoint.
+            max_workers (int, optional): Worker processes. Defaults to the CPU count.
+        """
+        self.markets = [os.path.abspath(path) for path in markets]
+        self.market_set = market_set_key(self.markets)
+        self.parameter_sets = list({parameter_key(params): params for params in parameter_sets}.values())
+        self.checkpoint_path = checkpoint_path
+        self.max_workers = max_workers
+
+    def load_checkpoint(self) -> Dict[str, dict]:
+        """Returns the checkpointed results of this sweep's market set by parameter key."""
+        results = {}
+        other_markets = 0
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by an interruption
+                        continue
+                    if result.get("market_set") != self.market_set:
+                        other_markets += 1
+                        continue
+                    results[parameter_key(result["params"])] = result
+        if other_markets:
+            logging.info(f"Sweep: ignoring {other_markets} checkpointed results of another market set")
+        return results
+
+    def run(self, sort_by: str = "pnl") -> pd.DataFrame:
+        """Runs the pending parameter sets and returns the ranked table of all of them."""
+        done = self.load_checkpoint()
+        pending = [params for params in self.parameter_sets if parameter_key(params) not in done]
+        logging.info(f"Sweep: {len(self.parameter_sets)} parameter sets over {len(self.markets)} markets, "
+                     f"{len(self.parameter_sets) - len(pending)} already done")
+
+        checkpoint = open(self.checkpoint_path, "a") if self.checkpoint_path else None
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(evaluate, params, self.markets): params for params in pending}
+                for count, future in enumerate(as_completed(futures), 1):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logging.error(f"Parameter set {futures[future]} failed: {e}")
+                        continue
+                    result["market_set"] = self.market_set
+                    done[parameter_key(result["params"])] = result
+                    if checkpoint:
+                        checkpoint.write(json.dumps(result) + "\n")
+                        checkpoint.flush()
+                    if count % 100 == 0:
+                        logging.info(f"Sweep: {count}/{len(pending)} parameter sets evaluated")
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+        wanted = {parameter_key(params) for params in self.parameter_sets}
+        return ranked_table((result for key, result in done.items() if key in wanted), sort_by=sort_by)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    # Every recorded market folder in the working directory
+    markets = sorted(glob.glob(os.path.join(os.getcwd(), "*", "*_combined.csv")))
+    parameter_sets = parameter_grid(
+        buy_threshold=[-0.02, -0.03, -0.05, -0.08],
+        sell_threshold=[0.02, 0.03, 0.05, 0.08],
+        take_profit_pct=[0.1, 0.25, 0.5],
+        stop_loss_pct=[0.1, 0.25],
+        max_trades=[2, 4, 5],
+        initial_cash=[4.0, 10.0],
+    )
+
+    sweep = ParameterSweep(markets, parameter_sets, checkpoint_path="sweep_checkpoint.jsonl")
+    table = sweep.run(sort_by="pnl")
+    table.to_csv("sweep_results.csv", index=False)
+    print(table.head(20).to_string())
@@ -0,0 +1,279 @@
+import itertools
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.data_streamer.storage import SCALAR_COLUMNS, TOKENS, MarketData, read_market_data
+from src.execution.order_tracker import OrderStatus
+
+EPSILON = 1e-9
+
+
+def _to_datetime(timestamp) -> datetime:
+    if isinstance(timestamp, np.datetime64):
+        return timestamp.astype("datetime64[us]").item()
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp)
+    return timestamp
+
+
+class _Resting:
+    """Matching state of one simulated order."""
+    __slots__ = ("order", "token", "placed_at", "market", "on_book", "queue_ahead", "level_size")
+
+    def __init__(self, order: OrderStatus, token: str, placed_at: datetime, market: bool = False):
+        self.order = order
+        self.token = token
+        self.placed_at = placed_at
+        self.market = market
+        self.on_book = False
+        self.queue_ahead = 0.0
+        self.level_size = 0.0
+
+
+class SimulatedExchange:
+    """
+    Stands in for OrderExecutor and OrderTracker during a replay.
+
+    execute_signal, track_order, cancel_order, callback and active_orders behave like
+    their live counterparts, so TradingBot runs unchanged against recorded
+    books. Limit orders reach the book one tick after they are sent and are then
+    matched against the recorded depth of every following tick:
+
+    - the part that crosses the opposite side is filled against its levels;
+    - a resting order starts behind the size already shown at its price, and size
+      leaving that level is taken from the front of the queue (our fill once the
+      queue ahead is gone);
+    - if the whole level is consumed and the market trades below (BUY) or above
+      (SELL) it, the order is filled.
+
+    As with OrderTracker, the callback fires once an order is completely filled and
+    orders older than timeout_minutes are cancelled without a callback. Market
+    orders are fill-or-kill against the book at the next tick.
+    """
+
+    def __init__(self, data: MarketData, token_ids: Optional[List[str]] = None, callback: Callable = None):
+        self.data = data
+        token_ids = token_ids or [data.token_ids.get(token, token) for token in TOKENS]
+        self.tokens = dict(zip(token_ids, TOKENS))
+        self.callback = callback
+        # Like OrderExecutor(presign_orders=False): orders are never signed here
+        self.presigned = None
+        self.active_orders: Dict[str, OrderStatus] = {}
+        self.fills: List[dict] = []
+        self.cancelled: List[OrderStatus] = []
+        # The subset of cancelled orders that ran past their timeout
+        self.timed_out: List[OrderStatus] = []
+        self.index = -1
+        self.now: Optional[datetime] = None
+        self._resting: Dict[str, _Resting] = {}
+        self._ids = itertools.count(1)
+
+    def attach(self, bot):
+        """Makes a TradingBot (executor, order_tracker, handle_order_filled) trade here."""
+        bot.executor = self
+        bot.order_tracker = self
+        self.callback = bot.handle_order_filled
+
+    # --- OrderExecutor interface ---
+    async def execute_signal(self, signal: dict) -> Optional[dict]:
+        token_id = signal.get("token_id")
+        if token_id not in self.tokens or signal.get("order_type") not in ("limit", "market"):
+            logging.error(f"Cannot simulate signal {signal}")
+            return None
+        order_id = f"sim-{next(self._ids)}"
+        order = OrderStatus(
+            order_id=order_id,
+            token_id=token_id,
+            side=signal["side"],
+            quantity=float(signal["quantity"]),
+            price=float(signal.get("price") or 0.0),
+            status="live",
+            timestamp=self.now,
+        )
+        self.active_orders[order_id] = order
+        self._resting[order_id] = _Resting(order, self.tokens[token_id], self.now,
+                                           market=signal["order_type"] == "market")
+        return {"orderId": order_id, "status": "live", "success": True}
+
+    async def cancel_order(self, order_id: str):
+        return self._cancel(order_id)
+
+    async def cancel_orders(self, order_ids: List[str]):
+        canceled = [order_id for order_id in order_ids if self._cancel(order_id)["canceled"]]
+        return {"canceled": canceled, "not_canceled": {}}
+
+    def _cancel(self, order_id: str):
+        order = self.active_orders.pop(order_id, None)
+        self._resting.pop(order_id, None)
+        if order is not None:
+            order.status = "cancelled"
+            self.cancelled.append(order)
+        return {"canceled": [order_id] if order else []}
+
+    # --- OrderTracker interface ---
+    async def track_order(self, order_id: str, token_id: str, side: str, quantity: float, price: float,
+                          timeout_minutes: int = 30):
+        order = self.active_orders.get(order_id)
+        if order is not None:
+            order.timeout_minutes = timeout_minutes
+
+    def get_order_status(self, order_id: str) -> Optional[OrderStatus]:
+        return self.active_orders.get(order_id)
+
+    def get_active_orders(self) -> List[OrderStatus]:
+        return list(self.active_orders.values())
+
+    # --- Matching ---
+    def _fill(self, resting: _Resting, quantity: float, price: float, kind: str):
+        order = resting.order
+        quantity = min(quantity, order.quantity - order.filled_quantity)
+        if quantity <= EPSILON:
+            return
+        order.filled_quantity += quantity
+        order.status = "matched"
+        self.fills.append({
+            "order_id": order.order_id,
+            "index": self.index,
+            "timestamp": self.now,
+            "token_id": order.token_id,
+            "side": order.side,
+            "price": price,
+            "quantity": quantity,
+            "kind": kind,
+        })
+
+    def _take(self, resting: _Resting, prices: np.ndarray, sizes: np.ndarray, limit_price: float, kind: str,
+              at_limit: bool):
+        """Fills against opposite levels priced at or better than limit_price (best first)."""
+        for price, size in zip(prices.tolist(), sizes.tolist()):
+            remaining = resting.order.quantity - resting.order.filled_quantity
+            if remaining <= EPSILON:
+                break
+            if resting.order.side == "BUY" and price > limit_price + EPSILON:
+                break
+            if resting.order.side == "SELL" and price < limit_price - EPSILON:
+                break
+            self._fill(resting, size, limit_price if at_limit else price, kind)
+
+    def _match(self, resting: _Resting):
+        order = resting.order
+        book = self.data.book(resting.token, self.index)
+        if order.side == "BUY":
+            same_prices, same_sizes = book.bid_prices, book.bid_sizes
+            opposite_prices, opposite_sizes = book.ask_prices, book.ask_sizes
+        else:
+            same_prices, same_sizes = book.ask_prices, book.ask_sizes
+            opposite_prices, opposite_sizes = book.bid_prices, book.bid_sizes
+
+        if resting.market:
+            # Fill-or-kill against the visible depth
+            limit = np.inf if order.side == "BUY" else -np.inf
+            available = opposite_sizes.sum()
+            if available + EPSILON >= order.quantity:
+                self._take(resting, opposite_prices, opposite_sizes, limit, "market", at_limit=False)
+            return
+
+        at_level = np.abs(same_prices - order.price) < EPSILON
+        level_size = float(same_sizes[at_level].sum())
+
+        if not resting.on_book:
+            # Arrives at the book: marketable part takes liquidity at the level prices
+            self._take(resting, opposite_prices, opposite_sizes, order.price, "taker", at_limit=False)
+            resting.on_book = True
+            resting.queue_ahead = level_size
+            resting.level_size = level_size
+            return
+
+        # Opposite side moved onto our price: we are the maker
+        self._take(resting, opposite_prices, opposite_sizes, order.price, "cross", at_limit=True)
+
+        best_same = float(same_prices[0]) if len(same_prices) else None
+        if order.side == "BUY":
+            traded_through = best_same is not None and best_same < order.price - EPSILON
+        else:
+            traded_through = best_same is not None and best_same > order.price + EPSILON
+
+        if resting.level_size > 0 and level_size == 0 and traded_through:
+            self._fill(resting, order.quantity, order.price, "through")
+        else:
+            drop = resting.level_size - level_size
+            if drop > 0:
+                resting.queue_ahead -= drop
+                if resting.queue_ahead < 0:
+                    self._fill(resting, -resting.queue_ahead, order.price, "queue")
+                    resting.queue_ahead = 0.0
+        resting.level_size = level_size
+
+    async def advance(self, index: int):
+        """Moves the clock to tick index, matching, completing and timing out orders."""
+        self.index = index
+        self.now = _to_datetime(self.data["timestamp"][index])
+        for order_id, resting in list(self._resting.items()):
+            order = resting.order
+            if resting.placed_at is not None and self.now - resting.placed_at > timedelta(minutes=order.timeout_minutes):
+                logging.info(f"Order {order_id} timed out after {order.timeout_minutes} minutes")
+                self._cancel(order_id)
+                self.timed_out.append(order)
+                continue
+
+            self._match(resting)
+            if order.filled_quantity >= order.quantity - EPSILON:
+                order.status = "filled"
+                del self.active_orders[order_id]
+                del self._resting[order_id]
+                if self.callback:
+                    await self.callback(order)
+            elif resting.market:
+                # Not enough depth for a fill-or-kill order
+                self._cancel(order_id)
+
+
+class ReplayEngine:
+    """
+    Steps through recorded book snapshots, feeding every tick to a row handler and
+    the resulting orders to a SimulatedExchange.
+
+    The handler gets the rows TradingBot.process_csv reads from the CSV (timestamp and
+    the scalar columns), so a TradingBot attached to the exchange with
+    SimulatedExchange.attach can be replayed with run(bot.process_row).
+    """
+
+    def __init__(self, data: Union[MarketData, str], token_ids: Optional[List[str]] = None):
+        """
+        Args:
+            data (MarketData or str): Market data with books, or a path accepted by read_market_data.
+            token_ids (list, optional): Ids of token1 and token2; defaults to the recorded ids.
+        """
+        self.data = read_market_data(data) if isinstance(data, str) else data
+        self.exchange = SimulatedExchange(self.data, token_ids)
+
+    def rows(self):
+        columns = {name: self.data[name].tolist() for name in SCALAR_COLUMNS}
+        timestamps = self.data["timestamp"]
+        for i in range(len(self.data)):
+            row = {"timestamp": str(timestamps[i])}
+            for name in SCALAR_COLUMNS:
+                row[name] = columns[name][i]
+            yield row
+
+    async def run(self, on_row: Callable[[dict], Awaitable]) -> dict:
+        """Replays every tick and returns summary stats of the simulated orders."""
+        started = time.perf_counter()
+        exchange = self.exchange
+        for i, row in enumerate(self.rows()):
+            await exchange.advance(i)
+            await on_row(row)
+        return {
+            "ticks": len(self.data),
+            "fills": len(exchange.fills),
+            "filled_quantity": sum(fill["quantity"] for fill in exchange.fills),
+            "cancelled": len(exchange.cancelled),
+            "timed_out": len(exchange.timed_out),
+            "open_orders": len(exchange.active_orders),
+            "elapsed_ms": (time.perf_counter() - started) * 1000,
+        }
+
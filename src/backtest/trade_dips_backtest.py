@@ -0,0 +1,284 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from src.data_streamer.storage import TOKENS, MarketData, read_market_data
+
+
+@dataclass
+class BacktestResult:
+    """Trades, equity per tick (cash plus holdings at the best bid) and summary stats of one run."""
+    trades: List[dict]
+    timestamps: np.ndarray
+    equity: np.ndarray
+    stats: Dict[str, float]
+
+
+def load_market(path: str) -> MarketData:
+    """Loads the scalar columns of a recorded market (CSV, columnar or market folder) once."""
+    return read_market_data(path, parse_books=False)
+
+
+def one_step_returns(prices: np.ndarray) -> np.ndarray:
+    """
+    Vectorized TradeDipsStrategy.compute_returns: prices[i] / prices[i - 1] - 1,
+    with NaN (first tick, missing prices, 0/0) read as 0.
+    """
+    returns = np.zeros(len(prices), dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = prices[1:] / prices[:-1] - 1
+    returns[np.isnan(returns)] = 0.0
+    return returns
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """Largest peak-to-trough drop of the equity curve as a fraction of the peak."""
+    if not len(equity):
+        return 0.0
+    # Carry the last known value over ticks with missing prices
+    index = np.where(np.isnan(equity), 0, np.arange(len(equity)))
+    np.maximum.accumulate(index, out=index)
+    filled = equity[index]
+    peaks = np.fmax.accumulate(filled)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdowns = (peaks - filled) / peaks
+    return float(np.nanmax(drawdowns)) if np.any(~np.isnan(drawdowns)) else 0.0
+
+
+class TradeDipsBacktest:
+    """
+    Replays TradeDipsStrategy over a whole recorded market at once.
+
+    Returns and threshold crossings are computed for all ticks with NumPy. The
+    strategy state (selected team, cash, open positions) only changes on ticks where
+    a crossing happens or where take-profit / stop-loss triggers, so the replay jumps
+    from one such tick to the next: entries and exits come from the crossing index
+    arrays and the take-profit / stop-loss tick of a holding period is found with one
+    array comparison over its best bids.
+
+    Orders are assumed to fill at their limit price on the tick they are generated,
+    which is what calling record_buy right after every BUY signal does with the
+    strategy itself; decisions match TradeDipsStrategy under that assumption.
+    """
+
+    def __init__(
+        self,
+        buy_threshold: float,
+        sell_threshold: float,
+        initial_cash: float = 10.0,
+        take_profit_pct: float = 0.5,
+        stop_loss_pct: float = 0.25,
+        max_trades: int = 5,
+        order_value: Optional[float] = None,
+        min_order_value: float = 1.0
+    ):
+        """
+        Args:
+            buy_threshold (float): Buy when the one-tick best_buy return is below this.
+            sell_threshold (float): Sell the cheapest position when the return is above this.
+            initial_cash (float, optional): Starting cash. Defaults to 10.0.
+            take_profit_pct (float, optional): Exit everything at this PnL fraction of initial_cash. Defaults to 0.5.
+            stop_loss_pct (float, optional): Exit everything at this loss fraction of initial_cash. Defaults to 0.25.
+            max_trades (int, optional): Sets the order value to initial_cash / max_trades. Defaults to 5.
+            order_value (float, optional): Cash per buy; overrides the max_trades split when given.
+            min_order_value (float, optional): Polymarket minimum order value. Defaults to 1.0.
+        """
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+        self.initial_cash = initial_cash
+        self.take_profit_pct = take_profit_pct
+        self.stop_loss_pct = stop_loss_pct
+        self.max_trades = max_trades
+        self.order_value = order_value if order_value is not None else initial_cash / max_trades
+        self.min_order_value = min_order_value
+
+    def _size(self, price: float, cash: float):
+        """Same sizing as TradeDipsStrategy.calculate_shares_for_value."""
+        target_value = min(self.order_value, cash)
+        if target_value < self.min_order_value or not price > 0:
+            return 0.0, 0.0
+        shares = target_value / price
+        return shares, shares * price
+
+    def _first_exit(self, bids: np.ndarray, positions: list, cash: float):
+        """
+        Returns (offset, reason) of the first tick in bids where take-profit or
+        stop-loss triggers for the given holdings, or None.
+        """
+        position_value = 0.0
+        for _, shares, _ in positions:
+            position_value = position_value + shares * bids
+        pnl = position_value + cash - self.initial_cash
+        take_profit = pnl >= self.take_profit_pct * self.initial_cash
+        stop_loss = pnl <= -self.stop_loss_pct * self.initial_cash
+        hits = take_profit | stop_loss
+        offset = int(np.argmax(hits))
+        if not hits[offset]:
+            return None
+        return offset, "take_profit" if take_profit[offset] else "stop_loss"
+
+    def run(self, data: Union[MarketData, str], token_ids: Optional[List[str]] = None) -> BacktestResult:
+        """
+        Backtests one market.
+
+        Args:
+            data (MarketData or str): Loaded market data, or a path accepted by load_market.
+            token_ids (list, optional): Ids reported in the trades; defaults to the
+                recorded ids, or "token1" / "token2".
+        """
+        started = time.perf_counter()
+        if isinstance(data, str):
+            data = load_market(data)
+        n = len(data)
+        if token_ids is None:
+            token_ids = [data.token_ids.get(token, token) for token in TOKENS]
+        timestamps = data["timestamp"]
+        bids = [data[f"{token}_best_buy"] for token in TOKENS]
+        asks = [data[f"{token}_best_sell"] for token in TOKENS]
+
+        returns = [one_step_returns(prices) for prices in bids]
+        buys = [r < self.buy_threshold for r in returns]
+        sells = [r > self.sell_threshold for r in returns]
+        # The strategy needs two rows before it produces anything
+        for crossings in buys + sells:
+            crossings[:1] = False
+        entry_rows = np.flatnonzero(buys[0] | buys[1])
+        event_rows = [np.flatnonzero(buys[s] | sells[s]) for s in range(2)]
+
+        cash = self.initial_cash
+        positions = []  # (price, shares, cash_value), as in TradeDipsStrategy.buy_positions
+        selected = None
+        trades = []
+        # Strategy state after every tick that changed it, for the equity curve
+        state_rows, state_cash, state_shares, state_team = [], [], [], []
+
+        def trade(row, side, price, quantity, reason):
+            trades.append({
+                "index": int(row),
+                "timestamp": timestamps[row],
+                "token_id": token_ids[selected],
+                "side": side,
+                "price": float(price),
+                "quantity": float(quantity),
+                "reason": reason,
+            })
+
+        def sell_all(row, reason):
+            nonlocal cash
+            price = bids[selected][row]
+            total_shares = sum(shares for _, shares, _ in positions)
+            trade(row, "SELL", price, total_shares, reason)
+            cash += total_shares * price
+            positions.clear()
+
+        def save_state(row):
+            state_rows.append(row)
+            state_cash.append(cash)
+            state_shares.append(sum(shares for _, shares, _ in positions))
+            state_team.append(-1 if selected is None else selected)
+
+        row = 1
+        while row < n:
+            if selected is None:
+                # Waiting for the first dip of either team
+                k = np.searchsorted(entry_rows, row)
+                if k == len(entry_rows) or cash < self.min_order_value:
+                    break
+                row = int(entry_rows[k])
+                team = 0 if buys[0][row] else 1
+                price = asks[team][row]
+                shares, value = self._size(price, cash)
+                if shares > 0:
+                    selected = team
+                    trade(row, "BUY", price, shares, "dip")
+                    if cash >= value:
+                        positions.append((price, shares, value))
+                        cash -= value
+                save_state(row)
+                row += 1
+                continue
+
+            rows = event_rows[selected]
+            k = np.searchsorted(rows, row)
+            next_event = int(rows[k]) if k < len(rows) else n
+
+            # Take-profit / stop-loss between crossings, while holdings are constant
+            if positions and next_event > row:
+                hit = self._first_exit(bids[selected][row:next_event], positions, cash)
+                if hit is not None:
+                    offset, reason = hit
+                    row += offset
+                    sell_all(row, reason)
+                    save_state(row)
+                    row += 1
+                    continue
+            if next_event >= n:
+                break
+
+            row = next_event
+            bid, ask = bids[selected][row], asks[selected][row]
+            pending_buy = None
+            if buys[selected][row] and cash >= self.min_order_value:
+                shares, value = self._size(ask, cash)
+                if shares > 0:
+                    pending_buy = (ask, shares, value)
+            elif sells[selected][row] and positions:
+                lowest_buy = min(positions, key=lambda x: x[0])
+                positions.remove(lowest_buy)
+                _, shares, _ = lowest_buy
+                trade(row, "SELL", bid, shares, "rise")
+                cash += shares * bid
+
+            hit = self._first_exit(np.array([bid]), positions, cash) if positions else None
+            if hit is not None:
+                # Replaces the BUY signal of this tick, as in the strategy
+                sell_all(row, hit[1])
+            elif pending_buy is not None:
+                price, shares, value = pending_buy
+                trade(row, "BUY", price, shares, "dip")
+                if cash >= value:
+                    positions.append(pending_buy)
+                    cash -= value
+            save_state(row)
+            row += 1
+
+        equity = self._equity_curve(n, bids, state_rows, state_cash, state_shares, state_team)
+        final_equity = float(equity[-1]) if n else self.initial_cash
+        stats = {
+            "ticks": n,
+            "trades": len(trades),
+            "buys": sum(t["side"] == "BUY" for t in trades),
+            "sells": sum(t["side"] == "SELL" for t in trades),
+            "take_profits": sum(t["reason"] == "take_profit" for t in trades),
+            "stop_losses": sum(t["reason"] == "stop_loss" for t in trades),
+            "initial_cash": self.initial_cash,
+            "final_cash": float(cash),
+            "final_equity": final_equity,
+            "pnl": final_equity - self.initial_cash,
+            "return_pct": (final_equity - self.initial_cash) / self.initial_cash * 100,
+            "max_drawdown": max_drawdown(equity),
+            "open_shares": float(sum(shares for _, shares, _ in positions)),
+            "elapsed_ms": (time.perf_counter() - started) * 1000,
+        }
+        return BacktestResult(trades=trades, timestamps=timestamps, equity=equity, stats=stats)
+
+    def _equity_curve(self, n, bids, state_rows, state_cash, state_shares, state_team) -> np.ndarray:
+        if not state_rows:
+            return np.full(n, self.initial_cash, dtype=np.float64)
+        # State in force at every tick: the last change at or before it
+        index = np.searchsorted(np.array(state_rows), np.arange(n), side="right") - 1
+        before_first = index < 0
+        index[before_first] = 0
+        cash = np.array(state_cash)[index]
+        shares = np.array(state_shares)[index]
+        team = np.array(state_team)[index]
+        cash[before_first] = self.initial_cash
+        shares[before_first] = 0.0
+
+        marks = np.where(team == 1, bids[1], bids[0])
+        holdings = np.zeros(n, dtype=np.float64)
+        held = shares > 0
+        holdings[held] = shares[held] * marks[held]
+        return cash + holdings
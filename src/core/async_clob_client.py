@@ -0,0 +1,239 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import httpx
+from py_clob_client.client import ClobClient
+from py_clob_client.clob_types import MarketOrderArgs, OrderArgs, OrderType, RequestArgs
+from py_clob_client.constants import END_CURSOR
+from py_clob_client.endpoints import (
+    CANCEL,
+    CANCEL_ALL,
+    CANCEL_ORDERS,
+    GET_ORDER,
+    ORDERS,
+    POST_ORDER,
+    POST_ORDERS,
+    TRADES,
+)
+from py_clob_client.headers.headers import create_level_2_headers
+from py_clob_client.utilities import order_to_json
+
+# Same fixed headers py_clob_client sends with every request
+DEFAULT_HEADERS = {
+    "User-Agent": "py_clob_client",
+    "Accept": "*/*",
+    "Connection": "keep-alive",
+    "Content-Type": "application/json",
+}
+
+# Exchange limits on the batch endpoints
+MAX_ORDERS_PER_POST = 15
+MAX_CANCELS_PER_REQUEST = 3000
+
+
+def chunked(items: list, size: int) -> List[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def merge_post_responses(signed_orders: list, responses: list) -> list:
+    """
+    Flattens the responses of chunked posts into one response per order, in order.
+    Orders of chunks whose request failed or got a response of another length get None.
+    """
+    results = []
+    for chunk, response in zip(chunked(signed_orders, MAX_ORDERS_PER_POST), responses):
+        if not isinstance(response, list) or len(response) != len(chunk):
+            print(f"Unexpected response to a batch of {len(chunk)} orders: {response}")
+            response = [None] * len(chunk)
+        results.extend(response)
+    return results
+
+
+def merge_cancel_responses(order_ids: List[str], responses: list) -> dict:
+    """
+    Merges the responses of chunked cancels into one {"canceled", "not_canceled"} result.
+    Ids of chunks whose request failed (response None) are reported as not cancelled.
+    """
+    merged = {"canceled": [], "not_canceled": {}}
+    for ids, response in zip(chunked(order_ids, MAX_CANCELS_PER_REQUEST), responses):
+        if not isinstance(response, dict):
+            merged["not_canceled"].update({order_id: "request failed" for order_id in ids})
+            continue
+        merged["canceled"].extend(response.get("canceled") or [])
+        merged["not_canceled"].update(response.get("not_canceled") or {})
+    return merged
+
+
+class AsyncPolymarketClient:
+    """
+    Asyncio order entry on top of an authenticated ClobClient.
+
+    Signing an order (EIP-712, plus the tick size / neg risk lookups the ClobClient
+    caches) runs in a small thread pool, and the signed order is posted through one
+    pooled httpx.AsyncClient with the same Level 2 headers ClobClient.post_order
+    builds: the body is serialized once and those exact bytes are both HMAC-signed
+    and sent. Any number of orders can be in flight without blocking the event loop.
+    Use it as an async context manager or call close().
+    """
+
+    def __init__(self, clob_client: ClobClient, max_connections: int = 20, signing_workers: int = 4,
+                 timeout: float = 10.0, http2: bool = True, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Args:
+            clob_client (ClobClient): Client with a signer and API credentials (Level 2).
+            max_connections (int, optional): Size of the HTTP connection pool. Defaults to 20.
+            signing_workers (int, optional): Threads used for signing. Defaults to 4.
+            timeout (float, optional): Request timeout in seconds. Defaults to 10.
+            http2 (bool, optional): Multiplex requests over HTTP/2 like py_clob_client. Defaults to True.
+            transport (httpx.AsyncBaseTransport, optional): Custom transport, e.g. for tests.
+        """
+        self.clob = clob_client
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.http2 = http2
+        self.transport = transport
+        self.signing_pool = ThreadPoolExecutor(max_workers=signing_workers, thread_name_prefix="order-signing")
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.clob.host,
+                headers=DEFAULT_HEADERS,
+                timeout=self.timeout,
+                http2=self.http2 and self.transport is None,
+                transport=self.transport,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.signing_pool.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _sign(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.signing_pool, fn, *args)
+
+    async def request(self, method: str, path: str, body=None, params: Optional[dict] = None):
+        """
+        Sends a Level 2 authenticated request and returns the decoded JSON, or None on error.
+        The signature covers the path without the query string, as in py_clob_client.
+        """
+        serialized = None if body is None else json.dumps(body, separators=(",", ":"), ensure_ascii=False)
+        headers = create_level_2_headers(
+            self.clob.signer, self.clob.creds,
+            RequestArgs(method=method, request_path=path, body=body, serialized_body=serialized),
+        )
+        try:
+            response = await self.client.request(
+                method, path, headers=headers, params=params,
+                content=None if serialized is None else serialized.encode("utf-8"),
+            )
+        except httpx.HTTPError as e:
+            print(f"Error sending {method} {path}: {e}")
+            return None
+        if response.status_code != 200:
+            print(f"Error response to {method} {path}: {response.status_code} {response.text}")
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return response.text
+
+    async def create_order(self, order_args: OrderArgs):
+        try:
+            return await self._sign(self.clob.create_order, order_args)
+        except Exception as e:
+            print(f"Error creating order for {order_args.token_id}: {e}")
+            return None
+
+    async def create_market_order(self, order_args: MarketOrderArgs):
+        try:
+            return await self._sign(self.clob.create_market_order, order_args)
+        except Exception as e:
+            print(f"Error creating market order for {order_args.token_id}: {e}")
+            return None
+
+    async def post_order(self, signed_order, order_type: OrderType = OrderType.GTC, post_only: bool = False):
+        body = order_to_json(signed_order, self.clob.creds.api_key, order_type, post_only)
+        return await self.request("POST", POST_ORDER, body)
+
+    async def create_and_post_order(self, order_args: OrderArgs, order_type: OrderType = OrderType.GTC):
+        signed_order = await self.create_order(order_args)
+        if signed_order is None:
+            return None
+        return await self.post_order(signed_order, order_type)
+
+    async def post_orders(self, signed_orders: list, order_type: OrderType = OrderType.GTC,
+                          post_only: bool = False) -> list:
+        """
+        Posts signed orders in batches of MAX_ORDERS_PER_POST, all batches concurrently.
+
+        Returns:
+            list: One response per order, in the order given; None for orders whose
+                batch request failed.
+        """
+        signed_orders = list(signed_orders)
+        responses = await asyncio.gather(*(
+            self.request("POST", POST_ORDERS,
+                         [order_to_json(order, self.clob.creds.api_key, order_type, post_only) for order in chunk])
+            for chunk in chunked(signed_orders, MAX_ORDERS_PER_POST)
+        ))
+        return merge_post_responses(signed_orders, responses)
+
+    async def cancel_orders(self, order_ids: List[str]) -> dict:
+        """
+        Cancels orders in batches of MAX_CANCELS_PER_REQUEST, all batches concurrently.
+
+        Returns:
+            dict: {"canceled": [ids], "not_canceled": {id: reason}} over all batches.
+        """
+        order_ids = list(order_ids)
+        responses = await asyncio.gather(*(
+            self.request("DELETE", CANCEL_ORDERS, chunk) for chunk in chunked(order_ids, MAX_CANCELS_PER_REQUEST)
+        ))
+        return merge_cancel_responses(order_ids, responses)
+
+    async def cancel_order(self, order_id: str):
+        return await self.request("DELETE", CANCEL, {"orderID": order_id})
+
+    async def cancel_all_orders(self):
+        return await self.request("DELETE", CANCEL_ALL)
+
+    async def _get_pages(self, path: str, params: dict) -> Optional[list]:
+        """Follows next_cursor through a paginated endpoint; None if any page failed."""
+        results = []
+        next_cursor = "MA=="
+        while next_cursor != END_CURSOR:
+            page = await self.request("GET", path, params=dict(params, next_cursor=next_cursor))
+            if not isinstance(page, dict):
+                return None
+            results.extend(page.get("data") or [])
+            next_cursor = page.get("next_cursor") or END_CURSOR
+        return results
+
+    async def get_orders(self, market: str = None, asset_id: str = None) -> Optional[list]:
+        """All open orders of the API key (all pages), or None on error."""
+        params = {key: value for key, value in (("market", market), ("asset_id", asset_id)) if value}
+        return await self._get_pages(ORDERS, params)
+
+    async def get_trades(self, market: str = None, asset_id: str = None, after: int = None) -> Optional[list]:
+        """Trades of the user (all pages), optionally only those after a unix time, or None on error."""
+        params = {key: value for key, value in (("market", market), ("asset_id", asset_id), ("after", after))
+                  if value}
+        return await self._get_pages(TRADES, params)
+
+    async def get_order(self, order_id: str):
+        return await self.request("GET", f"{GET_ORDER}{order_id}")
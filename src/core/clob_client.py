@@ -1,4 +1,6 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from py_clob_client.constants import POLYGON
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import (
@@ -8,7 +10,8 @@ from py_clob_client.clob_types import (
     ApiCreds,
     OrderArgs,
     MarketOrderArgs,
-    OrderType
+    OrderType,
+    PostOrdersArgs
 )
 from py_clob_client.order_builder.constants import BUY, SELL
 
@@ -23,10 +26,20 @@ from config import (
     POLYMARKET_API_PASSPHRASE
 )
 
+from core.async_clob_client import (
+    MAX_CANCELS_PER_REQUEST,
+    MAX_ORDERS_PER_POST,
+    chunked,
+    merge_cancel_responses,
+    merge_post_responses
+)
+from core.market_catalog import MarketCatalog, market_token_ids
+from core.market_snapshot import MarketSnapshot
+
 import logging
 
 class PolymarketClient:
-    def __init__(self, base_url=POLYMARKET_HOST):
+    def __init__(self, base_url=POLYMARKET_HOST, catalog: Optional[MarketCatalog] = None):
         if not all([POLYMARKET_HOST, POLYMARKET_KEY, POLYMARKET_FUNDER]):
             print("Missing required environment variables: POLYMARKET_HOST, POLYMARKET_KEY, POLYMARKET_FUNDER")
             raise ValueError("Missing required environment variables")
@@ -61,6 +74,8 @@ class PolymarketClient:
                 api_passphrase=creds.api_passphrase,
             )
         )
+        # Optional local market catalog; market lookups use its indexes instead of downloading
+        self.catalog = catalog
         print(f"PolymarketClient initialized with address: {self.client.get_address()}")
 
     # Data retrieval methods…
@@ -71,6 +86,30 @@ class PolymarketClient:
             print(f"Error getting order book for {token_id}: {e}")
             return None
 
+    def get_order_books(self, token_ids: List[str]) -> list:
+        """
+        Fetch the order books of several tokens in one request.
+        """
+        try:
+            return self.client.get_order_books([BookParams(token_id=token_id) for token_id in token_ids])
+        except Exception as e:
+            print(f"Error getting order books for {len(token_ids)} tokens: {e}")
+            return []
+
+    def get_market_snapshot(self, token_id: str) -> Optional[MarketSnapshot]:
+        """
+        Fetch the order book once and derive midpoint, best buy/sell and spread from it.
+        Replaces separate get_midpoint_price, get_price and get_spread round-trips.
+        """
+        book = self.get_order_book(token_id)
+        if book is None:
+            return None
+        try:
+            return MarketSnapshot.from_order_book(book, token_id)
+        except Exception as e:
+            print(f"Error parsing order book for {token_id}: {e}")
+            return None
+
     def get_midpoint_price(self, token_id: str) -> float:
         try:
             midpoint = self.client.get_midpoint(token_id)
@@ -153,6 +192,48 @@ class PolymarketClient:
             print(f"Error creating market order for {order_args.token_id}: {e}")
             return None
 
+    def post_orders(self, signed_orders: list, orderType=OrderType.GTC) -> list:
+        """
+        Post signed orders in batches of MAX_ORDERS_PER_POST, sending the batches in parallel.
+        Batching and the merged result are those of AsyncPolymarketClient.post_orders:
+        one response per order in the order given (None where a batch failed).
+        """
+        signed_orders = list(signed_orders)
+        chunks = chunked(signed_orders, MAX_ORDERS_PER_POST)
+
+        def post_chunk(chunk):
+            try:
+                return self.client.post_orders([PostOrdersArgs(order=order, orderType=orderType) for order in chunk])
+            except Exception as e:
+                print(f"Error posting a batch of {len(chunk)} orders: {e}")
+                return None
+
+        if not chunks:
+            return []
+        with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+            return merge_post_responses(signed_orders, list(pool.map(post_chunk, chunks)))
+
+    def cancel_orders(self, order_ids: List[str]) -> dict:
+        """
+        Cancel orders in batches of MAX_CANCELS_PER_REQUEST, sending the batches in parallel.
+        Batching and the merged result are those of AsyncPolymarketClient.cancel_orders:
+        {"canceled": [ids], "not_canceled": {id: reason}} over all batches.
+        """
+        order_ids = list(order_ids)
+        chunks = chunked(order_ids, MAX_CANCELS_PER_REQUEST)
+
+        def cancel_chunk(chunk):
+            try:
+                return self.client.cancel_orders(chunk)
+            except Exception as e:
+                print(f"Error cancelling a batch of {len(chunk)} orders: {e}")
+                return None
+
+        if not chunks:
+            return merge_cancel_responses([], [])
+        with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+            return merge_cancel_responses(order_ids, list(pool.map(cancel_chunk, chunks)))
+
     def cancel_order(self, order_id: str):
         try:
             return self.client.cancel(order_id)
@@ -180,6 +261,11 @@ class PolymarketClient:
             list: Markets matching the keyword in their slug
         """
         try:
+            if self.catalog is not None:
+                matching_markets = self.catalog.search(keyword)[:limit]
+                logging.info(f"Found {len(matching_markets)} catalog markets matching keyword '{keyword}'")
+                return matching_markets
+
             # First get all markets (potentially filtered by status)
             all_markets = self.client.get_markets(status=market_status, limit=limit)
             
@@ -221,10 +307,22 @@ class PolymarketClient:
             
         Returns:
             list: Markets matching all specified criteria
+
+        With a catalog, candidates come from its token id and slug indexes and
+        market_status is ignored (the catalog holds what it was refreshed with).
         """
         try:
-            # Get all markets (potentially filtered by status)
-            all_markets = self.client.get_markets(status=market_status, limit=limit)
+            if self.catalog is not None:
+                if token_id is not None:
+                    market = self.catalog.by_token_id(token_id)
+                    all_markets = [market] if market else []
+                elif keyword:
+                    all_markets = self.catalog.search(keyword)
+                else:
+                    all_markets = list(self.catalog.markets())
+            else:
+                # Get all markets (potentially filtered by status)
+                all_markets = self.client.get_markets(status=market_status, limit=limit)
             
             # Apply additional filters
             filtered_markets = []
@@ -261,14 +359,14 @@ class PolymarketClient:
                         
                 # Apply token_id filter if specified
                 if matches and token_id is not None:
-                    tokens = market.get('tokens', [])
-                    token_found = any(token.get('token_id') == token_id for token in tokens)
-                    if not token_found:
+                    if str(token_id) not in market_token_ids(market):
                         matches = False
                     
                 # If market passed all filters, add it to results
                 if matches:
                     filtered_markets.append(market)
+                    if limit is not None and len(filtered_markets) >= limit:
+                        break
                     
             logging.info(f"Found {len(filtered_markets)} markets matching all criteria")
             return filtered_markets
@@ -311,12 +409,18 @@ class PolymarketClient:
         Returns:
             tuple: (market_slug, token1_id, token2_id) or (None, None, None) if not found
         """
+        if self.catalog is not None:
+            # Exact slug: one index lookup
+            slug, token1_id, token2_id = self.catalog.tokens_for_slug(keyword)
+            if slug:
+                return slug, token1_id, token2_id
+
         market = self.get_market_by_slug_keyword(keyword)
-        
-        if market and 'tokens' in market and len(market['tokens']) >= 2:
-            slug = market.get('slug')
-            token1_id = market['tokens'][0]['token_id']
-            token2_id = market['tokens'][1]['token_id']
+        token_ids = market_token_ids(market) if market else []
+
+        if len(token_ids) >= 2:
+            slug = market.get('slug') or market.get('market_slug')
+            token1_id, token2_id = token_ids[0], token_ids[1]
             
             logging.info(f"Found tokens for market '{slug}':")
             logging.info(f"Token1 ID: {token1_id}")
@@ -1,10 +1,113 @@
 # src/gamma_client.py
+import asyncio
+import httpx
 import requests
 import time
 
+def build_market_params(
+    limit=100,
+    offset=0,
+    order=None,
+    ascending=True,
+    id=None,
+    slug=None,
+    archived=None,
+    active=None,
+    closed=None,
+    clob_token_ids=None,
+    condition_ids=None,
+    liquidity_num_min=None,
+    liquidity_num_max=None,
+    volume_num_min=None,
+    volume_num_max=None,
+    start_date_min=None,
+    start_date_max=None,
+    end_date_min=None,
+    end_date_max=None,
+    tag_id=None,
+    related_tags=False,
+):
+    """
+    Build the /markets query parameters; see GammaMarketsClient.get_markets for the filters.
+    """
+    params = {
+        "limit": limit,
+        "offset": offset,
+    }
+
+    # Add filters to the query parameters
+    if order:
+        params["order"] = order
+        params["ascending"] = str(ascending).lower()  # Convert boolean to string
+    if id:
+        params["id"] = id
+    if slug:
+        params["slug"] = slug 
+    if archived is not None:
+        params["archived"] = str(archived).lower()
+    if active is not None:
+        params["active"] = str(active).lower()
+    if closed is not None:
+        params["closed"] = str(closed).lower()
+    if clob_token_ids is not None:
+        params["clob_token_ids"] = clob_token_ids 
+    if condition_ids is not None:
+        params["condition_ids"] = condition_ids  
+    if liquidity_num_min is not None:
+        params["liquidity_num_min"] = liquidity_num_min
+    if liquidity_num_max is not None:
+        params["liquidity_num_max"] = liquidity_num_max
+    if volume_num_min is not None:
+        params["volume_num_min"] = volume_num_min
+    if volume_num_max is not None:
+        params["volume_num_max"] = volume_num_max
+    if start_date_min:
+        params["start_date_min"] = start_date_min
+    if start_date_max:
+        params["start_date_max"] = start_date_max
+    if end_date_min:
+        params["end_date_min"] = end_date_min
+    if end_date_max:
+        params["end_date_max"] = end_date_max
+    if tag_id is not None:
+        params["tag_id"] = tag_id
+        if related_tags:
+            params["related_tags"] = "true"
+
+    return params
+
+
+def filter_markets_by_slug_keyword(markets, keyword):
+    """
+    Filter markets by keyword in their slug.
+
+    Args:
+        markets (list): List of markets already filtered by other criteria
+        keyword (str): Keyword to search for in the slug
+
+    Returns:
+        list: Markets that contain the keyword in their slug
+    """
+    if not keyword:
+        return markets
+
+    keyword = keyword.lower()
+    filtered_markets = []
+
+    for market in markets:
+        slug = market.get('slug', '').lower()
+        if keyword in slug:
+            filtered_markets.append(market)
+
+    print(f"Found {len(filtered_markets)} markets with '{keyword}' in slug")
+    return filtered_markets
+
+
 class GammaMarketsClient:
     def __init__(self, base_url="https://gamma-api.polymarket.com"):
         self.base_url = base_url
+        # Reuse connections across pages and calls
+        self.session = requests.Session()
 
     def get_markets(
         self,
@@ -60,55 +163,21 @@ class GammaMarketsClient:
             list: A list of all markets matching the filters.
         """
         url = f"{self.base_url}/markets"
-        params = {
-            "limit": limit,
-            "offset": offset,
-        }
-
-        # Add filters to the query parameters
-        if order:
-            params["order"] = order
-            params["ascending"] = str(ascending).lower()  # Convert boolean to string
-        if id:
-            params["id"] = id
-        if slug:
-            params["slug"] = slug 
-        if archived is not None:
-            params["archived"] = str(archived).lower()
-        if active is not None:
-            params["active"] = str(active).lower()
-        if closed is not None:
-            params["closed"] = str(closed).lower()
-        if clob_token_ids is not None:
-            params["clob_token_ids"] = clob_token_ids 
-        if condition_ids is not None:
-            params["condition_ids"] = condition_ids  
-        if liquidity_num_min is not None:
-            params["liquidity_num_min"] = liquidity_num_min
-        if liquidity_num_max is not None:
-            params["liquidity_num_max"] = liquidity_num_max
-        if volume_num_min is not None:
-            params["volume_num_min"] = volume_num_min
-        if volume_num_max is not None:
-            params["volume_num_max"] = volume_num_max
-        if start_date_min:
-            params["start_date_min"] = start_date_min
-        if start_date_max:
-            params["start_date_max"] = start_date_max
-        if end_date_min:
-            params["end_date_min"] = end_date_min
-        if end_date_max:
-            params["end_date_max"] = end_date_max
-        if tag_id is not None:
-            params["tag_id"] = tag_id
-            if related_tags:
-                params["related_tags"] = "true"
+        params = build_market_params(
+            limit=limit, offset=offset, order=order, ascending=ascending, id=id, slug=slug,
+            archived=archived, active=active, closed=closed, clob_token_ids=clob_token_ids,
+            condition_ids=condition_ids, liquidity_num_min=liquidity_num_min,
+            liquidity_num_max=liquidity_num_max, volume_num_min=volume_num_min,
+            volume_num_max=volume_num_max, start_date_min=start_date_min,
+            start_date_max=start_date_max, end_date_min=end_date_min, end_date_max=end_date_max,
+            tag_id=tag_id, related_tags=related_tags,
+        )
 
         all_markets = []
 
         while True:
             # Make the API request
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params)
             if response.status_code == 200:
                 markets = response.json()  # Response is a list of events
                 all_markets.extend(markets)
@@ -131,39 +200,16 @@ class GammaMarketsClient:
 
     def filter_markets_by_slug_keyword(self, markets, keyword):
         """
-        Filter markets by keyword in their slug.
-        
-        Args:
-            markets (list): List of markets already filtered by other criteria
-            keyword (str): Keyword to search for in the slug
-            
-        Returns:
-            list: Markets that contain the keyword in their slug
+        Filter markets by keyword in their slug, see filter_markets_by_slug_keyword.
         """
-        if not keyword:
-            return markets
-        
-        keyword = keyword.lower()
-        filtered_markets = []
-        
-        for market in markets:
-            slug = market.get('slug', '').lower()
-            if keyword in slug:
-                filtered_markets.append(market)
-        
-        print(f"Found {len(filtered_markets)} markets with '{keyword}' in slug")
-        return filtered_markets
+        return filter_markets_by_slug_keyword(markets, keyword)
 
-
-
-
-        
     def get_market(self, id):
 
         url = f"{self.base_url}/markets/{id}"
 
         # Make the API request
-        response = requests.get(url)
+        response = self.session.get(url)
         if response.status_code == 200:
             return response.json()
         else:
@@ -171,3 +217,113 @@ class GammaMarketsClient:
             return None
 
 
+class AsyncGammaMarketsClient:
+    """
+    Asyncio variant of GammaMarketsClient.
+
+    Requests go through one pooled httpx.AsyncClient, so connections are kept alive
+    between calls. get_markets fetches offset pages concurrently (at most
+    max_parallel_pages in flight) and stops issuing new pages once a short page shows
+    the end of the result set. Use it as an async context manager or call close().
+    """
+
+    def __init__(self, base_url="https://gamma-api.polymarket.com", max_parallel_pages=8,
+                 timeout=10.0, max_retries=5):
+        self.base_url = base_url
+        self.max_parallel_pages = max_parallel_pages
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_parallel_pages,
+                                    max_keepalive_connections=self.max_parallel_pages),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get(self, path, params=None):
+        """GET with retries on rate limiting; returns the decoded JSON or None on error."""
+        delay = 2
+        for _ in range(self.max_retries):
+            try:
+                response = await self.client.get(path, params=params)
+            except httpx.HTTPError as e:
+                # Timeouts and connection errors fail this page only, like an error status
+                print(f"Error fetching {path}: {e!r}")
+                return None
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 429:
+                print("Rate limit exceeded. Retrying after a delay...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+            print(f"Error fetching {path}: {response.status_code}")
+            return None
+        print(f"Giving up on {path} after {self.max_retries} rate limited attempts")
+        return None
+
+    async def get_markets(self, limit=100, offset=0, max_parallel_pages=None, **filters):
+        """
+        Fetch all markets matching the filters, paging concurrently.
+
+        Accepts the same filters as GammaMarketsClient.get_markets.
+
+        Returns:
+            list: All matching markets in offset order, or None if a page failed.
+        """
+        parallel = max_parallel_pages or self.max_parallel_pages
+        base_params = build_market_params(limit=limit, offset=offset, **filters)
+        pages = {}
+        state = {"next_offset": offset, "last_offset": None, "failed": False}
+
+        async def worker():
+            while not state["failed"]:
+                page_offset = state["next_offset"]
+                if state["last_offset"] is not None and page_offset > state["last_offset"]:
+                    return
+                state["next_offset"] += limit
+
+                page = await self._get("/markets", dict(base_params, offset=page_offset))
+                if page is None:
+                    state["failed"] = True
+                    return
+                pages[page_offset] = page
+                if len(page) < limit and (state["last_offset"] is None or page_offset < state["last_offset"]):
+                    state["last_offset"] = page_offset
+
+        await asyncio.gather(*(worker() for _ in range(parallel)))
+        if state["failed"]:
+            return None
+
+        all_markets = []
+        for page_offset in sorted(pages):
+            if page_offset > state["last_offset"]:
+                break
+            all_markets.extend(pages[page_offset])
+        return all_markets
+
+    async def get_market(self, id):
+        return await self._get(f"/markets/{id}")
+
+    def filter_markets_by_slug_keyword(self, markets, keyword):
+        """
+        Filter markets by keyword in their slug, see filter_markets_by_slug_keyword.
+        """
+        return filter_markets_by_slug_keyword(markets, keyword)
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Stages of one tick, in pipeline order. Each stage histogram measures the time
+# since the previous stage that was marked for the same tick.
+PIPELINE_STAGES = (
+    "fetch_start",   # MarketDataStreamer starts the order book requests (WS feed: first book change)
+    "fetched",       # both books received
+    "written",       # row appended to the market file
+    "read",          # TradingBot.process_csv got the row from the tailer
+    "signal",        # generate_signal returned
+    "order_sent",    # OrderExecutor.execute_signal called
+    "order_acked",   # post response received
+    "tracked",       # OrderTracker.track_order done
+)
+
+# End-to-end spans: (name, from stage, to stage)
+SPANS = (
+    ("tick_to_signal", "fetch_start", "signal"),
+    ("tick_to_trade", "fetch_start", "order_acked"),
+    ("read_to_trade", "read", "order_acked"),
+)
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies in microseconds.
+
+    Values below 2**sub_bucket_bits are counted exactly; above that every power of
+    two is split into 2**(sub_bucket_bits - 1) equal buckets, so the relative error
+    stays under 2**-(sub_bucket_bits - 1) (about 1.6% with the default 7 bits) over
+    the whole range while recording stays O(1) on a fixed array of counts.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7, max_value_us: int = 2 ** 40):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_value_us = max_value_us
+        self.counts = [0] * self._index(max_value_us) + [0]
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return (shift << self.sub_bucket_bits) + (value >> shift)
+
+    def _highest_value(self, index: int) -> int:
+        """Largest value counted in bucket index."""
+        shift = index >> self.sub_bucket_bits
+        sub_bucket = index & ((1 << self.sub_bucket_bits) - 1)
+        if shift == 0:
+            return sub_bucket
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, value_us: int):
+        value_us = min(max(int(value_us), 0), self.max_value_us)
+        self.counts[self._index(value_us)] += 1
+        self.count += 1
+        self.total += value_us
+        self.min = value_us if self.min is None else min(self.min, value_us)
+        self.max = value_us if self.max is None else max(self.max, value_us)
+
+    def percentile(self, percent: float) -> Optional[int]:
+        """Value (in microseconds) at or below which percent of the recorded values fall."""
+        if not self.count:
+            return None
+        target = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def buckets(self) -> List[Tuple[int, int]]:
+        """Non-empty buckets as (highest value in microseconds, count)."""
+        return [(self._highest_value(index), count) for index, count in enumerate(self.counts) if count]
+
+    def summary(self) -> dict:
+        """Count and min/mean/percentiles/max in milliseconds."""
+        def ms(value):
+            return None if value is None else value / 1000
+
+        return {
+            "count": self.count,
+            "min_ms": ms(self.min),
+            "mean_ms": ms(self.mean),
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+            "p999_ms": ms(self.percentile(99.9)),
+            "max_ms": ms(self.max),
+        }
+
+
+class LatencyRecorder:
+    """
+    Collects per-stage timestamps of every tick and folds them into histograms.
+
+    A tick is identified by the timestamp of its row, which the streamer writes and
+    the bot reads back, so marks from both sides of the market file end up in the
+    same trace. finish() records the stage-to-stage latencies of a trace, keeps it
+    among the recent traces and forgets it; open traces are bounded by max_open.
+    """
+
+    def __init__(self, stages: Iterable[str] = PIPELINE_STAGES, max_open: int = 1000, keep_recent: int = 100):
+        self.stages = tuple(stages)
+        self.max_open = max_open
+        self.histograms: Dict[str, LatencyHistogram] = {
+            name: LatencyHistogram() for name in self.stages[1:] + tuple(span for span, _, _ in SPANS)
+        }
+        self.traces: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self.recent = deque(maxlen=keep_recent)
+
+    def mark(self, tick: str, stage: str, t_ns: Optional[int] = None):
+        """Records that tick reached stage (now, or at t_ns from time.perf_counter_ns)."""
+        trace = self.traces.get(tick)
+        if trace is None:
+            trace = self.traces[tick] = {}
+            if len(self.traces) > self.max_open:
+                self.traces.popitem(last=False)
+        trace[stage] = time.perf_counter_ns() if t_ns is None else t_ns
+
+    def trace(self, tick: str) -> Optional[Dict[str, int]]:
+        return self.traces.get(tick)
+
+    def finish(self, tick: str) -> Optional[Dict[str, float]]:
+        """
+        Closes the trace of tick and returns its stage latencies in milliseconds
+        (only for the stages that were marked).
+        """
+        trace = self.traces.pop(tick, None)
+        if not trace:
+            return None
+        latencies = {}
+        previous = None
+        for stage in self.stages:
+            if stage not in trace:
+                continue
+            if previous is not None:
+                elapsed_us = (trace[stage] - trace[previous]) // 1000
+                self.histograms[stage].record(elapsed_us)
+                latencies[stage] = elapsed_us / 1000
+            previous = stage
+        for span, start, end in SPANS:
+            if start in trace and end in trace:
+                elapsed_us = (trace[end] - trace[start]) // 1000
+                self.histograms[span].record(elapsed_us)
+                latencies[span] = elapsed_us / 1000
+        self.recent.append({"tick": tick, **latencies})
+        return latencies
+
+    def snapshot(self) -> dict:
+        return {
+            "generated_at": datetime.utcnow().isoformat(),
+            "stages": {name: {**histogram.summary(), "buckets_us": histogram.buckets()}
+                       for name, histogram in self.histograms.items() if histogram.count},
+            "recent": list(self.recent),
+        }
+
+    def export(self, path: str):
+        """Writes the histograms and recent traces to path as JSON (atomically)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    async def export_periodically(self, path: str, interval_seconds: float = 60):
+        """Exports to path every interval_seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.export(path)
+            except Exception as e:
+                logging.error(f"Error exporting latency histograms to {path}: {e}")
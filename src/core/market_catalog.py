@@ -0,0 +1,193 @@
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .gamma_client import AsyncGammaMarketsClient
+
+
+def market_token_ids(market: dict) -> List[str]:
+    """Returns the CLOB token ids of a Gamma ("clobTokenIds") or CLOB ("tokens") market record."""
+    token_ids = market.get("clobTokenIds")
+    if isinstance(token_ids, str):
+        token_ids = json.loads(token_ids) if token_ids else []
+    if token_ids:
+        return [str(token_id) for token_id in token_ids]
+    return [str(token["token_id"]) for token in market.get("tokens") or [] if token.get("token_id")]
+
+
+def market_tags(market: dict) -> Set[str]:
+    """Returns the tag ids, slugs and labels attached to a market or to its events."""
+    tags = list(market.get("tags") or [])
+    for event in market.get("events") or []:
+        tags.extend(event.get("tags") or [])
+    keys = set()
+    for tag in tags:
+        if isinstance(tag, dict):
+            for field in ("id", "slug", "label"):
+                if tag.get(field) is not None:
+                    keys.add(str(tag[field]).lower())
+        elif tag is not None:
+            keys.add(str(tag).lower())
+    return keys
+
+
+class MarketCatalog:
+    """
+    Persistent local cache of market records with hash indexes.
+
+    Records are kept in SQLite, so a warm restart only reads the local file. On open
+    the index columns (slug, token ids, condition id, tags) are loaded into dicts
+    while the JSON bodies are decoded lazily on first access; after that every
+    lookup is a dict hit. refresh() reloads from the Gamma API once ttl_seconds have
+    passed or when it is called with different filters.
+    """
+
+    def __init__(self, path: str = "market_catalog.sqlite", ttl_seconds: int = 3600,
+                 gamma_client: Optional[AsyncGammaMarketsClient] = None):
+        """
+        Args:
+            path (str, optional): SQLite file. Defaults to "market_catalog.sqlite".
+            ttl_seconds (int, optional): Age after which refresh() downloads again. Defaults to 3600.
+            gamma_client (AsyncGammaMarketsClient, optional): Client used by refresh().
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.gamma_client = gamma_client
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS markets (id TEXT PRIMARY KEY, slug TEXT, condition_id TEXT, data TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS market_tokens (token_id TEXT PRIMARY KEY, market_id TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS market_tags (tag TEXT NOT NULL, market_id TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._load_indexes()
+
+    def _load_indexes(self):
+        self._raw: Dict[str, str] = {}
+        self._decoded: Dict[str, dict] = {}
+        self._by_slug: Dict[str, str] = {}
+        self._by_condition: Dict[str, str] = {}
+        self._by_token: Dict[str, str] = {}
+        self._by_tag: Dict[str, List[str]] = {}
+
+        for market_id, slug, condition_id, data in self.conn.execute(
+                "SELECT id, slug, condition_id, data FROM markets"):
+            self._raw[market_id] = data
+            if slug:
+                self._by_slug[slug] = market_id
+            if condition_id:
+                self._by_condition[condition_id] = market_id
+        self._by_token = dict(self.conn.execute("SELECT token_id, market_id FROM market_tokens"))
+        for tag, market_id in self.conn.execute("SELECT tag, market_id FROM market_tags"):
+            self._by_tag.setdefault(tag, []).append(market_id)
+
+    # --- Freshness ---
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def updated_at(self) -> Optional[float]:
+        value = self._meta("updated_at")
+        return float(value) if value else None
+
+    def is_stale(self, filters: Optional[dict] = None) -> bool:
+        updated_at = self.updated_at
+        if updated_at is None or time.time() - updated_at > self.ttl_seconds:
+            return True
+        return filters is not None and self._meta("filters") != json.dumps(filters, sort_keys=True)
+
+    async def refresh(self, force: bool = False, **filters) -> bool:
+        """
+        Downloads the markets matching filters (see GammaMarketsClient.get_markets) if the
+        catalog is stale, empty or was built with other filters. Returns True if it reloaded.
+        """
+        if not force and len(self) and not self.is_stale(filters):
+            return False
+        client = self.gamma_client or AsyncGammaMarketsClient()
+        try:
+            markets = await client.get_markets(**filters)
+        finally:
+            if self.gamma_client is None:
+                await client.close()
+        if markets is None:
+            logging.error("Market catalog refresh failed, keeping the cached markets")
+            return False
+        self.replace(markets, filters)
+        logging.info(f"Market catalog refreshed with {len(markets)} markets")
+        return True
+
+    def replace(self, markets: List[dict], filters: Optional[dict] = None):
+        """Replaces the stored markets and rebuilds the indexes."""
+        market_rows, token_rows, tag_rows = [], [], []
+        for market in markets:
+            market_id = str(market.get("id") or market.get("condition_id") or market.get("conditionId"))
+            condition_id = market.get("conditionId") or market.get("condition_id")
+            slug = market.get("slug") or market.get("market_slug")
+            market_rows.append((market_id, slug, condition_id, json.dumps(market)))
+            token_rows.extend((token_id, market_id) for token_id in market_token_ids(market))
+            tag_rows.extend((tag, market_id) for tag in market_tags(market))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM markets")
+            self.conn.execute("DELETE FROM market_tokens")
+            self.conn.execute("DELETE FROM market_tags")
+            self.conn.executemany("INSERT OR REPLACE INTO markets VALUES (?, ?, ?, ?)", market_rows)
+            self.conn.executemany("INSERT OR REPLACE INTO market_tokens VALUES (?, ?)", token_rows)
+            self.conn.executemany("INSERT INTO market_tags VALUES (?, ?)", tag_rows)
+            self.conn.execute("INSERT OR REPLACE INTO catalog_meta VALUES ('updated_at', ?)", (str(time.time()),))
+            self.conn.execute("INSERT OR REPLACE INTO catalog_meta VALUES ('filters', ?)",
+                              (json.dumps(filters or {}, sort_keys=True),))
+        self._load_indexes()
+
+    # --- Lookups ---
+    def __len__(self):
+        return len(self._raw)
+
+    def get(self, market_id: str) -> Optional[dict]:
+        market = self._decoded.get(market_id)
+        if market is None and market_id in self._raw:
+            market = self._decoded[market_id] = json.loads(self._raw[market_id])
+        return market
+
+    def markets(self) -> Iterator[dict]:
+        for market_id in self._raw:
+            yield self.get(market_id)
+
+    def by_slug(self, slug: str) -> Optional[dict]:
+        market_id = self._by_slug.get(slug)
+        return self.get(market_id) if market_id else None
+
+    def by_token_id(self, token_id: str) -> Optional[dict]:
+        market_id = self._by_token.get(str(token_id))
+        return self.get(market_id) if market_id else None
+
+    def by_condition_id(self, condition_id: str) -> Optional[dict]:
+        market_id = self._by_condition.get(condition_id)
+        return self.get(market_id) if market_id else None
+
+    def by_tag(self, tag) -> List[dict]:
+        return [self.get(market_id) for market_id in self._by_tag.get(str(tag).lower(), [])]
+
+    def search(self, keyword: str) -> List[dict]:
+        """Markets whose slug contains keyword; exact slug matches are returned first."""
+        keyword = keyword.lower()
+        exact = self.by_slug(keyword)
+        matches = [exact] if exact else []
+        matches.extend(self.get(market_id) for slug, market_id in self._by_slug.items()
+                       if keyword in slug.lower() and slug != keyword)
+        return matches
+
+    def tokens_for_slug(self, slug: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Returns (slug, token1_id, token2_id) for a market slug, or (None, None, None)."""
+        market = self.by_slug(slug)
+        token_ids = market_token_ids(market) if market else []
+        if len(token_ids) < 2:
+            return None, None, None
+        return slug, token_ids[0], token_ids[1]
+
+    def close(self):
+        self.conn.close()
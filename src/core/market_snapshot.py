@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+Level = Tuple[float, float]
+
+
+@dataclass(frozen=True, slots=True)
+class MarketSnapshot:
+    """Top of book and levels of one token, derived from a single order book response."""
+    token_id: str
+    market: Optional[str]
+    timestamp: Optional[str]
+    best_buy: Optional[float]
+    best_sell: Optional[float]
+    midpoint: Optional[float]
+    spread: Optional[float]
+    bids: List[Level]
+    asks: List[Level]
+    book: Any = None
+
+    @classmethod
+    def from_order_book(cls, book, token_id: Optional[str] = None) -> "MarketSnapshot":
+        """
+        Parses a py_clob_client OrderBookSummary once.
+
+        The exchange sends bids ascending and asks descending as strings; the snapshot
+        holds them as floats, best price first. best_buy is the highest bid and
+        best_sell the lowest ask, matching the CLOB price endpoint.
+        """
+        bids = sorted(((float(l.price), float(l.size)) for l in book.bids or []), reverse=True)
+        asks = sorted((float(l.price), float(l.size)) for l in book.asks or [])
+        best_buy = bids[0][0] if bids else None
+        best_sell = asks[0][0] if asks else None
+        if best_buy is not None and best_sell is not None:
+            midpoint = round((best_buy + best_sell) / 2, 6)
+            spread = round(best_sell - best_buy, 6)
+        else:
+            midpoint = spread = None
+        return cls(
+            token_id=token_id or book.asset_id,
+            market=book.market,
+            timestamp=book.timestamp,
+            best_buy=best_buy,
+            best_sell=best_sell,
+            midpoint=midpoint,
+            spread=spread,
+            bids=bids,
+            asks=asks,
+            book=book,
+        )
+
+    def top_of_book(self) -> list:
+        """Returns [midpoint, best_buy, best_sell, spread] in the streamer column order."""
+        return [self.midpoint, self.best_buy, self.best_sell, self.spread]
@@ -0,0 +1,291 @@
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .ws_events import parse_event
+
+BUY = "BUY"
+SELL = "SELL"
+
+Level = Tuple[float, float]
+
+
+def _level(level) -> Tuple[str, str]:
+    """Accepts (price, size) tuples, {"price", "size"} dicts and OrderSummary objects."""
+    if isinstance(level, dict):
+        return level["price"], level["size"]
+    if isinstance(level, (tuple, list)):
+        return level[0], level[1]
+    return level.price, level.size
+
+
+class OrderBook:
+    """
+    L2 order book of one token on a fixed price grid.
+
+    Prices live on a tick grid between 0 and 1 (0.01 by default), so every side is a
+    price-indexed array of sizes. An integer bitmask of occupied levels gives the best
+    bid (highest set bit) and best ask (lowest set bit) in O(1); updating a level is
+    O(1) as well.
+    """
+
+    def __init__(self, token_id: str, tick_size: float = 0.01):
+        self.token_id = token_id
+        self.market: Optional[str] = None
+        self.timestamp: Optional[str] = None
+        self.has_snapshot = False
+        self.version = 0
+        self._set_grid(tick_size)
+        self.clear()
+
+    def _set_grid(self, tick_size: float):
+        self.tick_size = float(tick_size)
+        self._levels = int(round(1 / self.tick_size)) + 1
+        self._decimals = max(0, -int(math.floor(math.log10(self.tick_size))))
+
+    def clear(self):
+        """Removes all levels."""
+        self._sizes = {BUY: [0.0] * self._levels, SELL: [0.0] * self._levels}
+        self._masks = {BUY: 0, SELL: 0}
+
+    # --- Grid helpers ---
+    def index(self, price) -> int:
+        """Returns the grid index of price, raising ValueError for off-grid prices."""
+        scaled = float(price) / self.tick_size
+        index = int(round(scaled))
+        if abs(scaled - index) > 1e-6 or not 0 <= index < self._levels:
+            raise ValueError(f"Price {price} is not on the {self.tick_size} grid of token {self.token_id}")
+        return index
+
+    def _on_grid(self, price: float) -> bool:
+        scaled = price / self.tick_size
+        return abs(scaled - round(scaled)) <= 1e-6
+
+    def _fit_grid(self, prices: Iterable[float]):
+        """Refines the grid (e.g. 0.01 -> 0.001) when the exchange quotes finer prices."""
+        prices = list(prices)
+        tick_size = self.tick_size
+        while tick_size > 1e-4 and not all(abs(p / tick_size - round(p / tick_size)) <= 1e-6 for p in prices):
+            tick_size = round(tick_size / 10, 10)
+        if tick_size != self.tick_size:
+            self.set_tick_size(tick_size)
+
+    def price(self, index: int) -> float:
+        return round(index * self.tick_size, self._decimals)
+
+    def set_tick_size(self, tick_size: float):
+        """Moves the book to a new tick grid, keeping its levels."""
+        levels = self.levels(BUY), self.levels(SELL)
+        self._set_grid(tick_size)
+        self.clear()
+        for side, side_levels in zip((BUY, SELL), levels):
+            for price, size in side_levels:
+                self.set_level(side, price, size)
+
+    # --- Updates ---
+    def set_level(self, side: str, price, size):
+        """Sets the size resting at a price; a size of 0 removes the level."""
+        price = float(price)
+        if not self._on_grid(price):
+            self._fit_grid([price])
+        index = self.index(price)
+        size = float(size)
+        self._sizes[side][index] = size
+        if size > 0:
+            self._masks[side] |= 1 << index
+        else:
+            self._masks[side] &= ~(1 << index)
+        self.version += 1
+
+    def apply_snapshot(self, bids: Iterable, asks: Iterable, timestamp: Optional[str] = None):
+        """Replaces the whole book with the given bid and ask levels."""
+        parsed = {
+            side: [tuple(map(float, _level(level))) for level in levels or []]
+            for side, levels in ((BUY, bids), (SELL, asks))
+        }
+        self.clear()
+        self._fit_grid(price for levels in parsed.values() for price, _ in levels)
+        for side, levels in parsed.items():
+            sizes = self._sizes[side]
+            mask = 0
+            for price, size in levels:
+                index = self.index(price)
+                sizes[index] = size
+                if size > 0:
+                    mask |= 1 << index
+            self._masks[side] = mask
+        self.timestamp = timestamp
+        self.has_snapshot = True
+        self.version += 1
+
+    def apply_delta(self, changes: Iterable[Tuple[str, object, object]], timestamp: Optional[str] = None):
+        """Applies (side, price, size) level updates, e.g. from a price_change message."""
+        for side, price, size in changes:
+            self.set_level(side, price, size)
+        if timestamp is not None:
+            self.timestamp = timestamp
+
+    def apply_summary(self, summary):
+        """Replaces the book with a py_clob_client OrderBookSummary."""
+        if getattr(summary, "tick_size", None):
+            tick_size = float(summary.tick_size)
+            if tick_size != self.tick_size:
+                self._set_grid(tick_size)
+        self.market = summary.market
+        self.apply_snapshot(summary.bids, summary.asks, summary.timestamp)
+
+    # --- Queries ---
+    def best_bid(self) -> Optional[Level]:
+        mask = self._masks[BUY]
+        if not mask:
+            return None
+        index = mask.bit_length() - 1
+        return self.price(index), self._sizes[BUY][index]
+
+    def best_ask(self) -> Optional[Level]:
+        mask = self._masks[SELL]
+        if not mask:
+            return None
+        index = (mask & -mask).bit_length() - 1
+        return self.price(index), self._sizes[SELL][index]
+
+    @property
+    def best_bid_price(self) -> Optional[float]:
+        best = self.best_bid()
+        return best[0] if best else None
+
+    @property
+    def best_ask_price(self) -> Optional[float]:
+        best = self.best_ask()
+        return best[0] if best else None
+
+    @property
+    def midpoint(self) -> Optional[float]:
+        bid, ask = self.best_bid_price, self.best_ask_price
+        if bid is None or ask is None:
+            return None
+        return round((bid + ask) / 2, self._decimals + 1)
+
+    @property
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid_price, self.best_ask_price
+        if bid is None or ask is None:
+            return None
+        return round(ask - bid, self._decimals)
+
+    def size_at(self, side: str, price) -> float:
+        return self._sizes[side][self.index(price)]
+
+    def levels(self, side: str, depth: Optional[int] = None) -> List[Level]:
+        """Returns the occupied levels of a side, best price first."""
+        sizes = self._sizes[side]
+        mask = self._masks[side]
+        out = []
+        if side == BUY:
+            while mask and (depth is None or len(out) < depth):
+                index = mask.bit_length() - 1
+                out.append((self.price(index), sizes[index]))
+                mask ^= 1 << index
+        else:
+            while mask and (depth is None or len(out) < depth):
+                low = mask & -mask
+                index = low.bit_length() - 1
+                out.append((self.price(index), sizes[index]))
+                mask ^= low
+        return out
+
+    def depth(self, side: str, price) -> float:
+        """
+        Cumulative size available at price or better: bids at or above price for BUY,
+        asks at or below price for SELL.
+        """
+        index = self.index(price)
+        sizes = self._sizes[side]
+        return sum(sizes[index:]) if side == BUY else sum(sizes[:index + 1])
+
+    def cumulative_depth(self, side: str, depth: Optional[int] = None) -> List[Level]:
+        """Returns (price, cumulative size) pairs walking away from the best price."""
+        total = 0.0
+        out = []
+        for price, size in self.levels(side, depth):
+            total += size
+            out.append((price, total))
+        return out
+
+    def snapshot(self) -> Dict[str, List[Level]]:
+        """Returns {"bids": [...], "asks": [...]} with levels best price first."""
+        return {"bids": self.levels(BUY), "asks": self.levels(SELL)}
+
+
+class OrderBooks:
+    """
+    Order books keyed by token id, fed from REST summaries or WebSocket market events.
+
+    One instance can be shared between a streamer that keeps it current and
+    strategies that read from it.
+    """
+
+    def __init__(self, tick_size: float = 0.01):
+        self.tick_size = tick_size
+        self.books: Dict[str, OrderBook] = {}
+
+    def __contains__(self, token_id: str) -> bool:
+        return token_id in self.books
+
+    def __getitem__(self, token_id: str) -> OrderBook:
+        return self.books[token_id]
+
+    def get(self, token_id: str) -> OrderBook:
+        """Returns the book of a token, creating an empty one if needed."""
+        book = self.books.get(token_id)
+        if book is None:
+            book = self.books[token_id] = OrderBook(token_id, self.tick_size)
+        return book
+
+    def apply_summary(self, summary) -> Optional[OrderBook]:
+        """Updates a book from a py_clob_client OrderBookSummary."""
+        if summary is None:
+            return None
+        book = self.get(summary.asset_id)
+        book.apply_summary(summary)
+        return book
+
+    def apply_event(self, event, tokens: Optional[Set[str]] = None) -> Set[str]:
+        """
+        Applies one market channel event and returns the token ids whose book changed.
+
+        Accepts the typed events of ws_events or the raw dicts. Handles `book`
+        snapshots, `price_change` level updates (both the per-event asset_id layout
+        and the newer per-change one) and `tick_size_change`. Updates for tokens
+        outside `tokens` (when given) or without a snapshot yet are ignored.
+        """
+        if isinstance(event, dict):
+            event = parse_event(event)
+        # Compared by name so events decoded under either import path (core. / src.core.) work
+        event_type = getattr(event, "event_type", None)
+        changed = set()
+
+        if event_type == "book":
+            asset_id = event.asset_id
+            if tokens is None or asset_id in tokens:
+                book = self.get(asset_id)
+                book.market = event.market
+                book.apply_snapshot(event.bids, event.asks, event.timestamp)
+                changed.add(asset_id)
+
+        elif event_type == "price_change":
+            for change in event.changes:
+                book = self.books.get(change.asset_id)
+                if book is None or not book.has_snapshot:
+                    continue
+                book.set_level(change.side, change.price, change.size)
+                if event.timestamp is not None:
+                    book.timestamp = event.timestamp
+                changed.add(book.token_id)
+
+        elif event_type == "tick_size_change":
+            book = self.books.get(event.asset_id)
+            if book is not None:
+                book.set_tick_size(event.new_tick_size)
+                changed.add(book.token_id)
+
+        return changed
@@ -2,7 +2,10 @@ import json
 import asyncio
 import websockets
 import logging
-from typing import Callable, Optional, List
+from typing import Callable, Dict, Optional, List
+
+from .receive_queue import DROP_OLDEST, ReceiveQueue
+from .ws_events import get_decoder
 
 class PolymarketWebSocketClient:
     """
@@ -16,8 +19,28 @@ class PolymarketWebSocketClient:
         api_secret: Optional[str] = None,
         api_passphrase: Optional[str] = None,
         message_callback: Optional[Callable] = None,
-        ws_url: str = "wss://ws-subscriptions-clob.polymarket.com/ws/"
+        ws_url: str = "wss://ws-subscriptions-clob.polymarket.com/ws/",
+        decoder: Optional[Callable] = None,
+        queue_size: int = 1000,
+        overflow: str = DROP_OLDEST,
+        conflate: bool = False,
+        queue: Optional[ReceiveQueue] = None
     ):
+        """
+        Args:
+            decoder (Callable, optional): Turns a received frame into the message passed to
+                the callback. Defaults to the fastest installed JSON decoder (msgspec, orjson,
+                json); ws_events.EventDecoder() delivers lists of typed events instead.
+            queue_size (int, optional): Messages buffered between the socket reader and the
+                callback. Defaults to 1000.
+            overflow (str, optional): "drop_oldest" or "block" when the buffer is full, see
+                ReceiveQueue. Defaults to "drop_oldest".
+            conflate (bool, optional): Keep only the latest book/price updates per asset while
+                the callback lags (needs typed events). Defaults to False.
+            queue (ReceiveQueue, optional): Put messages on this queue instead of one of the
+                client's own (queue_size, overflow and conflate are then ignored); whoever owns
+                it consumes it, e.g. a connection pool merging several clients.
+        """
         self.api_key = api_key
         self.api_secret = api_secret
         self.api_passphrase = api_passphrase
@@ -25,7 +48,14 @@ class PolymarketWebSocketClient:
         self.connection = None
         self.running = False
         self.message_callback = message_callback
+        self.decoder = decoder or get_decoder()
+        self.owns_queue = queue is None
+        self.queue = queue if queue is not None else ReceiveQueue(queue_size, overflow=overflow, conflate=conflate)
         self.task = None
+        # Current subscription (dicts as ordered sets), replayed on every reconnect
+        self.channel_type = None
+        self.markets: Dict[str, None] = {}
+        self.asset_ids: Dict[str, None] = {}
     
     async def connect(self, channel_type: str):
         """Establishes a connection to the WebSocket."""
@@ -78,13 +108,63 @@ class PolymarketWebSocketClient:
             logging.error(f"Subscription error: {e}")
             return False
     
+    async def update_subscription(self, operation: str, markets: List[str] = None, assets_ids: List[str] = None):
+        """
+        Subscribes to ("subscribe") or unsubscribes from ("unsubscribe") more markets or
+        asset ids on the open connection, without reconnecting.
+        """
+        if operation not in ["subscribe", "unsubscribe"]:
+            raise ValueError("Invalid operation. Use 'subscribe' or 'unsubscribe'.")
+        if not self.connection:
+            return False
+
+        message = {"operation": operation}
+        if markets:
+            message["markets"] = list(markets)
+        if assets_ids:
+            message["assets_ids"] = list(assets_ids)
+
+        try:
+            await self.connection.send(json.dumps(message))
+            logging.info(f"Sent {operation} for {len(markets or [])} markets and {len(assets_ids or [])} assets")
+            return True
+        except Exception as e:
+            logging.error(f"Error sending {operation}: {e}")
+            return False
+
+    async def add_subscriptions(self, markets: List[str] = None, assets_ids: List[str] = None):
+        """
+        Adds markets (user channel) or asset ids (market channel) to the subscription. They
+        are sent right away when connected and are part of the replay after a reconnect.
+        """
+        new_markets = [m for m in dict.fromkeys(markets or []) if m not in self.markets]
+        new_assets = [a for a in dict.fromkeys(assets_ids or []) if a not in self.asset_ids]
+        self.markets.update(dict.fromkeys(new_markets))
+        self.asset_ids.update(dict.fromkeys(new_assets))
+        if new_markets or new_assets:
+            return await self.update_subscription("subscribe", new_markets, new_assets)
+        return True
+
+    async def remove_subscriptions(self, markets: List[str] = None, assets_ids: List[str] = None):
+        """Removes markets or asset ids from the subscription without reconnecting."""
+        old_markets = [m for m in markets or [] if m in self.markets]
+        old_assets = [a for a in assets_ids or [] if a in self.asset_ids]
+        for market in old_markets:
+            del self.markets[market]
+        for asset_id in old_assets:
+            del self.asset_ids[asset_id]
+        if old_markets or old_assets:
+            return await self.update_subscription("unsubscribe", old_markets, old_assets)
+        return True
+
     async def listen(self, channel_type: str, markets: List[str] = None, assets_ids: List[str] = None):
-        """Listens for incoming messages from the WebSocket."""
+        """Reads messages from the WebSocket into the receive queue."""
         while self.running:
             try:
+                decode = self.decoder
+                put = self.queue.put
                 async for message in self.connection:
-                    data = json.loads(message)
-                    await self.handle_message(data)
+                    await put(decode(message))
             except websockets.exceptions.ConnectionClosed as e:
                 logging.warning(f"WebSocket connection closed: {e}")
                 if self.running:
@@ -96,7 +176,10 @@ class PolymarketWebSocketClient:
                     await self.reconnect(channel_type, markets, assets_ids)
     
     async def reconnect(self, channel_type: str, markets: List[str] = None, assets_ids: List[str] = None):
-        """Attempts to reconnect to the WebSocket after an unexpected closure."""
+        """
+        Attempts to reconnect to the WebSocket after an unexpected closure. Without explicit
+        markets / assets_ids the current subscription is replayed.
+        """
         logging.info("Attempting to reconnect WebSocket...")
         retry_count = 0
         max_retries = 5
@@ -108,13 +191,25 @@ class PolymarketWebSocketClient:
             delay = min(delay * 2, 30)  # Exponential backoff with max 30 seconds
 
             if await self.connect(channel_type):
-                if await self.subscribe(channel_type, markets, assets_ids):
+                if await self.subscribe(channel_type,
+                                        list(self.markets) if markets is None else markets,
+                                        list(self.asset_ids) if assets_ids is None else assets_ids):
                     logging.info(f"Successfully reconnected after {retry_count} attempts")
                     return True
         
         logging.error(f"Failed to reconnect after {max_retries} attempts")
         return False
     
+    async def consume(self):
+        """Passes queued messages to handle_message, decoupled from the socket reads."""
+        get = self.queue.get
+        while True:
+            await self.handle_message(await get())
+
+    def stats(self) -> dict:
+        """Receive queue counters: depth, max_depth, received, delivered, dropped, conflated."""
+        return self.queue.stats()
+
     async def handle_message(self, message):
         """
         Handles incoming WebSocket messages.
@@ -172,24 +267,30 @@ class PolymarketWebSocketClient:
     async def start(self, channel_type: str = "user", markets: List[str] = None, asset_ids: List[str] = None):
         """Start the WebSocket client and return the running task."""
         self.running = True
-        self.task = asyncio.create_task(self._run(channel_type, markets, asset_ids))
+        self.channel_type = channel_type
+        self.markets = dict.fromkeys(markets or [])
+        self.asset_ids = dict.fromkeys(asset_ids or [])
+        self.task = asyncio.create_task(self._run(channel_type))
         return self.task
     
-    async def _run(self, channel_type: str, markets: List[str] = None, asset_ids: List[str] = None):
-        """Run the WebSocket client with automatic reconnection."""
+    async def _run(self, channel_type: str):
+        """Run the WebSocket client with automatic reconnection, replaying the current subscription."""
         keep_alive_task = None
+        consumer_task = asyncio.create_task(self.consume()) if self.owns_queue else None
         
         try:
             if await self.connect(channel_type):
-                if await self.subscribe(channel_type, markets, asset_ids):
+                if await self.subscribe(channel_type, list(self.markets), list(self.asset_ids)):
                     # Start the keep-alive task
                     keep_alive_task = asyncio.create_task(self.keep_alive())
                     # Main listen loop
-                    await self.listen(channel_type, markets, asset_ids)
+                    await self.listen(channel_type)
         except Exception as e:
             logging.error(f"Error in WebSocket client: {e}")
         finally:
             self.running = False
             if keep_alive_task:
                 keep_alive_task.cancel()
+            if consumer_task:
+                consumer_task.cancel()
             await self.close() 
\ No newline at end of file
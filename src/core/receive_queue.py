@@ -0,0 +1,224 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Optional, Set
+
+from .ws_events import PriceChangeEvent
+
+# What ReceiveQueue.put does when the queue is full
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+OVERFLOW_POLICIES = (DROP_OLDEST, BLOCK)
+
+# Market data events that can be merged per asset while they wait in the queue
+CONFLATED_EVENT_TYPES = ("book", "price_change")
+
+
+class _Pending:
+    """Queue entry holding the merged book/price_change of one asset."""
+    __slots__ = ("asset_id", "event")
+
+    def __init__(self, asset_id: str, event):
+        self.asset_id = asset_id
+        self.event = event
+
+
+def _merge_price_changes(older: PriceChangeEvent, newer: PriceChangeEvent) -> PriceChangeEvent:
+    """One price_change setting every level to its latest size."""
+    levels = {(change.side, change.price): change for change in older.changes}
+    levels.update({(change.side, change.price): change for change in newer.changes})
+    return PriceChangeEvent(newer.market, list(levels.values()), newer.timestamp)
+
+
+def _split_by_asset(event: PriceChangeEvent) -> Dict[str, PriceChangeEvent]:
+    if len(event.changes) == 1:
+        return {event.changes[0].asset_id: event}
+    changes = {}
+    for change in event.changes:
+        changes.setdefault(change.asset_id, []).append(change)
+    if len(changes) == 1:
+        return {next(iter(changes)): event}
+    return {asset_id: PriceChangeEvent(event.market, asset_changes, event.timestamp)
+            for asset_id, asset_changes in changes.items()}
+
+
+class ReceiveQueue:
+    """
+    Bounded queue between a WebSocket reader and the message consumer.
+
+    The reader puts every decoded message and goes straight back to the socket;
+    the consumer takes them at its own pace. When the queue is full the oldest
+    message is dropped (DROP_OLDEST) or put() waits for room (BLOCK).
+
+    With conflate=True, typed `book` and `price_change` events (ws_events) are kept
+    at most once per asset while they wait: a new snapshot replaces the pending
+    book or updates of its asset, and level updates are merged into a pending
+    price_change (latest size per level). A lagging consumer therefore gets the
+    current state of every book instead of a backlog of superseded updates. A
+    pending entry only absorbs later events while nothing else about its asset was
+    queued after it, so the order of events per asset is preserved. Other messages
+    are delivered unchanged; conflated events are delivered as one-event lists.
+
+    A full conflating queue drops the oldest other message first. Book state is
+    only dropped when nothing else is left: the asset is then stale, and its
+    price_change events are discarded until the next `book` snapshot, since
+    applying them on top of the lost one would silently leave the book wrong.
+    These drops are counted as stale_dropped.
+    """
+
+    def __init__(self, maxsize: int = 1000, overflow: str = DROP_OLDEST, conflate: bool = False):
+        """
+        Args:
+            maxsize (int, optional): Maximum number of queued entries. Defaults to 1000.
+            overflow (str, optional): DROP_OLDEST or BLOCK. Defaults to DROP_OLDEST.
+            conflate (bool, optional): Merge book/price_change events per asset. Defaults to False.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy {overflow!r}. Use one of {OVERFLOW_POLICIES}.")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.conflate = conflate
+        self._entries = deque()
+        # Pending entry per asset that later events may still be merged into
+        self._pending: Dict[str, _Pending] = {}
+        # Assets that lost a book/price_change to overflow, waiting for a snapshot
+        self._stale: Set[str] = set()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.stale_dropped = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def depth(self) -> int:
+        return len(self._entries)
+
+    def _drop(self):
+        """Makes room for one entry, keeping book state over other messages when conflating."""
+        if self.conflate:
+            for index, entry in enumerate(self._entries):
+                if not isinstance(entry, _Pending):
+                    del self._entries[index]
+                    self.dropped += 1
+                    logging.debug(f"Receive queue full ({self.maxsize}), dropped the oldest non-book message")
+                    return
+        dropped = self._entries.popleft()
+        if not isinstance(dropped, _Pending):
+            self.dropped += 1
+            logging.debug(f"Receive queue full ({self.maxsize}), dropped the oldest message")
+            return
+        asset_id = dropped.asset_id
+        if self._pending.get(asset_id) is dropped:
+            del self._pending[asset_id]
+        # Later updates of the asset would apply on top of the lost state
+        queued = [entry for entry in self._entries if isinstance(entry, _Pending) and entry.asset_id == asset_id
+                  and entry.event.event_type == "price_change"]
+        for entry in queued:
+            self._entries.remove(entry)
+            if self._pending.get(asset_id) is entry:
+                del self._pending[asset_id]
+        self._stale.add(asset_id)
+        self.stale_dropped += 1 + len(queued)
+        logging.warning(f"Receive queue full ({self.maxsize}), dropped book state of {asset_id}; "
+                        f"ignoring its updates until the next snapshot")
+
+    def _append(self, entry):
+        if len(self._entries) >= self.maxsize:
+            self._drop()
+        self._entries.append(entry)
+        self.max_depth = max(self.max_depth, len(self._entries))
+        self._readable.set()
+
+    def _conflate(self, event):
+        """Merges event into the pending entry of its asset or queues a new one."""
+        if isinstance(event, PriceChangeEvent):
+            for asset_id, asset_event in _split_by_asset(event).items():
+                if asset_id in self._stale:
+                    self.stale_dropped += 1
+                    continue
+                pending = self._pending.get(asset_id)
+                if pending is None or pending.event.event_type != "price_change":
+                    if pending is not None:
+                        # Updates on top of a snapshot are queued after it
+                        del self._pending[asset_id]
+                    self._pending[asset_id] = entry = _Pending(asset_id, asset_event)
+                    self._append(entry)
+                else:
+                    pending.event = _merge_price_changes(pending.event, asset_event)
+                    self.conflated += 1
+            return
+        self._stale.discard(event.asset_id)
+        pending = self._pending.get(event.asset_id)
+        if pending is None:
+            self._pending[event.asset_id] = entry = _Pending(event.asset_id, event)
+            self._append(entry)
+        else:
+            pending.event = event
+            self.conflated += 1
+
+    def _put(self, message):
+        self.received += 1
+        if isinstance(message, list) and not message:
+            return
+        if not self.conflate:
+            self._append(message)
+            return
+        events = message if isinstance(message, list) else [message]
+        others = []
+        for event in events:
+            event_type = getattr(event, "event_type", None)
+            if event_type in CONFLATED_EVENT_TYPES and not isinstance(event, dict):
+                if others:
+                    self._append(others)
+                    others = []
+                self._conflate(event)
+                continue
+            asset_id = event.get("asset_id") if isinstance(event, dict) else getattr(event, "asset_id", None)
+            # Anything else about the asset closes its pending entry to keep the order
+            self._pending.pop(asset_id, None)
+            others.append(event)
+        if others:
+            self._append(others if isinstance(message, list) else others[0])
+
+    async def put(self, message):
+        """Queues a decoded message; with BLOCK, waits while the queue is full."""
+        if self.overflow == BLOCK:
+            while len(self._entries) >= self.maxsize:
+                self._writable.clear()
+                await self._writable.wait()
+        self._put(message)
+
+    def put_nowait(self, message):
+        """Queues a decoded message, dropping the oldest one if the queue is full."""
+        self._put(message)
+
+    def get_nowait(self) -> Optional[object]:
+        """Next message, or None if the queue is empty."""
+        if not self._entries:
+            return None
+        entry = self._entries.popleft()
+        if isinstance(entry, _Pending):
+            if self._pending.get(entry.asset_id) is entry:
+                del self._pending[entry.asset_id]
+            entry = [entry.event]
+        self.delivered += 1
+        self._writable.set()
+        return entry
+
+    async def get(self):
+        """Waits for and returns the next message."""
+        while not self._entries:
+            self._readable.clear()
+            await self._readable.wait()
+        return self.get_nowait()
+
+    def stats(self) -> dict:
+        return {"depth": len(self._entries), "max_depth": self.max_depth, "received": self.received,
+                "delivered": self.delivered, "dropped": self.dropped, "conflated": self.conflated,
+                "stale_dropped": self.stale_dropped}
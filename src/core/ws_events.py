@@ -0,0 +1,205 @@
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Union
+
+# Fastest available JSON decoder: msgspec, then orjson, then the standard library.
+try:
+    import msgspec
+
+    _msgspec_decode = msgspec.json.Decoder().decode
+except ImportError:
+    msgspec = None
+    _msgspec_decode = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DECODERS: Dict[str, Callable] = {"json": json.loads}
+DECODE_ERRORS = (ValueError,)
+if orjson is not None:
+    DECODERS["orjson"] = orjson.loads
+if _msgspec_decode is not None:
+    DECODERS["msgspec"] = _msgspec_decode
+    DECODE_ERRORS += (msgspec.DecodeError,)
+
+
+def get_decoder(name: Optional[str] = None) -> Callable:
+    """
+    Returns a bytes/str -> object JSON decoder: the named one ("msgspec", "orjson",
+    "json") or the fastest one installed.
+    """
+    if name is None:
+        for name in ("msgspec", "orjson", "json"):
+            if name in DECODERS:
+                break
+    if name not in DECODERS:
+        raise ValueError(f"JSON decoder {name!r} is not available (installed: {sorted(DECODERS)})")
+    return DECODERS[name]
+
+
+def _float(value) -> float:
+    return float(value) if value not in (None, "") else 0.0
+
+
+class BookEvent:
+    """`book` snapshot of one token; bids/asks are kept as received ({"price", "size"} dicts)."""
+    __slots__ = ("asset_id", "market", "bids", "asks", "timestamp")
+    event_type = "book"
+
+    def __init__(self, asset_id, market, bids, asks, timestamp):
+        self.asset_id = asset_id
+        self.market = market
+        self.bids = bids
+        self.asks = asks
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "BookEvent":
+        return cls(d.get("asset_id"), d.get("market"), d.get("bids", d.get("buys")) or [],
+                   d.get("asks", d.get("sells")) or [], d.get("timestamp"))
+
+
+class PriceChange:
+    """One level update of a `price_change` event."""
+    __slots__ = ("asset_id", "side", "price", "size")
+
+    def __init__(self, asset_id, side, price, size):
+        self.asset_id = asset_id
+        self.side = side
+        self.price = price
+        self.size = size
+
+
+class PriceChangeEvent:
+    """`price_change` level updates, from both the per-event asset_id layout and the per-change one."""
+    __slots__ = ("market", "changes", "timestamp")
+    event_type = "price_change"
+
+    def __init__(self, market, changes: List[PriceChange], timestamp):
+        self.market = market
+        self.changes = changes
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PriceChangeEvent":
+        changes = d.get("price_changes")
+        if changes is None:
+            asset_id = d.get("asset_id")
+            changes = [PriceChange(asset_id, c["side"], c["price"], c["size"]) for c in d.get("changes", [])]
+        else:
+            changes = [PriceChange(c.get("asset_id"), c["side"], c["price"], c["size"]) for c in changes]
+        return cls(d.get("market"), changes, d.get("timestamp"))
+
+
+class TickSizeChangeEvent:
+    __slots__ = ("asset_id", "new_tick_size")
+    event_type = "tick_size_change"
+
+    def __init__(self, asset_id, new_tick_size: float):
+        self.asset_id = asset_id
+        self.new_tick_size = new_tick_size
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "TickSizeChangeEvent":
+        return cls(d.get("asset_id"), _float(d.get("new_tick_size")))
+
+
+class MakerOrder:
+    """A resting order matched by a trade."""
+    __slots__ = ("order_id", "matched_amount", "price")
+
+    def __init__(self, order_id, matched_amount: float, price: float):
+        self.order_id = order_id
+        self.matched_amount = matched_amount
+        self.price = price
+
+
+class TradeEvent:
+    """User channel `trade`: our order matched as taker or maker."""
+    __slots__ = ("id", "asset_id", "side", "size", "price", "status", "taker_order_id", "maker_orders")
+    event_type = "trade"
+
+    def __init__(self, id, asset_id, side, size: float, price: float, status, taker_order_id,
+                 maker_orders: List[MakerOrder]):
+        self.id = id
+        self.asset_id = asset_id
+        self.side = side
+        self.size = size
+        self.price = price
+        self.status = status
+        self.taker_order_id = taker_order_id
+        self.maker_orders = maker_orders
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "TradeEvent":
+        maker_orders = [MakerOrder(m.get("order_id"), _float(m.get("matched_amount")), _float(m.get("price")))
+                        for m in d.get("maker_orders") or []]
+        return cls(d.get("id"), d.get("asset_id"), d.get("side"), _float(d.get("size")), _float(d.get("price")),
+                   d.get("status"), d.get("taker_order_id"), maker_orders)
+
+
+class OrderEvent:
+    """
+    User channel `order` update. action is PLACEMENT, UPDATE or CANCELLATION; the
+    exchange's `type`/`id`/`size_matched` fields and the `action`/`order_id`/
+    `matched_amount` names are both accepted.
+    """
+    __slots__ = ("order_id", "asset_id", "action", "side", "price", "original_size", "matched_amount")
+    event_type = "order"
+
+    def __init__(self, order_id, asset_id, action, side, price: float, original_size: float, matched_amount: float):
+        self.order_id = order_id
+        self.asset_id = asset_id
+        self.action = action
+        self.side = side
+        self.price = price
+        self.original_size = original_size
+        self.matched_amount = matched_amount
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "OrderEvent":
+        return cls(d.get("order_id", d.get("id")), d.get("asset_id"), d.get("action", d.get("type")), d.get("side"),
+                   _float(d.get("price")), _float(d.get("original_size")),
+                   _float(d.get("matched_amount", d.get("size_matched"))))
+
+
+Event = Union[BookEvent, PriceChangeEvent, TickSizeChangeEvent, TradeEvent, OrderEvent, dict]
+
+EVENT_TYPES = {
+    cls.event_type: cls.from_dict
+    for cls in (BookEvent, PriceChangeEvent, TickSizeChangeEvent, TradeEvent, OrderEvent)
+}
+
+
+def parse_event(d) -> Event:
+    """Typed event for the known event types; other messages are returned unchanged."""
+    if not isinstance(d, dict):
+        return d
+    parse = EVENT_TYPES.get(d.get("event_type"))
+    return parse(d) if parse else d
+
+
+class EventDecoder:
+    """
+    Turns WebSocket frames into lists of events in one pass: JSON decoding with the
+    chosen decoder, then typed events selected by event_type (see parse_event).
+    Frames that are not JSON (e.g. "PONG") decode to an empty list.
+    """
+
+    def __init__(self, decoder: Optional[Union[str, Callable]] = None, typed: bool = True):
+        self.loads = decoder if callable(decoder) else get_decoder(decoder)
+        self.typed = typed
+
+    def __call__(self, frame) -> List[Event]:
+        try:
+            data = self.loads(frame)
+        except DECODE_ERRORS:
+            logging.debug(f"Ignoring non-JSON frame: {frame[:50]!r}")
+            return []
+        if not isinstance(data, list):
+            data = [data]
+        if not self.typed:
+            return data
+        return [parse_event(d) for d in data]
@@ -0,0 +1,297 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .polymarket_websocket_client import PolymarketWebSocketClient
+from .receive_queue import DROP_OLDEST, ReceiveQueue
+from .ws_events import EventDecoder, PriceChangeEvent
+
+
+def _hash(key: str) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to nodes. Every node owns `replicas` points on
+    the ring, so adding or removing a node only moves the keys of that node's arcs
+    (about 1/n of them) and leaves every other assignment unchanged.
+    """
+
+    def __init__(self, nodes: Iterable[int] = (), replicas: int = 64):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[int] = []
+        self.nodes: List[int] = []
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add(self, node: int):
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: int):
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node_for(self, key: str) -> int:
+        if not self._points:
+            raise ValueError("Hash ring has no nodes")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class _ShardQueue:
+    """
+    The pool's shared ReceiveQueue as one shard puts on it: events of assets that
+    the pool has assigned to another shard are dropped (see PolymarketWebSocketPool).
+    """
+
+    def __init__(self, pool: "PolymarketWebSocketPool", shard_id: int):
+        self.pool = pool
+        self.shard_id = shard_id
+
+    def __getattr__(self, name):
+        return getattr(self.pool.queue, name)
+
+    async def put(self, message):
+        message = self.pool._owned(self.shard_id, message)
+        if message is not None:
+            await self.pool.queue.put(message)
+
+    def put_nowait(self, message):
+        message = self.pool._owned(self.shard_id, message)
+        if message is not None:
+            self.pool.queue.put_nowait(message)
+
+
+class PolymarketWebSocketPool:
+    """
+    Market channel subscription spread over several WebSocket connections.
+
+    Asset ids are assigned to shards by a consistent hash ring; each shard is a
+    PolymarketWebSocketClient with its own connection, keep-alive and reconnect
+    (replaying only its own assets), so one dropped socket does not interrupt the
+    others. All shards put their decoded events on one shared ReceiveQueue, which a
+    single consumer passes to message_callback: one stream in arrival order, and
+    since an asset lives on exactly one shard, its events keep their order.
+
+    The pool grows by a shard whenever the assets exceed max_assets_per_shard per
+    shard and shrinks back (never below the initial count) once they fit in half
+    the shards; adding or removing shards moves only the assets whose ring owner changed.
+    A moved asset is reassigned before it is subscribed on its new shard and
+    unsubscribed on the old one, and events a shard receives for assets assigned
+    elsewhere are dropped before they reach the queue (counted as "stale"), so an
+    old shard's late price_change cannot be applied on top of the new shard's
+    book snapshot.
+
+    It has the subscription interface of PolymarketWebSocketClient (start,
+    add_subscriptions, remove_subscriptions, stop, stats), so it can stand in for
+    the market channel client of a WebSocketSession.
+    """
+
+    def __init__(
+        self,
+        shards: int = 4,
+        message_callback: Optional[Callable] = None,
+        ws_url: str = "wss://ws-subscriptions-clob.polymarket.com/ws/",
+        max_assets_per_shard: int = 500,
+        queue_size: int = 10000,
+        overflow: str = DROP_OLDEST,
+        conflate: bool = True,
+        replicas: int = 64
+    ):
+        """
+        Args:
+            shards (int, optional): Initial number of connections. Defaults to 4.
+            message_callback (Callable, optional): Async callback receiving the merged messages.
+            ws_url (str, optional): The WebSocket endpoint.
+            max_assets_per_shard (int, optional): Add shards beyond this average load. Defaults to 500.
+            queue_size (int, optional): Size of the shared receive queue. Defaults to 10000.
+            overflow (str, optional): Overflow policy of the shared queue. Defaults to "drop_oldest".
+            conflate (bool, optional): Merge book/price updates per asset while the callback
+                lags. Defaults to True.
+            replicas (int, optional): Ring points per shard. Defaults to 64.
+        """
+        self.message_callback = message_callback
+        self.websocket_url = ws_url
+        self.max_assets_per_shard = max_assets_per_shard
+        self.min_shards = max(shards, 1)
+        self.queue = ReceiveQueue(queue_size, overflow=overflow, conflate=conflate)
+        self.decoder = EventDecoder()
+        self.ring = HashRing(replicas=replicas)
+        self.shards: Dict[int, PolymarketWebSocketClient] = {}
+        # asset id -> shard id, in subscription order
+        self.assignments: Dict[str, int] = {}
+        self.running = False
+        self.task = None
+        self.stale = 0
+        self._next_shard = 0
+        for _ in range(self.min_shards):
+            self._new_shard()
+
+    def _new_shard(self) -> int:
+        shard_id = self._next_shard
+        self._next_shard += 1
+        self.shards[shard_id] = PolymarketWebSocketClient(ws_url=self.websocket_url, decoder=self.decoder,
+                                                          queue=_ShardQueue(self, shard_id))
+        self.ring.add(shard_id)
+        return shard_id
+
+    def shard_for(self, asset_id: str) -> int:
+        return self.ring.node_for(asset_id)
+
+    def _owned(self, shard_id: int, message):
+        """message without the events of assets assigned to another shard; None if nothing is left."""
+        assignments = self.assignments
+        events = message if isinstance(message, list) else [message]
+        stale = self.stale
+        kept = []
+        for event in events:
+            if isinstance(event, PriceChangeEvent):
+                changes = [change for change in event.changes
+                           if assignments.get(change.asset_id, shard_id) == shard_id]
+                if len(changes) < len(event.changes):
+                    self.stale += 1
+                    if not changes:
+                        continue
+                    event = PriceChangeEvent(event.market, changes, event.timestamp)
+            else:
+                asset_id = event.get("asset_id") if isinstance(event, dict) else getattr(event, "asset_id", None)
+                if asset_id is not None and assignments.get(asset_id, shard_id) != shard_id:
+                    self.stale += 1
+                    continue
+            kept.append(event)
+        if self.stale == stale:
+            return message
+        if isinstance(message, list):
+            return kept or None
+        return kept[0] if kept else None
+
+    def assets_of(self, shard_id: int) -> List[str]:
+        return list(self.shards[shard_id].asset_ids)
+
+    async def _subscribe_on(self, shard_id: int, asset_ids: List[str]):
+        client = self.shards[shard_id]
+        if client.running:
+            await client.add_subscriptions(assets_ids=asset_ids)
+            return
+        # Connected with these assets now, or once the pool starts
+        client.asset_ids.update(dict.fromkeys(asset_ids))
+        if self.running:
+            await client.start("market", asset_ids=list(client.asset_ids))
+
+    async def _unsubscribe_on(self, shard_id: int, asset_ids: List[str]):
+        await self.shards[shard_id].remove_subscriptions(assets_ids=asset_ids)
+
+    @staticmethod
+    def _group(assignments: Dict[str, int]) -> Dict[int, List[str]]:
+        groups: Dict[int, List[str]] = {}
+        for asset_id, shard_id in assignments.items():
+            groups.setdefault(shard_id, []).append(asset_id)
+        return groups
+
+    async def _rebalance(self):
+        """Moves every asset whose ring owner changed to its new shard."""
+        owners = {asset_id: (old, self.shard_for(asset_id)) for asset_id, old in self.assignments.items()}
+        moves = {asset_id: (old, new) for asset_id, (old, new) in owners.items() if old != new}
+        if not moves:
+            return
+        # From here on the old shards' events of these assets are dropped as stale
+        for asset_id, (_, new) in moves.items():
+            self.assignments[asset_id] = new
+        for shard_id, asset_ids in self._group({a: new for a, (_, new) in moves.items()}).items():
+            await self._subscribe_on(shard_id, asset_ids)
+        for shard_id, asset_ids in self._group({a: old for a, (old, _) in moves.items()}).items():
+            await self._unsubscribe_on(shard_id, asset_ids)
+        logging.info(f"Moved {len(moves)} assets between {len(self.shards)} WebSocket shards")
+
+    async def add_shard(self) -> int:
+        """Opens one more shard and moves its share of the assets to it."""
+        shard_id = self._new_shard()
+        await self._rebalance()
+        return shard_id
+
+    async def remove_shard(self, shard_id: int):
+        """Closes a shard after moving its assets to the remaining ones."""
+        if len(self.shards) <= 1 or shard_id not in self.shards:
+            return
+        self.ring.remove(shard_id)
+        await self._rebalance()
+        await self.shards.pop(shard_id).stop()
+
+    async def add_subscriptions(self, markets: List[str] = None, assets_ids: List[str] = None):
+        """Subscribes asset ids on their shards, adding shards if the pool is over capacity."""
+        new_assets = [a for a in dict.fromkeys(assets_ids or []) if a not in self.assignments]
+        if not new_assets:
+            return True
+        while len(self.assignments) + len(new_assets) > self.max_assets_per_shard * len(self.shards):
+            await self.add_shard()
+        assignments = {asset_id: self.shard_for(asset_id) for asset_id in new_assets}
+        self.assignments.update(assignments)
+        for shard_id, asset_ids in self._group(assignments).items():
+            await self._subscribe_on(shard_id, asset_ids)
+        return True
+
+    async def remove_subscriptions(self, markets: List[str] = None, assets_ids: List[str] = None):
+        """Unsubscribes asset ids, closing added shards again once the rest fit in half of them."""
+        removed = {a: self.assignments.pop(a) for a in dict.fromkeys(assets_ids or []) if a in self.assignments}
+        for shard_id, asset_ids in self._group(removed).items():
+            await self._unsubscribe_on(shard_id, asset_ids)
+        while (len(self.shards) > self.min_shards
+               and len(self.assignments) <= self.max_assets_per_shard * (len(self.shards) - 1) // 2):
+            await self.remove_shard(max(self.shards))
+        return True
+
+    async def consume(self):
+        """Passes the merged messages of all shards to message_callback, in arrival order."""
+        get = self.queue.get
+        while True:
+            message = await get()
+            if self.message_callback:
+                try:
+                    await self.message_callback(message)
+                except Exception as e:
+                    logging.error(f"Error handling WebSocket message: {e}")
+
+    async def start(self, channel_type: str = "market", markets: List[str] = None, asset_ids: List[str] = None):
+        """Connects the shards that have assets and starts the merged consumer."""
+        if channel_type != "market":
+            raise ValueError("Only the market channel can be sharded.")
+        self.running = True
+        self.task = asyncio.create_task(self.consume())
+        await self.add_subscriptions(assets_ids=asset_ids)
+        for client in self.shards.values():
+            if client.asset_ids and not client.running:
+                await client.start("market", asset_ids=list(client.asset_ids))
+        return self.task
+
+    async def stop(self):
+        self.running = False
+        for client in self.shards.values():
+            await client.stop()
+        if self.task:
+            self.task.cancel()
+
+    def stats(self) -> dict:
+        """Shared queue counters, stale events dropped, plus the asset count and state of every shard."""
+        return dict(self.queue.stats(), stale=self.stale, shards={
+            shard_id: {"assets": len(client.asset_ids), "running": client.running}
+            for shard_id, client in self.shards.items()
+        })
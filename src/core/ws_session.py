@@ -0,0 +1,158 @@
+import logging
+from collections import Counter
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from .polymarket_websocket_client import PolymarketWebSocketClient
+from .receive_queue import BLOCK
+from .ws_events import EventDecoder
+from .ws_pool import PolymarketWebSocketPool
+
+USER = "user"
+MARKET = "market"
+CHANNELS = (USER, MARKET)
+
+
+class WebSocketSession:
+    """
+    The user and market channel connections, shared by every component of the bot.
+
+    Components register a handler per channel and subscribe to the markets (user
+    channel) or asset ids (market channel) they need. Subscriptions are reference
+    counted, so two components can watch the same asset and one unsubscribing does
+    not affect the other; changes are sent on the open connection without
+    reconnecting, and each client replays the current set after a reconnect.
+    A channel is connected the first time it is needed: the user channel when it is
+    started (it receives all of the user's orders), the market channel with its
+    first asset id. With market_shards > 1 the market channel is a
+    PolymarketWebSocketPool spreading the asset ids over several connections.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        api_passphrase: Optional[str] = None,
+        ws_url: str = "wss://ws-subscriptions-clob.polymarket.com/ws/",
+        queue_size: int = 1000,
+        market_shards: int = 1
+    ):
+        """
+        Args:
+            api_key (str, optional): API credentials for the user channel.
+            api_secret (str, optional): API credentials for the user channel.
+            api_passphrase (str, optional): API credentials for the user channel.
+            ws_url (str, optional): The WebSocket endpoint.
+            queue_size (int, optional): Receive queue size of each channel. Defaults to 1000.
+            market_shards (int, optional): Market channel connections, see PolymarketWebSocketPool.
+                Defaults to 1.
+        """
+        self.handlers: Dict[str, List[Callable]] = {channel: [] for channel in CHANNELS}
+        self.clients: Dict[str, PolymarketWebSocketClient] = {
+            # Order updates must not be dropped; market data is conflated per asset
+            USER: PolymarketWebSocketClient(
+                api_key=api_key, api_secret=api_secret, api_passphrase=api_passphrase,
+                message_callback=partial(self._dispatch, USER), ws_url=ws_url,
+                decoder=EventDecoder(), queue_size=queue_size, overflow=BLOCK
+            ),
+        }
+        if market_shards > 1:
+            self.clients[MARKET] = PolymarketWebSocketPool(
+                shards=market_shards, message_callback=partial(self._dispatch, MARKET), ws_url=ws_url,
+                queue_size=queue_size * market_shards, conflate=True
+            )
+        else:
+            self.clients[MARKET] = PolymarketWebSocketClient(
+                message_callback=partial(self._dispatch, MARKET), ws_url=ws_url,
+                decoder=EventDecoder(), queue_size=queue_size, conflate=True
+            )
+        self._refs: Dict[str, Counter] = {channel: Counter() for channel in CHANNELS}
+
+    def add_handler(self, channel: str, handler: Callable):
+        """Registers an async handler receiving every message of channel."""
+        self.handlers[channel].append(handler)
+
+    def remove_handler(self, channel: str, handler: Callable):
+        if handler in self.handlers[channel]:
+            self.handlers[channel].remove(handler)
+
+    async def _dispatch(self, channel: str, message):
+        for handler in list(self.handlers[channel]):
+            try:
+                await handler(message)
+            except Exception as e:
+                logging.error(f"Error in {channel} channel handler: {e}")
+
+    def is_running(self, channel: str) -> bool:
+        return self.clients[channel].running
+
+    async def start(self, channel: str = USER):
+        """Connects channel with its current subscription, unless already connected."""
+        client = self.clients[channel]
+        if client.running:
+            return client.task
+        refs = self._refs[channel]
+        if channel == USER:
+            return await client.start(USER, markets=list(refs))
+        return await client.start(MARKET, asset_ids=list(refs))
+
+    async def _add(self, channel: str, ids: List[str]):
+        refs = self._refs[channel]
+        new_ids = [i for i in dict.fromkeys(ids) if refs[i] == 0]
+        refs.update(ids)
+        if not new_ids:
+            return
+        client = self.clients[channel]
+        if not client.running:
+            if channel == MARKET:
+                await self.start(MARKET)
+            return
+        if channel == USER:
+            await client.add_subscriptions(markets=new_ids)
+        else:
+            await client.add_subscriptions(assets_ids=new_ids)
+
+    async def _remove(self, channel: str, ids: List[str]):
+        refs = self._refs[channel]
+        old_ids = []
+        for i in ids:
+            if refs[i] > 0:
+                refs[i] -= 1
+                if refs[i] == 0:
+                    del refs[i]
+                    old_ids.append(i)
+        if not old_ids or not self.clients[channel].running:
+            return
+        if channel == USER:
+            await self.clients[USER].remove_subscriptions(markets=old_ids)
+        else:
+            await self.clients[MARKET].remove_subscriptions(assets_ids=old_ids)
+
+    async def subscribe(self, assets_ids: List[str] = None, markets: List[str] = None):
+        """
+        Adds asset ids to the market channel (connecting it if needed) and markets
+        (condition ids) to the user channel.
+        """
+        if assets_ids:
+            await self._add(MARKET, list(assets_ids))
+        if markets:
+            await self._add(USER, list(markets))
+
+    async def unsubscribe(self, assets_ids: List[str] = None, markets: List[str] = None):
+        """Releases asset ids / markets; they are unsubscribed once nobody else uses them."""
+        if assets_ids:
+            await self._remove(MARKET, list(assets_ids))
+        if markets:
+            await self._remove(USER, list(markets))
+
+    def subscriptions(self) -> Dict[str, List[str]]:
+        """Markets of the user channel and asset ids of the market channel currently subscribed."""
+        return {USER: list(self._refs[USER]), MARKET: list(self._refs[MARKET])}
+
+    async def stop(self):
+        for client in self.clients.values():
+            await client.stop()
+
+    def stats(self) -> Dict[str, dict]:
+        """Receive queue counters per channel."""
+        return {channel: client.stats() for channel, client in self.clients.items()}
@@ -0,0 +1,349 @@
+import csv
+import json
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .storage import (
+    BOOK_COLUMNS,
+    CSV_HEADER,
+    TOKENS,
+    BookLevels,
+    CsvMarketDataWriter,
+    MarketDataWriter,
+    book_asset_id,
+    book_levels,
+)
+
+MAGIC = b"PMBA"
+VERSION = 1
+PRICE_SCALE = 10_000  # prices are stored as integer multiples of 0.0001
+
+KEYFRAME = 0
+DELTA = 1
+
+# kind, tick index, timestamp (epoch seconds), number of level entries
+RECORD_HEADER = struct.Struct("<BIdI")
+# book slot, side (0 = bid, 1 = ask), price in PRICE_SCALE units, size (0 removes the level)
+ENTRY_DTYPE = np.dtype([("slot", "<u1"), ("side", "<u1"), ("price", "<u2"), ("size", "<f8")])
+
+Levels = Dict[int, float]
+
+
+def _to_epoch(timestamp) -> float:
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, datetime):
+        dt = timestamp
+    else:
+        dt = datetime.fromisoformat(str(timestamp))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _to_level_dicts(book) -> Tuple[Levels, Levels]:
+    levels = book if isinstance(book, BookLevels) else book_levels(book)
+    bids = {int(round(p * PRICE_SCALE)): float(s) for p, s in zip(levels.bid_prices, levels.bid_sizes)}
+    asks = {int(round(p * PRICE_SCALE)): float(s) for p, s in zip(levels.ask_prices, levels.ask_sizes)}
+    return bids, asks
+
+
+def _to_book_levels(bids: Levels, asks: Levels) -> BookLevels:
+    bid_ticks = sorted(bids, reverse=True)
+    ask_ticks = sorted(asks)
+    return BookLevels(
+        np.array(bid_ticks, dtype=np.float64) / PRICE_SCALE,
+        np.array([bids[t] for t in bid_ticks], dtype=np.float64),
+        np.array(ask_ticks, dtype=np.float64) / PRICE_SCALE,
+        np.array([asks[t] for t in ask_ticks], dtype=np.float64),
+    )
+
+
+def _diff(old: Levels, new: Levels) -> List[Tuple[int, float]]:
+    changes = [(tick, size) for tick, size in new.items() if old.get(tick) != size]
+    changes.extend((tick, 0.0) for tick in old if tick not in new)
+    return changes
+
+
+class BookArchiveWriter:
+    """
+    Appends order book snapshots to a delta-encoded archive file.
+
+    Every keyframe_interval ticks a full keyframe of all books is written; the ticks
+    in between only store the levels whose size changed (size 0 marks a removed
+    level). The file starts with a small JSON header naming the book slots, e.g.
+    ["token1", "token2"]. Reopening an existing archive continues after its last
+    complete tick (dropping a partly written one, and any beyond max_ticks),
+    starting with a keyframe.
+    """
+
+    def __init__(self, path: str, keys: List[str], keyframe_interval: int = 100, meta: Optional[dict] = None,
+                 max_ticks: Optional[int] = None):
+        """
+        Args:
+            path (str): The archive file.
+            keys (list): Names of the books stored on each tick.
+            keyframe_interval (int, optional): Ticks between full keyframes. Defaults to 100.
+            meta (dict, optional): Extra JSON metadata stored in the header (e.g. token ids).
+            max_ticks (int, optional): When reopening, keep at most this many ticks, e.g. the
+                rows of a file written alongside. Defaults to all of them.
+        """
+        self.path = path
+        self.keys = list(keys)
+        self.keyframe_interval = keyframe_interval
+        self._slots = {key: slot for slot, key in enumerate(self.keys)}
+        self._state: Dict[str, Tuple[Levels, Levels]] = {key: ({}, {}) for key in self.keys}
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            reader = BookArchiveReader(path)
+            if reader.keys != self.keys:
+                raise ValueError(f"Archive {path} stores books {reader.keys}, not {self.keys}")
+            self.count = len(reader)
+            end = reader.end
+            if max_ticks is not None and max_ticks < self.count:
+                # Start of the first record to drop
+                end = int(reader._offsets[max_ticks]) - RECORD_HEADER.size
+                self.count = max_ticks
+            reader.close()
+            # Cut off a record torn by a crash (or beyond max_ticks) so the new ones follow
+            self._file = open(path, "r+b")
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self.count = 0
+            self._file = open(path, "wb")
+            header = json.dumps({
+                "version": VERSION,
+                "keys": self.keys,
+                "price_scale": PRICE_SCALE,
+                "meta": meta or {},
+            }).encode("utf-8")
+            self._file.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self._since_keyframe = None
+
+    def append(self, timestamp, books: Dict[str, object]):
+        """
+        Stores one tick.
+
+        Args:
+            timestamp: ISO string, datetime or epoch seconds.
+            books (dict): Book per key, as OrderBookSummary, recorded repr() string or
+                BookLevels. Keys that are missing keep their previous book.
+        """
+        new_state = dict(self._state)
+        for key, book in books.items():
+            new_state[key] = _to_level_dicts(book)
+
+        is_keyframe = self._since_keyframe is None or self._since_keyframe + 1 >= self.keyframe_interval
+        entries = []
+        for key in self.keys:
+            slot = self._slots[key]
+            new_bids, new_asks = new_state[key]
+            if is_keyframe:
+                bid_changes, ask_changes = list(new_bids.items()), list(new_asks.items())
+            else:
+                old_bids, old_asks = self._state[key]
+                bid_changes, ask_changes = _diff(old_bids, new_bids), _diff(old_asks, new_asks)
+            entries.extend((slot, 0, tick, size) for tick, size in bid_changes)
+            entries.extend((slot, 1, tick, size) for tick, size in ask_changes)
+
+        kind = KEYFRAME if is_keyframe else DELTA
+        self._file.write(RECORD_HEADER.pack(kind, self.count, _to_epoch(timestamp), len(entries)))
+        if entries:
+            self._file.write(np.array(entries, dtype=ENTRY_DTYPE).tobytes())
+
+        self._state = new_state
+        self._since_keyframe = 0 if is_keyframe else self._since_keyframe + 1
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class BookArchiveReader:
+    """
+    Random access to a delta-encoded archive.
+
+    Opening the file memory-maps it and indexes the record headers; snapshot(i)
+    then replays from the closest keyframe at or before i. Iterating the reader
+    applies each delta once, so a full pass costs one decode per record.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:4] != MAGIC:
+            raise ValueError(f"{path} is not a book archive")
+        (header_len,) = struct.unpack_from("<I", self._mm, 4)
+        header = json.loads(self._mm[8:8 + header_len].decode("utf-8"))
+        self.keys: List[str] = header["keys"]
+        self.meta: dict = header.get("meta", {})
+        self.price_scale = header.get("price_scale", PRICE_SCALE)
+
+        offsets, kinds, timestamps, counts = [], [], [], []
+        pos = 8 + header_len
+        size = len(self._mm)
+        while pos + RECORD_HEADER.size <= size:
+            kind, _, timestamp, n = RECORD_HEADER.unpack_from(self._mm, pos)
+            end = pos + RECORD_HEADER.size + n * ENTRY_DTYPE.itemsize
+            if end > size:
+                break  # torn write at the end of the file
+            offsets.append(pos + RECORD_HEADER.size)
+            kinds.append(kind)
+            timestamps.append(timestamp)
+            counts.append(n)
+            pos = end
+        # End of the last complete record
+        self.end = pos
+
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self._counts = np.array(counts, dtype=np.int64)
+        self.kinds = np.array(kinds, dtype=np.uint8)
+        self.timestamps = (np.array(timestamps, dtype=np.float64) * 1e6).astype("datetime64[us]")
+        self._keyframes = np.flatnonzero(self.kinds == KEYFRAME)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def _entries(self, index: int) -> np.ndarray:
+        if not self._counts[index]:
+            return np.empty(0, dtype=ENTRY_DTYPE)
+        return np.frombuffer(self._mm, dtype=ENTRY_DTYPE, count=int(self._counts[index]),
+                             offset=int(self._offsets[index]))
+
+    def _apply(self, state: List[Tuple[Levels, Levels]], index: int):
+        if self.kinds[index] == KEYFRAME:
+            for bids, asks in state:
+                bids.clear()
+                asks.clear()
+        entries = self._entries(index)
+        for slot, side, tick, size in zip(entries["slot"].tolist(), entries["side"].tolist(),
+                                          entries["price"].tolist(), entries["size"].tolist()):
+            levels = state[slot][side]
+            if size == 0:
+                levels.pop(tick, None)
+            else:
+                levels[tick] = size
+
+    def _levels(self, state) -> Dict[str, BookLevels]:
+        return {key: _to_book_levels(*state[slot]) for slot, key in enumerate(self.keys)}
+
+    def snapshot(self, index: int) -> Dict[str, BookLevels]:
+        """Rebuilds the books stored at tick index."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Tick {index} out of range for archive with {len(self)} ticks")
+        start = self._keyframes[np.searchsorted(self._keyframes, index, side="right") - 1]
+        state = [({}, {}) for _ in self.keys]
+        for i in range(start, index + 1):
+            self._apply(state, i)
+        return self._levels(state)
+
+    def __iter__(self) -> Iterator[Dict[str, BookLevels]]:
+        state = [({}, {}) for _ in self.keys]
+        for i in range(len(self)):
+            self._apply(state, i)
+            yield self._levels(state)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _count_rows(path: str) -> int:
+    """Data rows of a CSV file, skipping header rows."""
+    with open(path, newline="") as f:
+        return sum(1 for row in csv.reader(f) if row and row[0] != "timestamp")
+
+
+def archive_path(folder: str, slug: str) -> str:
+    """Returns where the delta backend stores the book archive of a market."""
+    return os.path.join(folder, f"{slug}_books.pmba")
+
+
+class DeltaMarketDataWriter(MarketDataWriter):
+    """
+    Storage backend writing the scalar columns to <slug>_combined.csv (without the
+    repr() book columns) and both order books to a delta-encoded <slug>_books.pmba.
+
+    Each tick goes to the archive first, so a crash can leave the archive one tick
+    ahead of the CSV, never behind; reopening drops archive ticks beyond the CSV
+    rows, as read_archive_books pairs them by position.
+    """
+
+    def __init__(self, folder: str, slug: str, keyframe_interval: int = 100):
+        csv_path = os.path.join(folder, f"{slug}_combined.csv")
+        self.csv_writer = CsvMarketDataWriter(csv_path, columns=[c for c in CSV_HEADER if c not in BOOK_COLUMNS])
+        self._csv_rows = _count_rows(csv_path)
+        self.path = archive_path(folder, slug)
+        self.keyframe_interval = keyframe_interval
+        self.archive: Optional[BookArchiveWriter] = None
+
+    def append(self, row: dict):
+        books = {token: row.get(f"{token}_orderbook") for token in TOKENS}
+        if self.archive is None:
+            token_ids = {token: book_asset_id(book) for token, book in books.items() if book_asset_id(book)}
+            self.archive = BookArchiveWriter(self.path, list(TOKENS), self.keyframe_interval,
+                                             meta={"token_ids": token_ids}, max_ticks=self._csv_rows)
+        self.archive.append(row["timestamp"], books)
+        self.archive.flush()
+        self.csv_writer.append(row)
+
+    def flush(self):
+        if self.archive:
+            self.archive.flush()
+        self.csv_writer.flush()
+
+    def close(self):
+        if self.archive:
+            self.archive.close()
+        self.csv_writer.close()
+
+
+def read_archive_books(path: str, data) -> None:
+    """Fills the book arrays of a MarketData read from a delta backend CSV from its archive."""
+    buffers = {name: [] for name in data.books if not name.endswith("_offsets")}
+    counts = {f"{token}_{side}": [] for token in TOKENS for side in ("bid", "ask")}
+    with BookArchiveReader(path) as reader:
+        for index, books in enumerate(reader):
+            if index >= len(data):
+                break
+            for token in TOKENS:
+                levels = books.get(token)
+                for side, prices, sizes in (("bid", levels.bid_prices, levels.bid_sizes),
+                                            ("ask", levels.ask_prices, levels.ask_sizes)):
+                    buffers[f"{token}_{side}_price"].append(prices)
+                    buffers[f"{token}_{side}_size"].append(sizes)
+                    counts[f"{token}_{side}"].append(len(prices))
+        data.token_ids = {**reader.meta.get("token_ids", {}), **data.token_ids}
+
+    for name, chunks in buffers.items():
+        data.books[name] = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float64)
+    for name, values in counts.items():
+        values += [0] * (len(data) - len(values))
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(values, out=offsets[1:])
+        data.books[f"{name}_offsets"] = offsets
@@ -0,0 +1,129 @@
+import asyncio
+import csv
+import logging
+import os
+from typing import List, Optional
+
+
+class CsvTailer:
+    """
+    Incrementally reads rows appended to a CSV file.
+
+    The tailer remembers the byte offset it has consumed so each read only parses
+    the bytes written since the previous call. A trailing line without a newline
+    is kept back until it is completed, and a truncated or replaced file (new inode
+    or size below the offset) is detected and read again from the start.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.25):
+        """
+        Args:
+            path (str): Path of the CSV file to follow.
+            poll_interval (float, optional): Seconds between file size checks while waiting
+                for new data. Defaults to 0.25.
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self.offset = 0
+        self.header: Optional[List[str]] = None
+        self.rows_read = 0
+        self._partial = b""
+        self._inode = None
+        self._new_data = asyncio.Event()
+
+    def reset(self):
+        """Forget the read position so the file is consumed again from the start."""
+        self.offset = 0
+        self.header = None
+        self._partial = b""
+        self._inode = None
+
+    def notify(self):
+        """Wake up a pending wait_for_rows call, e.g. right after a writer flushed a row."""
+        self._new_data.set()
+
+    def has_new_data(self) -> bool:
+        """Cheap check (one stat call) whether the file grew or was rotated since the last read."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if self._inode is not None and stat.st_ino != self._inode:
+            return True
+        return stat.st_size != self.offset
+
+    def read_new_rows(self) -> List[dict]:
+        """
+        Returns the rows appended since the previous call as dicts keyed by the header.
+
+        Header rows repeated inside the file (the streamer writes one every time it
+        restarts) are skipped.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        if self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self.offset):
+            logging.info(f"CSV file {self.path} was rotated or truncated, reading from the start")
+            self.reset()
+        self._inode = stat.st_ino
+
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        self.offset += len(chunk)
+
+        data = self._partial + chunk
+        end = data.rfind(b"\n")
+        if end == -1:
+            self._partial = data
+            return []
+        self._partial = data[end + 1:]
+
+        lines = data[:end].decode("utf-8").split("\n")
+        rows = []
+        for values in csv.reader(lines):
+            if not values:
+                continue
+            if self.header is None:
+                self.header = values
+                continue
+            if values == self.header:
+                continue
+            rows.append(dict(zip(self.header, values)))
+
+        self.rows_read += len(rows)
+        return rows
+
+    async def wait_for_rows(self, timeout: Optional[float] = None) -> List[dict]:
+        """
+        Waits until new complete rows are available and returns them.
+
+        Returns as soon as notify() is called or a size change is seen by polling,
+        or an empty list once timeout seconds have passed without new rows.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        while True:
+            if self.has_new_data():
+                rows = self.read_new_rows()
+                if rows:
+                    return rows
+
+            wait = self.poll_interval
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return []
+                wait = min(wait, remaining)
+
+            self._new_data.clear()
+            try:
+                await asyncio.wait_for(self._new_data.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
@@ -1,8 +1,13 @@
 import asyncio
 import os
 import csv
+import time
 from datetime import datetime
+from typing import Callable, List, Optional
 from core.clob_client import PolymarketClient  # Update with your actual module name
+from core.latency import LatencyRecorder
+from core.order_book import OrderBooks
+from .storage import CSV_HEADER, open_writer
 
 class DataStreamer:
     def __init__(self, market_id: str, interval_seconds: int = 60, filename: str = "data_stream.csv"):
@@ -33,16 +38,13 @@ class DataStreamer:
             while True:
                 timestamp = datetime.utcnow().isoformat()
                 try:
-                    midpoint = await asyncio.to_thread(self.client.get_midpoint_price, self.market_id)
-                    best_buy = await asyncio.to_thread(self.client.get_price, self.market_id, "BUY")
-                    best_sell = await asyncio.to_thread(self.client.get_price, self.market_id, "SELL")
-                    spread = await asyncio.to_thread(self.client.get_spread, self.market_id)
+                    snapshot = await asyncio.to_thread(self.client.get_market_snapshot, self.market_id)
                 except Exception as e:
                     print(f"Error fetching data for market {self.market_id}: {e}")
                     await asyncio.sleep(1)
                     continue
 
-                row = [timestamp, midpoint,best_buy,best_sell,  spread]
+                row = [timestamp] + (snapshot.top_of_book() if snapshot else [None] * 4)
                 writer.writerow(row)
                 csvfile.flush()
                 print(f"Data written at {timestamp} for market {self.market_id}")
@@ -50,22 +52,36 @@ class DataStreamer:
 
 
 class MarketDataStreamer:
-    def __init__(self, slug: str, token1: str, token2: str, interval_seconds: int = 60):
+    def __init__(self, slug: str, token1: str, token2: str, interval_seconds: int = 60,
+                 on_write: Optional[Callable[[], None]] = None, storage="csv",
+                 latency: Optional[LatencyRecorder] = None):
         """
         Initialize the MarketDataStreamer for a market identified by its slug.
-        This streamer fetches data for both tokens and writes the combined data to one CSV file.
+        This streamer fetches data for both tokens and writes the combined data to one file.
 
         Args:
             slug (str): The market slug (used as folder name).
             token1 (str): The first token's id.
             token2 (str): The second token's id.
             interval_seconds (int, optional): The streaming interval in seconds. Defaults to 60.
+            on_write (Callable, optional): Called once appended rows are durable (after every row
+                except while the npy backend buffers them), e.g. CsvTailer.notify.
+            storage (optional): "csv" (default), "npy" for the columnar backend, or a
+                MarketDataWriter instance.
+            latency (LatencyRecorder, optional): Receives the fetch and write stages of every row.
         """
         self.slug = slug
         self.token1 = token1
         self.token2 = token2
         self.interval_seconds = interval_seconds
+        self.on_write = on_write
+        self.storage = storage
+        self.latency = latency
+        # Timestamps of rows appended but not durable yet
+        self._unwritten: List[str] = []
         self.client = PolymarketClient()
+        # Local copy of the latest books, shared with strategies through TradingBot
+        self.books = OrderBooks()
 
         # Create a folder for this market if it does not exist.
         self.folder = os.path.join(os.getcwd(), slug)
@@ -74,52 +90,50 @@ class MarketDataStreamer:
         # Create the CSV file path for combined data.
         self.filename = os.path.join(self.folder, f"{slug}_combined.csv")
 
+    def _appended(self, writer, timestamp: str):
+        """Marks appended rows written and calls on_write once the writer made them durable."""
+        self._unwritten.append(timestamp)
+        if writer.pending:
+            return
+        if self.latency:
+            for written in self._unwritten:
+                self.latency.mark(written, "written")
+        self._unwritten.clear()
+        if self.on_write:
+            self.on_write()
+
     async def stream(self):
         """
         Starts streaming data for both tokens concurrently and writes a single row for each timestamp.
         """
-        with open(self.filename, "a", newline="") as csvfile:
-            writer = csv.writer(csvfile)
-            # Write a header row; adjust columns as needed.
-            header = [
-                "timestamp",
-                "token1_midpoint", "token1_best_buy", "token1_best_sell", "token1_spread",
-                "token2_midpoint", "token2_best_buy", "token2_best_sell", "token2_spread",
-                "token1_orderbook","token2_orderbook"
-            ]
-            writer.writerow(header)
-            csvfile.flush()
-
+        with open_writer(self.storage, self.folder, self.slug) as writer:
             while True:
                 timestamp = datetime.utcnow().isoformat()
+                fetch_start = time.perf_counter_ns()
                 try:
-                    # Query both tokens concurrently using asyncio.gather.
-                    token1_data, token2_data, orderbook_data = await asyncio.gather(
-                        asyncio.gather(
-                            asyncio.to_thread(self.client.get_midpoint_price, self.token1),
-                            asyncio.to_thread(self.client.get_price, self.token1, "BUY"),
-                            asyncio.to_thread(self.client.get_price, self.token1, "SELL"),
-                            asyncio.to_thread(self.client.get_spread, self.token1),
-                        ),
-                        asyncio.gather(
-                            asyncio.to_thread(self.client.get_midpoint_price, self.token2),
-                            asyncio.to_thread(self.client.get_price, self.token2, "BUY"),
-                            asyncio.to_thread(self.client.get_price, self.token2, "SELL"),
-                            asyncio.to_thread(self.client.get_spread, self.token2),
-                        ),
-                        asyncio.gather(
-                            asyncio.to_thread(self.client.get_order_book, self.token1),
-                            asyncio.to_thread(self.client.get_order_book, self.token2),
-                        )
+                    # One order book request per token; top-of-book metrics are derived from it.
+                    snapshots = await asyncio.gather(
+                        asyncio.to_thread(self.client.get_market_snapshot, self.token1),
+                        asyncio.to_thread(self.client.get_market_snapshot, self.token2),
                     )
                 except Exception as e:
                     print(f"Error fetching data for market {self.slug}: {e}")
                     await asyncio.sleep(1)
                     continue
+                if self.latency:
+                    self.latency.mark(timestamp, "fetch_start", fetch_start)
+                    self.latency.mark(timestamp, "fetched")
+
+                token1_data, token2_data = [
+                    snapshot.top_of_book() if snapshot else [None] * 4 for snapshot in snapshots
+                ]
+                orderbook_data = [snapshot.book if snapshot else None for snapshot in snapshots]
+                for summary in orderbook_data:
+                    self.books.apply_summary(summary)
 
                 # Combine the results into one row.
-                row = [timestamp] + token1_data + token2_data + orderbook_data
-                writer.writerow(row)
-                csvfile.flush()
+                values = [timestamp] + token1_data + token2_data + orderbook_data
+                writer.append(dict(zip(CSV_HEADER, values)))
+                self._appended(writer, timestamp)
                 print(f"Data written at {timestamp} for market {self.slug}")
                 await asyncio.sleep(self.interval_seconds)
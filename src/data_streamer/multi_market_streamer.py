@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from core.clob_client import PolymarketClient
+from core.market_snapshot import MarketSnapshot
+from core.order_book import OrderBooks
+from .storage import CSV_HEADER, MarketDataWriter, open_writer
+
+
+class StreamedMarket(NamedTuple):
+    slug: str
+    token1: str
+    token2: str
+
+
+def markets_from_gamma(markets: Iterable[dict]) -> List[StreamedMarket]:
+    """
+    Converts Gamma API market records into StreamedMarket entries.
+    Markets without two CLOB token ids are skipped.
+    """
+    streamed = []
+    for market in markets:
+        token_ids = market.get("clobTokenIds")
+        if isinstance(token_ids, str):
+            token_ids = json.loads(token_ids)
+        if market.get("slug") and token_ids and len(token_ids) >= 2:
+            streamed.append(StreamedMarket(market["slug"], token_ids[0], token_ids[1]))
+    return streamed
+
+
+class MultiMarketStreamer:
+    """
+    Streams many markets from one process with batched order book requests.
+
+    Every tick the token ids of all markets are split into batches of batch_size and
+    fetched with get_order_books, at most max_concurrency batches in flight. Each
+    market gets its own folder and writer, with the same rows as MarketDataStreamer.
+    """
+
+    def __init__(
+        self,
+        markets: Iterable,
+        interval_seconds: int = 60,
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        storage="csv",
+        root: Optional[str] = None,
+        client: Optional[PolymarketClient] = None
+    ):
+        """
+        Args:
+            markets (iterable): StreamedMarket or (slug, token1, token2) entries, or Gamma market dicts.
+            interval_seconds (int, optional): Time between ticks. Defaults to 60.
+            batch_size (int, optional): Token ids per get_order_books request. Defaults to 100.
+            max_concurrency (int, optional): Batches fetched concurrently. Defaults to 4.
+            storage (optional): "csv", "npy" or "delta", see storage.open_writer. Defaults to "csv".
+            root (str, optional): Folder holding the per-market folders. Defaults to the working directory.
+            client (PolymarketClient, optional): Client to use; one is created if omitted.
+        """
+        markets = list(markets)
+        if markets and isinstance(markets[0], dict):
+            markets = markets_from_gamma(markets)
+        self.markets = [StreamedMarket(*market) for market in markets]
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.storage = storage
+        self.root = root or os.getcwd()
+        self.client = client or PolymarketClient()
+        self.books = OrderBooks()
+        self.writers: Dict[str, MarketDataWriter] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.token_ids = list(dict.fromkeys(
+            token for market in self.markets for token in (market.token1, market.token2)
+        ))
+
+    def batches(self) -> List[List[str]]:
+        return [self.token_ids[i:i + self.batch_size] for i in range(0, len(self.token_ids), self.batch_size)]
+
+    async def _fetch_batch(self, token_ids: List[str]) -> list:
+        async with self._semaphore:
+            return await asyncio.to_thread(self.client.get_order_books, token_ids)
+
+    async def fetch_snapshots(self) -> Dict[str, MarketSnapshot]:
+        """Fetches the books of all tokens and returns their snapshots by token id."""
+        results = await asyncio.gather(*(self._fetch_batch(batch) for batch in self.batches()),
+                                       return_exceptions=True)
+        snapshots = {}
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error(f"Order book batch failed: {result}")
+                continue
+            for book in result or []:
+                snapshot = MarketSnapshot.from_order_book(book)
+                snapshots[snapshot.token_id] = snapshot
+                self.books.apply_summary(book)
+        return snapshots
+
+    def writer_for(self, slug: str) -> MarketDataWriter:
+        writer = self.writers.get(slug)
+        if writer is None:
+            folder = os.path.join(self.root, slug)
+            os.makedirs(folder, exist_ok=True)
+            writer = self.writers[slug] = open_writer(self.storage, folder, slug)
+        return writer
+
+    def write_tick(self, timestamp: str, snapshots: Dict[str, MarketSnapshot]) -> int:
+        """Writes one row per market whose two books were fetched and returns the row count."""
+        written = 0
+        for market in self.markets:
+            first, second = snapshots.get(market.token1), snapshots.get(market.token2)
+            if first is None or second is None:
+                continue
+            values = [timestamp] + first.top_of_book() + second.top_of_book() + [first.book, second.book]
+            self.writer_for(market.slug).append(dict(zip(CSV_HEADER, values)))
+            written += 1
+        return written
+
+    async def stream(self):
+        """Runs ticks at a fixed rate until cancelled."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        logging.info(f"Streaming {len(self.markets)} markets ({len(self.token_ids)} tokens "
+                     f"in {len(self.batches())} batches)")
+        try:
+            while True:
+                timestamp = datetime.utcnow().isoformat()
+                snapshots = await self.fetch_snapshots()
+                written = self.write_tick(timestamp, snapshots)
+                logging.info(f"Data written at {timestamp} for {written}/{len(self.markets)} markets")
+
+                next_tick += self.interval_seconds
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    logging.warning(f"Tick took {self.interval_seconds - delay:.2f}s, longer than the interval")
+                    next_tick = loop.time()
+                    delay = 0
+                await asyncio.sleep(delay)
+        finally:
+            self.close()
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
@@ -0,0 +1,386 @@
+import csv
+import glob
+import json
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+TOKENS = ("token1", "token2")
+SCALAR_FIELDS = ("midpoint", "best_buy", "best_sell", "spread")
+SCALAR_COLUMNS = [f"{token}_{field}" for token in TOKENS for field in SCALAR_FIELDS]
+BOOK_COLUMNS = [f"{token}_orderbook" for token in TOKENS]
+CSV_HEADER = ["timestamp"] + SCALAR_COLUMNS + BOOK_COLUMNS
+
+COLUMNAR_SUFFIX = "_columnar"
+
+_LEVEL_RE = re.compile(r"OrderSummary\(price='([^']*)', size='([^']*)'\)")
+_ASSET_RE = re.compile(r"asset_id='([^']*)'")
+
+
+class BookLevels(NamedTuple):
+    """Book levels of one token as typed arrays, best price first on both sides."""
+    bid_prices: np.ndarray
+    bid_sizes: np.ndarray
+    ask_prices: np.ndarray
+    ask_sizes: np.ndarray
+
+
+EMPTY_LEVELS = BookLevels(*(np.empty(0, dtype=np.float64) for _ in range(4)))
+
+
+def _levels_to_arrays(levels, descending: bool):
+    if not levels:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+    arr = np.array(levels, dtype=np.float64).reshape(-1, 2)
+    order = np.argsort(-arr[:, 0] if descending else arr[:, 0], kind="stable")
+    arr = arr[order]
+    return arr[:, 0].copy(), arr[:, 1].copy()
+
+
+def book_levels(book) -> BookLevels:
+    """
+    Converts an order book into BookLevels.
+
+    Accepts a py_clob_client OrderBookSummary, its repr() string as recorded in the
+    CSV files, or None/empty for a missing book.
+    """
+    if book is None or book == "":
+        return EMPTY_LEVELS
+
+    if isinstance(book, str):
+        asks_at = book.find("asks=[")
+        bid_part = book if asks_at == -1 else book[:asks_at]
+        ask_part = "" if asks_at == -1 else book[asks_at:]
+        bids = _LEVEL_RE.findall(bid_part)
+        asks = _LEVEL_RE.findall(ask_part)
+    else:
+        bids = [(level.price, level.size) for level in (book.bids or [])]
+        asks = [(level.price, level.size) for level in (book.asks or [])]
+
+    bid_prices, bid_sizes = _levels_to_arrays(bids, descending=True)
+    ask_prices, ask_sizes = _levels_to_arrays(asks, descending=False)
+    return BookLevels(bid_prices, bid_sizes, ask_prices, ask_sizes)
+
+
+def book_asset_id(book) -> Optional[str]:
+    """Returns the asset id of an OrderBookSummary or of its recorded repr() string."""
+    if book is None:
+        return None
+    if isinstance(book, str):
+        match = _ASSET_RE.search(book)
+        return match.group(1) if match else None
+    return getattr(book, "asset_id", None)
+
+
+def _to_float(value) -> float:
+    if value is None or value == "":
+        return np.nan
+    return float(value)
+
+
+class MarketData:
+    """
+    Recorded market data held column-wise.
+
+    Scalar columns (timestamp plus the SCALAR_COLUMNS) are 1-d arrays with one entry
+    per tick. Book levels are stored CSR style: for each token and side a flat price
+    array, a flat size array and an offsets array so that tick i owns
+    prices[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], books: Dict[str, np.ndarray],
+                 token_ids: Optional[Dict[str, str]] = None):
+        self.columns = columns
+        self.books = books
+        self.token_ids = token_ids or {}
+
+    def __len__(self):
+        return len(self.columns["timestamp"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def book(self, token: str, index: int) -> BookLevels:
+        """Returns the book levels of token ('token1' or 'token2') at tick index."""
+        arrays = []
+        for side in ("bid", "ask"):
+            offsets = self.books[f"{token}_{side}_offsets"]
+            start, end = offsets[index], offsets[index + 1]
+            arrays.append(self.books[f"{token}_{side}_price"][start:end])
+            arrays.append(self.books[f"{token}_{side}_size"][start:end])
+        return BookLevels(*arrays)
+
+    def to_frame(self):
+        """Returns the scalar columns as a pandas DataFrame."""
+        import pandas as pd
+        return pd.DataFrame({name: self.columns[name] for name in ["timestamp"] + SCALAR_COLUMNS})
+
+
+class _ColumnBuffer:
+    """Accumulates rows and turns them into the MarketData array layout."""
+
+    def __init__(self):
+        self.timestamps: List[str] = []
+        self.scalars: Dict[str, List[float]] = {name: [] for name in SCALAR_COLUMNS}
+        self.levels: Dict[str, List[np.ndarray]] = {}
+        self.counts: Dict[str, List[int]] = {}
+        for token in TOKENS:
+            for side in ("bid", "ask"):
+                for kind in ("price", "size"):
+                    self.levels[f"{token}_{side}_{kind}"] = []
+                self.counts[f"{token}_{side}"] = []
+        self.token_ids: Dict[str, str] = {}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def add(self, row: dict, parse_books: bool = True):
+        self.timestamps.append(row["timestamp"])
+        for name in SCALAR_COLUMNS:
+            self.scalars[name].append(_to_float(row.get(name)))
+        for token in TOKENS:
+            book = row.get(f"{token}_orderbook")
+            if token not in self.token_ids:
+                asset_id = book_asset_id(book)
+                if asset_id:
+                    self.token_ids[token] = asset_id
+            levels = book_levels(book) if parse_books else EMPTY_LEVELS
+            for side, prices, sizes in (("bid", levels.bid_prices, levels.bid_sizes),
+                                        ("ask", levels.ask_prices, levels.ask_sizes)):
+                self.levels[f"{token}_{side}_price"].append(prices)
+                self.levels[f"{token}_{side}_size"].append(sizes)
+                self.counts[f"{token}_{side}"].append(len(prices))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        out = {"timestamp": np.array(self.timestamps, dtype="datetime64[us]")}
+        for name, values in self.scalars.items():
+            out[name] = np.array(values, dtype=np.float64)
+        for name, chunks in self.levels.items():
+            out[name] = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float64)
+        for name, counts in self.counts.items():
+            offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            out[f"{name}_offsets"] = offsets
+        return out
+
+    def clear(self):
+        self.__init__()
+
+
+def _split_arrays(arrays: Dict[str, np.ndarray]):
+    columns = {name: arrays[name] for name in ["timestamp"] + SCALAR_COLUMNS}
+    books = {name: value for name, value in arrays.items() if name not in columns}
+    return columns, books
+
+
+class MarketDataWriter(ABC):
+    """Destination for streamed market rows (dicts keyed by CSV_HEADER)."""
+
+    @abstractmethod
+    def append(self, row: dict):
+        """Stores one tick."""
+
+    @property
+    def pending(self) -> int:
+        """Number of appended rows that are not durable yet."""
+        return 0
+
+    def flush(self):
+        """Makes appended rows durable."""
+
+    def close(self):
+        """Flushes and releases the underlying files."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvMarketDataWriter(MarketDataWriter):
+    """The original format: one CSV row per tick, order books written as repr() strings."""
+
+    def __init__(self, path: str, columns: Optional[List[str]] = None):
+        self.path = path
+        self.columns = columns or CSV_HEADER
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not is_new:
+            with open(path, newline="") as f:
+                header = next(csv.reader(f), [])
+            if header != self.columns:
+                raise ValueError(f"{path} has columns {header}, not {self.columns}; "
+                                 f"it was written by another storage backend")
+        self._file = open(path, "a", newline="")
+        self._writer = csv.writer(self._file)
+        if is_new:
+            self._writer.writerow(self.columns)
+            self._file.flush()
+
+    def append(self, row: dict):
+        self._writer.writerow([row.get(name) for name in self.columns])
+        self._file.flush()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class NpyMarketDataWriter(MarketDataWriter):
+    """
+    Columnar writer storing ticks in chunks of at most chunk_rows rows.
+
+    Each chunk is an uncompressed .npz archive of the MarketData arrays, so reading
+    it back is a plain buffer load with no text parsing. Rows are buffered in memory
+    and written when a chunk fills up, when an append comes max_delay_seconds or more
+    after the last write, or on flush()/close(). A streamer appending less often than
+    max_delay_seconds therefore writes every row as it arrives, and a faster one
+    writes a chunk at least every max_delay_seconds while rows keep coming; pending
+    tells how many rows are not written yet.
+    """
+
+    def __init__(self, directory: str, chunk_rows: int = 256, max_delay_seconds: float = 5.0):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.max_delay_seconds = max_delay_seconds
+        os.makedirs(directory, exist_ok=True)
+        self._buffer = _ColumnBuffer()
+        # time.monotonic() of the last write
+        self._flushed_at = time.monotonic()
+        self._next_chunk = len(glob.glob(os.path.join(directory, "chunk_*.npz")))
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def append(self, row: dict):
+        self._buffer.add(row)
+        if (len(self._buffer) >= self.chunk_rows
+                or time.monotonic() - self._flushed_at >= self.max_delay_seconds):
+            self.flush()
+
+    def flush(self):
+        if not len(self._buffer):
+            return
+        self._write_meta()
+        path = os.path.join(self.directory, f"chunk_{self._next_chunk:06d}.npz")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **self._buffer.arrays())
+        os.replace(tmp_path, path)
+        self._next_chunk += 1
+        self._buffer.clear()
+        self._flushed_at = time.monotonic()
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.directory, "meta.json")
+        if self._buffer.token_ids and not os.path.exists(meta_path):
+            with open(meta_path, "w") as f:
+                json.dump({"token_ids": self._buffer.token_ids}, f)
+
+
+def columnar_directory(folder: str, slug: str) -> str:
+    """Returns where the columnar backend stores the chunks of a market."""
+    return os.path.join(folder, f"{slug}{COLUMNAR_SUFFIX}")
+
+
+def open_writer(storage, folder: str, slug: str) -> MarketDataWriter:
+    """
+    Returns a MarketDataWriter for a market folder.
+
+    Args:
+        storage: "csv", "npy", "delta" or an already constructed MarketDataWriter.
+        folder (str): The market folder.
+        slug (str): The market slug, used to name the files.
+    """
+    if isinstance(storage, MarketDataWriter):
+        return storage
+    if storage == "csv":
+        return CsvMarketDataWriter(os.path.join(folder, f"{slug}_combined.csv"))
+    if storage == "npy":
+        return NpyMarketDataWriter(columnar_directory(folder, slug))
+    if storage == "delta":
+        from .book_archive import DeltaMarketDataWriter
+        return DeltaMarketDataWriter(folder, slug)
+    raise ValueError(f"Unknown storage backend '{storage}'. Use 'csv', 'npy' or 'delta'.")
+
+
+def read_columnar(directory: str) -> MarketData:
+    """Loads all chunks written by NpyMarketDataWriter into one MarketData."""
+    paths = sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))
+    chunks = []
+    for path in paths:
+        with np.load(path) as npz:
+            chunks.append({name: npz[name] for name in npz.files})
+
+    token_ids = {}
+    meta_path = os.path.join(directory, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            token_ids = json.load(f).get("token_ids", {})
+
+    if not chunks:
+        return MarketData(*_split_arrays(_ColumnBuffer().arrays()), token_ids)
+    if len(chunks) == 1:
+        return MarketData(*_split_arrays(chunks[0]), token_ids)
+
+    merged = {}
+    for name in chunks[0]:
+        if name.endswith("_offsets"):
+            parts = [chunks[0][name]]
+            base = chunks[0][name][-1]
+            for chunk in chunks[1:]:
+                parts.append(chunk[name][1:] + base)
+                base += chunk[name][-1]
+            merged[name] = np.concatenate(parts)
+        else:
+            merged[name] = np.concatenate([chunk[name] for chunk in chunks])
+    return MarketData(*_split_arrays(merged), token_ids)
+
+
+def read_csv(path: str, parse_books: bool = True) -> MarketData:
+    """Parses a recorded <slug>_combined.csv into MarketData (done once per file)."""
+    buffer = _ColumnBuffer()
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("timestamp") == "timestamp":
+                continue
+            buffer.add(row, parse_books=parse_books)
+    return MarketData(*_split_arrays(buffer.arrays()), buffer.token_ids)
+
+
+def read_market_data(path: str, parse_books: bool = True) -> MarketData:
+    """
+    Loads a recorded market from any storage backend.
+
+    Args:
+        path (str): A columnar chunk directory, a <slug>_combined.csv file, or a market
+            folder containing either (the columnar data is preferred). Books stored by
+            the delta backend in <slug>_books.pmba are merged in.
+        parse_books (bool, optional): For CSV input, whether to parse the order book
+            columns. Defaults to True.
+    """
+    if os.path.isdir(path):
+        if glob.glob(os.path.join(path, "chunk_*.npz")):
+            return read_columnar(path)
+        slug = os.path.basename(os.path.normpath(path))
+        columnar = columnar_directory(path, slug)
+        if os.path.isdir(columnar):
+            return read_columnar(columnar)
+        path = os.path.join(path, f"{slug}_combined.csv")
+
+    data = read_csv(path, parse_books=parse_books)
+    if parse_books and path.endswith("_combined.csv"):
+        from .book_archive import archive_path, read_archive_books
+        archive = archive_path(os.path.dirname(path), os.path.basename(path)[:-len("_combined.csv")])
+        if os.path.exists(archive):
+            read_archive_books(archive, data)
+    return data
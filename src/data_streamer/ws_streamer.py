@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from py_clob_client.clob_types import OrderBookSummary, OrderSummary
+
+from src.core.latency import LatencyRecorder
+from src.core.order_book import BUY, SELL, OrderBooks
+from src.core.polymarket_websocket_client import PolymarketWebSocketClient
+from src.core.ws_events import EventDecoder
+from src.core.ws_session import MARKET, WebSocketSession
+from .storage import CSV_HEADER, open_writer
+
+
+class WebSocketMarketDataStreamer:
+    """
+    Streams the same rows as MarketDataStreamer, driven by the WebSocket market channel.
+
+    The books of both tokens are kept current from pushed `book` snapshots and
+    `price_change` level updates, so no REST calls are made. A row is written as soon
+    as a book changes (at most once per min_emit_interval, so bursts are coalesced)
+    and at least every interval_seconds while nothing changes.
+    """
+
+    def __init__(
+        self,
+        slug: str,
+        token1: str,
+        token2: str,
+        interval_seconds: int = 60,
+        on_write: Optional[Callable[[], None]] = None,
+        storage="csv",
+        min_emit_interval: float = 0.05,
+        ws_url: str = "wss://ws-subscriptions-clob.polymarket.com/ws/",
+        latency: Optional[LatencyRecorder] = None,
+        session: Optional[WebSocketSession] = None
+    ):
+        """
+        Args:
+            slug (str): The market slug (used as folder name).
+            token1 (str): The first token's id.
+            token2 (str): The second token's id.
+            interval_seconds (int, optional): Maximum time between rows when the books do not change. Defaults to 60.
+            on_write (Callable, optional): Called once appended rows are durable (after every row
+                except while the npy backend buffers them), e.g. CsvTailer.notify.
+            storage (optional): Storage backend, see storage.open_writer. Defaults to "csv".
+            min_emit_interval (float, optional): Minimum seconds between rows triggered by changes. Defaults to 0.05.
+            ws_url (str, optional): The WebSocket endpoint.
+            latency (LatencyRecorder, optional): Receives the fetch and write stages of every row.
+            session (WebSocketSession, optional): Shared connections to subscribe the tokens on,
+                instead of a market channel connection of its own.
+        """
+        self.slug = slug
+        self.token1 = token1
+        self.token2 = token2
+        self.interval_seconds = interval_seconds
+        self.on_write = on_write
+        self.storage = storage
+        self.min_emit_interval = min_emit_interval
+        self.latency = latency
+        self.session = session
+        # perf_counter_ns of the first book change not yet written
+        self._changed_at: Optional[int] = None
+        # Timestamps of rows appended but not durable yet
+        self._unwritten: List[str] = []
+
+        self.tokens = {token1, token2}
+        # Shared with strategies through TradingBot
+        self.books = OrderBooks()
+        self._changed = asyncio.Event()
+
+        if session is not None:
+            self.ws_client = session.clients[MARKET]
+        else:
+            self.ws_client = PolymarketWebSocketClient(
+                message_callback=self.handle_message,
+                ws_url=ws_url,
+                decoder=EventDecoder(),
+                # Only the current books matter: merge updates the handler has not caught up with
+                conflate=True
+            )
+
+        self.folder = os.path.join(os.getcwd(), slug)
+        os.makedirs(self.folder, exist_ok=True)
+        self.filename = os.path.join(self.folder, f"{slug}_combined.csv")
+
+    async def handle_message(self, message):
+        """Applies market channel events to the local books."""
+        events = message if isinstance(message, list) else [message]
+        changed = set()
+        for event in events:
+            changed |= self.books.apply_event(event, self.tokens)
+        if changed:
+            if self._changed_at is None:
+                self._changed_at = time.perf_counter_ns()
+            self._changed.set()
+
+    @property
+    def ready(self) -> bool:
+        """True once a snapshot of both books has been received."""
+        return all(token in self.books and self.books[token].has_snapshot for token in self.tokens)
+
+    def top_of_book(self, token_id: str) -> list:
+        """Returns [midpoint, best_buy, best_sell, spread] computed from the local book."""
+        book = self.books[token_id]
+        return [book.midpoint, book.best_bid_price, book.best_ask_price, book.spread]
+
+    def order_book(self, token_id: str) -> OrderBookSummary:
+        """Returns the local book in the same shape as the REST get_order_book response."""
+        book = self.books[token_id]
+        return OrderBookSummary(
+            market=book.market,
+            asset_id=token_id,
+            timestamp=str(int(datetime.utcnow().timestamp() * 1000)),
+            bids=[OrderSummary(price=str(p), size=str(s)) for p, s in reversed(book.levels(BUY))],
+            asks=[OrderSummary(price=str(p), size=str(s)) for p, s in reversed(book.levels(SELL))],
+        )
+
+    def build_row(self) -> dict:
+        values = (
+            [datetime.utcnow().isoformat()]
+            + self.top_of_book(self.token1)
+            + self.top_of_book(self.token2)
+            + [self.order_book(self.token1), self.order_book(self.token2)]
+        )
+        return dict(zip(CSV_HEADER, values))
+
+    def _appended(self, writer, timestamp: str):
+        """Marks appended rows written and calls on_write once the writer made them durable."""
+        self._unwritten.append(timestamp)
+        if writer.pending:
+            return
+        if self.latency:
+            for written in self._unwritten:
+                self.latency.mark(written, "written")
+        self._unwritten.clear()
+        if self.on_write:
+            self.on_write()
+
+    async def stream(self):
+        """Subscribes to the market channel and writes rows until cancelled."""
+        if self.session is not None:
+            self.session.add_handler(MARKET, self.handle_message)
+            await self.session.subscribe(assets_ids=[self.token1, self.token2])
+        else:
+            await self.ws_client.start("market", asset_ids=[self.token1, self.token2])
+        loop = asyncio.get_running_loop()
+        last_emit = 0.0
+        try:
+            with open_writer(self.storage, self.folder, self.slug) as writer:
+                while True:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), self.interval_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+
+                    wait = self.min_emit_interval - (loop.time() - last_emit)
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    self._changed.clear()
+
+                    if not self.ready:
+                        logging.info(f"Waiting for order book snapshots for market {self.slug}")
+                        continue
+
+                    row = self.build_row()
+                    writer.append(row)
+                    if self.latency and self._changed_at is not None:
+                        # The update that triggered the row starts the tick and counts as the fetch
+                        self.latency.mark(row["timestamp"], "fetch_start", self._changed_at)
+                        self.latency.mark(row["timestamp"], "fetched", self._changed_at)
+                    self._changed_at = None
+                    last_emit = loop.time()
+                    self._appended(writer, row["timestamp"])
+        finally:
+            if self.session is not None:
+                await self.session.unsubscribe(assets_ids=[self.token1, self.token2])
+                self.session.remove_handler(MARKET, self.handle_message)
+            else:
+                await self.ws_client.stop()
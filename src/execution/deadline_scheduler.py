@@ -0,0 +1,100 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+# A timer is identified by its kind (e.g. "timeout") and key (e.g. an order id)
+TimerId = Tuple[str, Hashable]
+
+
+class DeadlineScheduler:
+    """
+    Min-heap of deadlines on the monotonic clock.
+
+    schedule() and cancel() are O(log n) / O(1): a rescheduled or cancelled timer
+    stays in the heap and is skipped when it reaches the top (the heap is rebuilt
+    once such stale entries outnumber the live ones). run() sleeps exactly until the
+    earliest deadline, or until an earlier one is scheduled, and passes every due
+    timer to the handler in one call.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._heap: List[Tuple[float, int, str, Hashable]] = []
+        self._live: Dict[TimerId, Tuple[float, int]] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, timer: TimerId) -> bool:
+        return timer in self._live
+
+    def schedule(self, kind: str, key: Hashable, delay_seconds: float):
+        """(Re)schedules timer (kind, key) to fire delay_seconds from now."""
+        deadline = self.clock() + max(delay_seconds, 0)
+        seq = next(self._seq)
+        earliest = self.next_deadline()
+        self._live[(kind, key)] = (deadline, seq)
+        heapq.heappush(self._heap, (deadline, seq, kind, key))
+        self._compact()
+        if earliest is None or deadline < earliest:
+            self._wakeup.set()
+
+    def cancel(self, kind: str, key: Hashable) -> bool:
+        return self._live.pop((kind, key), None) is not None
+
+    def deadline(self, kind: str, key: Hashable) -> Optional[float]:
+        entry = self._live.get((kind, key))
+        return entry[0] if entry else None
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap:
+            deadline, seq, kind, key = heap[0]
+            if self._live.get((kind, key)) == (deadline, seq):
+                return
+            heapq.heappop(heap)
+
+    def _compact(self):
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._live):
+            self._heap = [(deadline, seq, kind, key) for (kind, key), (deadline, seq) in self._live.items()]
+            heapq.heapify(self._heap)
+
+    def next_deadline(self) -> Optional[float]:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[TimerId]:
+        """Removes and returns the timers due at now, earliest first."""
+        now = self.clock() if now is None else now
+        due = []
+        heap = self._heap
+        while True:
+            self._discard_stale()
+            if not heap or heap[0][0] > now:
+                return due
+            _, _, kind, key = heapq.heappop(heap)
+            del self._live[(kind, key)]
+            due.append((kind, key))
+
+    async def run(self, handler: Callable[[List[TimerId]], Awaitable]):
+        """Calls handler with the due timers whenever deadlines pass, until cancelled."""
+        while True:
+            due = self.pop_due()
+            if due:
+                try:
+                    await handler(due)
+                except Exception as e:
+                    logging.error(f"Error handling deadlines {due}: {e}")
+                continue
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            timeout = None if deadline is None else max(deadline - self.clock(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
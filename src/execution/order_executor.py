@@ -1,15 +1,35 @@
+import asyncio
+from typing import List, Optional
+
 from py_clob_client.clob_types import OrderArgs, MarketOrderArgs, OrderType
 from py_clob_client.order_builder.constants import BUY, SELL
-from src.core.clob_client import PolymarketClient
+from src.core.async_clob_client import AsyncPolymarketClient
+from src.execution.presigned_orders import PresignedOrderCache
+
+# Exchange order statuses as OrderTracker names them
+ORDER_STATUSES = {"MATCHED": "filled", "CANCELED": "cancelled", "LIVE": "live"}
 
 class OrderExecutor:
-    def __init__(self):
-        # Instantiate your Polymarket client (which uses py-order-utils)
-        self.client = PolymarketClient()
+    def __init__(self, client: Optional[AsyncPolymarketClient] = None, presign_orders: bool = False):
+        """
+        Args:
+            client (AsyncPolymarketClient, optional): Order entry client; defaults to one on top
+                of the authenticated PolymarketClient.
+            presign_orders (bool, optional): Keep a PresignedOrderCache (self.presigned) and post
+                limit orders from it when a signal matches a pre-signed candidate.
+        """
+        if client is None:
+            # Imported here: PolymarketClient needs the credentials from config
+            from src.core.clob_client import PolymarketClient
+            client = AsyncPolymarketClient(PolymarketClient().client)
+        self.client = client
+        self.presigned = PresignedOrderCache(client) if presign_orders else None
 
-    def execute_signal(self, signal: dict):
+    async def execute_signal(self, signal: dict):
         """
         Executes an order based on the provided signal.
+        Signing runs in the client's thread pool and the post is awaited, so other
+        coroutines (and other orders) keep running meanwhile.
         
         The signal is expected to be a dictionary with keys:
           - token_id: The token/market identifier.
@@ -28,14 +48,17 @@ class OrderExecutor:
             price = signal.get("price")
             quantity = signal.get("quantity")
             print(f"Placing LIMIT order: {side} {quantity} of {token_id} at {price}")
+            if self.presigned:
+                signed_order = self.presigned.take(token_id, side, price, quantity)
+                if signed_order is not None:
+                    return await self.client.post_order(signed_order, self.presigned.order_type)
             order_args = OrderArgs(
                 token_id=token_id,
                 price=price,
                 size=quantity,
                 side=side,
             )
-            # Use the create_and_post_order method from the client wrapper
-            response = self.client.create_and_post_order(order_args)
+            response = await self.client.create_and_post_order(order_args)
             return response
 
         elif order_type == "market":
@@ -46,33 +69,104 @@ class OrderExecutor:
                 amount=quantity,
                 side=side,
             )
-            signed_order = self.client.create_market_order(order_args)
+            signed_order = await self.client.create_market_order(order_args)
             if not signed_order:
                 return None
-            response = self.client.post_order(signed_order, orderType=OrderType.FOK)
+            response = await self.client.post_order(signed_order, OrderType.FOK)
             return response
 
         else:
             print(f"Unknown order type '{order_type}' in signal: {signal}")
             return None
 
-    def cancel_order(self, order_id: str):
+    async def execute_signals(self, signals: List[dict]) -> list:
+        """
+        Executes several signals at once.
+
+        Limit orders are signed concurrently and posted through the batch endpoint
+        (chunks of MAX_ORDERS_PER_POST in parallel); market orders go through
+        execute_signal concurrently. Returns one response per signal, in order
+        (None where signing or posting failed).
+        """
+        responses = [None] * len(signals)
+        limit = [(i, signal) for i, signal in enumerate(signals) if signal.get("order_type") == "limit"]
+        others = [(i, signal) for i, signal in enumerate(signals) if signal.get("order_type") != "limit"]
+
+        async def place_limit_orders():
+            print(f"Placing {len(limit)} LIMIT orders in batches")
+            signed = await asyncio.gather(*(
+                self.client.create_order(OrderArgs(
+                    token_id=signal.get("token_id"),
+                    price=signal.get("price"),
+                    size=signal.get("quantity"),
+                    side=signal.get("side"),
+                ))
+                for _, signal in limit
+            ))
+            to_post = [(i, order) for (i, _), order in zip(limit, signed) if order is not None]
+            posted = await self.client.post_orders([order for _, order in to_post])
+            for (i, _), response in zip(to_post, posted):
+                responses[i] = response
+
+        async def place_other(i, signal):
+            responses[i] = await self.execute_signal(signal)
+
+        tasks = [place_other(i, signal) for i, signal in others]
+        if limit:
+            tasks.append(place_limit_orders())
+        await asyncio.gather(*tasks)
+        return responses
+
+    async def cancel_order(self, order_id: str):
         """
         Cancels a specific order.
         Returns the API response.
         """
         print(f"Cancelling order with ID: {order_id}")
-        return self.client.cancel_order(order_id)
+        return await self.client.cancel_order(order_id)
 
-    def cancel_all_orders(self):
+    async def cancel_orders(self, order_ids: List[str]) -> dict:
+        """
+        Cancels several orders through the batch endpoint.
+        Returns {"canceled": [ids], "not_canceled": {id: reason}}.
+        """
+        print(f"Cancelling {len(order_ids)} orders.")
+        return await self.client.cancel_orders(order_ids)
+
+    async def cancel_all_orders(self):
         """
         Cancels all active orders.
         Returns the API response.
         """
         print("Cancelling all orders.")
-        return self.client.cancel_all_orders()
+        return await self.client.cancel_all_orders()
+
+    async def get_order_status(self, order_id: str) -> Optional[dict]:
+        """
+        Fetches an order and returns it as the status update OrderTracker expects
+        ({"status", "filledQuantity"}), or None if it could not be fetched.
+        """
+        order = await self.client.get_order(order_id)
+        if not isinstance(order, dict) or not order:
+            return None
+        status = order.get("status", "")
+        return {
+            "status": ORDER_STATUSES.get(status, status.lower()),
+            "filledQuantity": float(order.get("size_matched") or 0),
+        }
+
+    async def get_open_orders(self) -> Optional[list]:
+        """All open orders (one paginated sweep), or None if they could not be fetched."""
+        return await self.client.get_orders()
+
+    async def get_trades(self, after: int = None) -> Optional[list]:
+        """Trades since the unix time after (one paginated sweep), or None on error."""
+        return await self.client.get_trades(after=after)
+
+    async def close(self):
+        await self.client.close()
 
-    def exit_strategy(self, exit_reason: str = None):
+    async def exit_strategy(self, exit_reason: str = None):
         """
         Exits the strategy by canceling all active orders.
         Optionally logs the exit reason.
@@ -82,4 +176,4 @@ class OrderExecutor:
             print(f"Exiting strategy due to: {exit_reason}. Cancelling all orders.")
         else:
             print("Exiting strategy. Cancelling all orders.")
-        return self.cancel_all_orders()
+        return await self.cancel_all_orders()
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.execution.order_tracker import OrderStatus
+
+BUY_SIDE = "BUY"
+SELL_SIDE = "SELL"
+
+
+@dataclass(slots=True)
+class Exposure:
+    """Running totals over the orders of one token and side."""
+    orders: int = 0
+    quantity: float = 0.0          # ordered quantity of the active orders
+    open_quantity: float = 0.0     # still unfilled
+    notional: float = 0.0          # quantity * price of the active orders
+    open_notional: float = 0.0     # unfilled quantity * price
+    filled_quantity: float = 0.0   # filled so far, including orders no longer active
+    filled_notional: float = 0.0
+
+    def add(self, other: "Exposure") -> "Exposure":
+        return Exposure(*(getattr(self, name) + getattr(other, name) for name in self.__slots__))
+
+
+class OrderStore:
+    """
+    Active orders with secondary indexes and running aggregates.
+
+    Orders are indexed by token id, side and status (dicts used as ordered sets, so
+    lookups and removals are O(1)), and every (token, side) keeps an Exposure that is
+    adjusted by the difference each add/update/remove makes. Exposure queries and
+    per-token order lists therefore cost the same with ten or ten thousand resting
+    orders. Changes to tracked orders must go through update() so the indexes and
+    totals stay in sync.
+    """
+
+    def __init__(self):
+        self.orders: Dict[str, "OrderStatus"] = {}
+        self._by_token: Dict[str, Dict[str, "OrderStatus"]] = {}
+        self._by_side: Dict[str, Dict[str, "OrderStatus"]] = {}
+        self._by_status: Dict[str, Dict[str, "OrderStatus"]] = {}
+        self._exposure: Dict[Tuple[str, str], Exposure] = {}
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.orders
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.orders)
+
+    def get(self, order_id: str) -> Optional["OrderStatus"]:
+        return self.orders.get(order_id)
+
+    def values(self) -> List["OrderStatus"]:
+        return list(self.orders.values())
+
+    @staticmethod
+    def _index_add(index: dict, key: str, order):
+        index.setdefault(key, {})[order.order_id] = order
+
+    @staticmethod
+    def _index_remove(index: dict, key: str, order_id: str):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(order_id, None)
+            if not bucket:
+                del index[key]
+
+    def _account(self, order, sign: int, include_fills: bool):
+        exposure = self._exposure.setdefault((order.token_id, order.side), Exposure())
+        open_quantity = max(order.quantity - order.filled_quantity, 0.0)
+        exposure.orders += sign
+        exposure.quantity += sign * order.quantity
+        exposure.open_quantity += sign * open_quantity
+        exposure.notional += sign * order.quantity * order.price
+        exposure.open_notional += sign * open_quantity * order.price
+        if include_fills:
+            exposure.filled_quantity += sign * order.filled_quantity
+            exposure.filled_notional += sign * order.filled_quantity * order.price
+        if exposure.orders == 0:
+            # Nothing active: clear the rounding left over from the running sums
+            exposure.quantity = exposure.open_quantity = exposure.notional = exposure.open_notional = 0.0
+
+    def add(self, order: "OrderStatus"):
+        """Starts tracking order (replacing an order with the same id)."""
+        if order.order_id in self.orders:
+            self.remove(order.order_id)
+        self.orders[order.order_id] = order
+        self._index_add(self._by_token, order.token_id, order)
+        self._index_add(self._by_side, order.side, order)
+        self._index_add(self._by_status, order.status, order)
+        self._account(order, 1, include_fills=True)
+
+    def remove(self, order_id: str) -> Optional["OrderStatus"]:
+        """Stops tracking an order; what it filled stays in the filled totals."""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        self._index_remove(self._by_token, order.token_id, order_id)
+        self._index_remove(self._by_side, order.side, order_id)
+        self._index_remove(self._by_status, order.status, order_id)
+        self._account(order, -1, include_fills=False)
+        return order
+
+    def update(self, order_id: str, status: Optional[str] = None,
+               filled_quantity: Optional[float] = None) -> Optional["OrderStatus"]:
+        """Sets the status and/or cumulative filled quantity of an order."""
+        order = self.orders.get(order_id)
+        if order is None:
+            return None
+        if filled_quantity is not None and filled_quantity != order.filled_quantity:
+            self._account(order, -1, include_fills=True)
+            order.filled_quantity = filled_quantity
+            self._account(order, 1, include_fills=True)
+        if status is not None and status != order.status:
+            self._index_remove(self._by_status, order.status, order_id)
+            order.status = status
+            self._index_add(self._by_status, status, order)
+        return order
+
+    def fill(self, order_id: str, quantity: float) -> Optional["OrderStatus"]:
+        """Adds quantity to the filled quantity of an order."""
+        order = self.orders.get(order_id)
+        if order is None:
+            return None
+        return self.update(order_id, filled_quantity=order.filled_quantity + quantity)
+
+    def select(self, token_id: Optional[str] = None, side: Optional[str] = None,
+               status: Optional[str] = None) -> List["OrderStatus"]:
+        """Orders matching all given criteria, scanning only the smallest matching index."""
+        buckets = []
+        for index, key in ((self._by_token, token_id), (self._by_side, side), (self._by_status, status)):
+            if key is not None:
+                buckets.append(index.get(key, {}))
+        if not buckets:
+            return list(self.orders.values())
+        smallest = min(buckets, key=len)
+        return [order for order_id, order in smallest.items() if all(order_id in bucket for bucket in buckets)]
+
+    def exposure(self, token_id: str, side: Optional[str] = None) -> Exposure:
+        """Running totals of token_id for one side, or both sides combined."""
+        if side is not None:
+            exposure = self._exposure.get((token_id, side))
+            return Exposure(*(getattr(exposure, name) for name in Exposure.__slots__)) if exposure else Exposure()
+        return self.exposure(token_id, BUY_SIDE).add(self.exposure(token_id, SELL_SIDE))
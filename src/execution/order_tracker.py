@@ -1,11 +1,34 @@
 import asyncio
 import logging
+import math
+import warnings
 from typing import Dict, List, Callable, Optional
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from src.core.polymarket_websocket_client import PolymarketWebSocketClient
+from src.core.receive_queue import BLOCK
+from src.core.ws_session import USER, WebSocketSession
+from src.execution.deadline_scheduler import DeadlineScheduler
+from src.core.ws_events import EventDecoder, OrderEvent, TradeEvent
+from src.execution.order_store import Exposure, OrderStore
 
-@dataclass
+# Timer kinds in the tracker's DeadlineScheduler: order timeouts keyed by order id,
+# and the one periodic REST reconciliation (key None)
+TIMEOUT = "timeout"
+RECONCILE = "reconcile"
+# Trades are fetched from this long before the oldest tracked order
+TRADES_LOOKBACK_SECONDS = 60
+# Signed order sizes are rounded down to this many decimals (py_clob_client
+# get_order_amounts), so 1 / 0.45 = 2.2222 shares is booked and filled as 2.22
+SIZE_DECIMALS = 2
+
+
+def exchange_size(quantity: float) -> float:
+    """quantity as the exchange books it: rounded down to SIZE_DECIMALS decimals."""
+    scale = 10 ** SIZE_DECIMALS
+    return math.floor(quantity * scale + 1e-6) / scale
+
+@dataclass(slots=True)
 class OrderStatus:
     order_id: str
     token_id: str
@@ -16,19 +39,11 @@ class OrderStatus:
     filled_quantity: float = 0.0
     timestamp: datetime = None
     timeout_minutes: int = 30
-    last_check: datetime = None
-
-    @property
-    def is_timed_out(self) -> bool:
-        if not self.timestamp:
-            return False
-        return datetime.utcnow() - self.timestamp > timedelta(minutes=self.timeout_minutes)
 
     @property
-    def needs_status_check(self) -> bool:
-        if not self.last_check:
-            return True
-        return datetime.utcnow() - self.last_check > timedelta(minutes=1)
+    def is_filled(self) -> bool:
+        """Whether the whole size the exchange booked for the order has matched."""
+        return self.filled_quantity >= exchange_size(self.quantity) - 1e-9
 
 class OrderTracker:
     def __init__(
@@ -37,35 +52,55 @@ class OrderTracker:
         callback: Callable = None,
         executor: Optional['OrderExecutor'] = None,
         status_check_interval: int = 60,
-        cleanup_interval: int = 300,
+        cleanup_interval: Optional[int] = None,
         api_key: str = None,
         api_secret: str = None,
-        api_passphrase: str = None
+        api_passphrase: str = None,
+        session: Optional[WebSocketSession] = None
     ):
+        # With a shared session the user channel connection belongs to the session
+        self.session = session
         self.callback = callback
         self.executor = executor
         self.status_check_interval = status_check_interval
-        self.cleanup_interval = cleanup_interval
-        self.active_orders: Dict[str, OrderStatus] = {}
+        if cleanup_interval is not None:
+            warnings.warn("cleanup_interval is deprecated and ignored: order timeouts fire when due",
+                          DeprecationWarning, stacklevel=2)
+        # Indexed orders with running exposure; active_orders is its order dict and
+        # must only be changed through the store
+        self.store = OrderStore()
+        self.active_orders: Dict[str, OrderStatus] = self.store.orders
+        # Per-order timeout and status check deadlines
+        self.scheduler = DeadlineScheduler()
         self.running = False
         self.tasks: List[asyncio.Task] = []
         
-        # Initialize WebSocket client with our message callback
-        self.ws_client = PolymarketWebSocketClient(
-            api_key=api_key,
-            api_secret=api_secret,
-            api_passphrase=api_passphrase,
-            message_callback=self.handle_ws_message,
-            ws_url=ws_url
-        )
+        if session is not None:
+            self.ws_client = session.clients[USER]
+        else:
+            # Initialize WebSocket client with our message callback
+            self.ws_client = PolymarketWebSocketClient(
+                api_key=api_key,
+                api_secret=api_secret,
+                api_passphrase=api_passphrase,
+                message_callback=self.handle_ws_message,
+                ws_url=ws_url,
+                decoder=EventDecoder(),
+                # Order updates must not be dropped: let a full queue hold back the reader
+                overflow=BLOCK
+            )
 
     async def start(self):
         """Start the order tracker."""
         self.running = True
+        if self.session is not None:
+            self.session.add_handler(USER, self.handle_ws_message)
+            ws_start = self.session.start(USER)
+        else:
+            ws_start = self.ws_client.start("user")  # Start WebSocket client in user channel
         self.tasks = [
-            asyncio.create_task(self.ws_client.start("user")),  # Start WebSocket client in user channel
-            asyncio.create_task(self._check_order_statuses()),
-            asyncio.create_task(self._cleanup_orders())
+            asyncio.create_task(ws_start),
+            asyncio.create_task(self.scheduler.run(self._handle_deadlines))
         ]
         await asyncio.gather(*self.tasks)
 
@@ -73,8 +108,11 @@ class OrderTracker:
         """Stop tracking and cleanup."""
         self.running = False
         
-        # Stop WebSocket client
-        await self.ws_client.stop()
+        # Stop WebSocket client (a shared session keeps running for its other users)
+        if self.session is not None:
+            self.session.remove_handler(USER, self.handle_ws_message)
+        else:
+            await self.ws_client.stop()
         
         # Cancel all tasks
         for task in self.tasks:
@@ -83,37 +121,98 @@ class OrderTracker:
             except Exception:
                 pass
         
-        # Cancel all active orders
-        for order_id in list(self.active_orders.keys()):
-            await self.cancel_order(order_id)
+        # Cancel all active orders in one batch
+        await self.cancel_orders(list(self.active_orders.keys()))
 
-    async def _check_order_statuses(self):
-        """Periodically check status of active orders via REST API as a backup."""
-        while self.running:
+    async def _handle_deadlines(self, due: list):
+        """Cancels the orders whose timeout passed and runs the reconciliation when due."""
+        timed_out = []
+        for kind, order_id in due:
+            if kind == RECONCILE:
+                continue
+            order = self.active_orders.get(order_id)
+            if order is not None:
+                logging.warning(f"Order {order_id} timed out after {order.timeout_minutes} minutes")
+                timed_out.append(order_id)
+        if timed_out:
+            await self.cancel_orders(timed_out)
+        if (RECONCILE, None) in due:
             try:
-                for order_id, order in list(self.active_orders.items()):
-                    if order.needs_status_check and self.executor:
-                        status = await self.executor.get_order_status(order_id)
-                        if status:
-                            await self.update_order_status(order_id, status)
-                        order.last_check = datetime.utcnow()
+                await self.reconcile()
             except Exception as e:
-                logging.error(f"Error checking order statuses: {e}")
-            
-            await asyncio.sleep(self.status_check_interval)
+                logging.error(f"Error reconciling orders: {e}")
+            if self.active_orders:
+                self.scheduler.schedule(RECONCILE, None, self.status_check_interval)
 
-    async def _cleanup_orders(self):
-        """Periodically clean up timed out orders."""
-        while self.running:
-            try:
-                for order_id, order in list(self.active_orders.items()):
-                    if order.is_timed_out:
-                        logging.warning(f"Order {order_id} timed out after {order.timeout_minutes} minutes")
-                        await self.cancel_order(order_id)
-            except Exception as e:
-                logging.error(f"Error during order cleanup: {e}")
-            
-            await asyncio.sleep(self.cleanup_interval)
+    @staticmethod
+    def _traded_quantities(trades: list, order_ids: set) -> Dict[str, float]:
+        """Matched quantity per tracked order id, as taker or maker, over the trades."""
+        traded: Dict[str, float] = {}
+        for trade in trades:
+            if trade.get("status") == "FAILED":
+                continue
+            taker_order_id = trade.get("taker_order_id")
+            if taker_order_id in order_ids:
+                traded[taker_order_id] = traded.get(taker_order_id, 0.0) + float(trade.get("size") or 0)
+            for maker_order in trade.get("maker_orders") or []:
+                order_id = maker_order.get("order_id")
+                if order_id in order_ids:
+                    traded[order_id] = traded.get(order_id, 0.0) + float(maker_order.get("matched_amount") or 0)
+        return traded
+
+    async def reconcile(self) -> Optional[dict]:
+        """
+        Backup for missed WebSocket events: fetches all open orders and the trades since
+        the oldest tracked order in one paginated sweep each, diffs them against
+        active_orders and applies the differences in bulk. Orders still open get their
+        matched size; orders no longer open are completed if their trades cover the
+        quantity (as rounded by the exchange) and cancelled otherwise, partial fills
+        still reaching the callback. Returns counts of the changes, or
+        None if the exchange could not be queried.
+        """
+        if not self.executor or not self.active_orders:
+            return None
+        order_ids = list(self.active_orders)
+        oldest = min((order.timestamp for order in self.active_orders.values() if order.timestamp),
+                     default=datetime.utcnow())
+        after = int(oldest.replace(tzinfo=timezone.utc).timestamp()) - TRADES_LOOKBACK_SECONDS
+        open_orders, trades = await asyncio.gather(self.executor.get_open_orders(),
+                                                   self.executor.get_trades(after=after))
+        if open_orders is None:
+            logging.error("Reconciliation skipped: open orders could not be fetched")
+            return None
+
+        open_by_id = {order.get("id"): order for order in open_orders}
+        traded = self._traded_quantities(trades or [], set(order_ids))
+        changes = {"partially_filled": 0, "filled": 0, "cancelled": 0}
+        finished = []
+        for order_id in order_ids:
+            order = self.active_orders.get(order_id)
+            if order is None:
+                continue  # completed through the WebSocket meanwhile
+            remote = open_by_id.get(order_id)
+            if remote is not None:
+                filled = float(remote.get("size_matched") or 0)
+                if filled > order.filled_quantity:
+                    self.store.update(order_id, status="matched", filled_quantity=filled)
+                    if order.is_filled:
+                        finished.append(order)
+                    else:
+                        changes["partially_filled"] += 1
+                continue
+            if trades is None:
+                continue  # without trades a filled order cannot be told from a cancelled one
+            filled = max(order.filled_quantity, traded.get(order_id, 0.0))
+            self.store.update(order_id, filled_quantity=filled)
+            self.store.update(order_id, status="filled" if order.is_filled else "cancelled")
+            finished.append(order)
+
+        for order in finished:
+            changes["filled" if order.status != "cancelled" else "cancelled"] += 1
+            await self._handle_status_update(order)
+        if finished or changes["partially_filled"]:
+            logging.info(f"Reconciled {len(order_ids)} orders: {changes}")
+        return changes
 
     async def track_order(
         self, 
@@ -125,7 +224,7 @@ class OrderTracker:
         timeout_minutes: int = 30
     ):
         """Start tracking a new order with optional timeout."""
-        self.active_orders[order_id] = OrderStatus(
+        self.store.add(OrderStatus(
             order_id=order_id,
             token_id=token_id,
             side=side,
@@ -134,7 +233,10 @@ class OrderTracker:
             status="pending",
             timestamp=datetime.utcnow(),
             timeout_minutes=timeout_minutes
-        )
+        ))
+        self.scheduler.schedule(TIMEOUT, order_id, timeout_minutes * 60)
+        if (RECONCILE, None) not in self.scheduler:
+            self.scheduler.schedule(RECONCILE, None, self.status_check_interval)
         logging.info(f"Started tracking order {order_id} with {timeout_minutes} minute timeout")
 
     async def cancel_order(self, order_id: str):
@@ -147,7 +249,39 @@ class OrderTracker:
                 except Exception as e:
                     logging.error(f"Error cancelling order {order_id}: {e}")
             
-            del self.active_orders[order_id]
+            self._untrack(order_id)
+
+    def _untrack(self, order_id: str):
+        """Remove an order from tracking together with its deadlines."""
+        self.store.remove(order_id)
+        self.scheduler.cancel(TIMEOUT, order_id)
+
+    async def cancel_orders(self, order_ids: List[str]):
+        """
+        Cancel several orders with one batch request and remove them from tracking.
+        Orders the exchange could not cancel (typically matched meanwhile) stay
+        tracked so the next WebSocket event or reconciliation settles them.
+        """
+        order_ids = [order_id for order_id in order_ids if order_id in self.active_orders]
+        if not order_ids:
+            return
+        not_canceled = {}
+        if self.executor:
+            try:
+                response = await self.executor.cancel_orders(order_ids)
+                logging.info(f"Cancelled {len(response.get('canceled', []))} of {len(order_ids)} orders")
+                not_canceled = response.get("not_canceled") or {}
+                for order_id, reason in not_canceled.items():
+                    logging.error(f"Error cancelling order {order_id}: {reason}")
+            except Exception as e:
+                logging.error(f"Error cancelling orders {order_ids}: {e}")
+
+        for order_id in order_ids:
+            if order_id not in not_canceled:
+                self._untrack(order_id)
+        if any(order_id in self.active_orders for order_id in not_canceled) \
+                and (RECONCILE, None) not in self.scheduler:
+            self.scheduler.schedule(RECONCILE, None, self.status_check_interval)
 
     async def update_order_status(self, order_id: str, status_update: dict):
         """Update order status from external source."""
@@ -156,8 +290,7 @@ class OrderTracker:
             new_status = status_update.get("status")
             filled_quantity = float(status_update.get("filledQuantity", 0))
             
-            order.status = new_status
-            order.filled_quantity = filled_quantity
+            self.store.update(order_id, status=new_status, filled_quantity=filled_quantity)
             
             await self._handle_status_update(order)
 
@@ -165,14 +298,17 @@ class OrderTracker:
         """Handle order status updates."""
         logging.info(f"Order {order.order_id} update: status={order.status}, filled={order.filled_quantity}")
         
-        if order.status == "filled" or order.filled_quantity >= order.quantity:
+        if order.status == "filled" or order.is_filled:
             if self.callback:
                 await self.callback(order)
-            del self.active_orders[order.order_id]
+            self._untrack(order.order_id)
             logging.info(f"Order {order.order_id} completed and removed from tracking")
         
         elif order.status == "cancelled":
-            del self.active_orders[order.order_id]
+            # The matched part of a cancelled order is still a fill
+            if order.filled_quantity > 0 and self.callback:
+                await self.callback(order)
+            self._untrack(order.order_id)
             logging.info(f"Order {order.order_id} cancelled and removed from tracking")
 
     async def handle_ws_message(self, message):
@@ -187,65 +323,67 @@ class OrderTracker:
             logging.error(f"Error handling WebSocket message: {e}")
 
     async def _process_ws_message(self, msg):
-        """Process a single WebSocket message."""
-        event_type = msg.get("event_type")
+        """Process a single WebSocket message (a typed event or a raw dict)."""
+        event_type = msg.get("event_type") if isinstance(msg, dict) else getattr(msg, "event_type", None)
         
         if event_type == "trade":
             await self._handle_trade_message(msg)
         elif event_type == "order":
             await self._handle_order_message(msg)
 
-    async def _handle_trade_message(self, message: dict):
-        """Handle trade messages which indicate orders being filled."""
-        maker_orders = message.get('maker_orders', [])
+    async def _handle_trade_message(self, message):
+        """Handle trade messages (TradeEvent or dict) which indicate orders being filled."""
+        if isinstance(message, dict):
+            message = TradeEvent.from_dict(message)
         
-        for maker_order in maker_orders:
-            order_id = maker_order.get('order_id')
+        for maker_order in message.maker_orders:
+            order_id = maker_order.order_id
             if order_id in self.active_orders:
                 order = self.active_orders[order_id]
-                filled_amount = float(maker_order.get('matched_amount', 0))
-                price = float(maker_order.get('price', 0))
+                filled_amount = maker_order.matched_amount
+                price = maker_order.price
                 
-                order.filled_quantity += filled_amount
-                order.status = "matched"
+                self.store.update(order_id, status="matched", filled_quantity=order.filled_quantity + filled_amount)
                 
                 logging.info(f"Order {order_id} matched: {filled_amount} at {price}")
                 
-                if order.filled_quantity >= order.quantity:
+                if order.is_filled:
                     if self.callback:
                         await self.callback(order)
-                    del self.active_orders[order_id]
+                    self._untrack(order_id)
                     logging.info(f"Order {order_id} fully filled and removed from tracking")
 
-    async def _handle_order_message(self, message: dict):
-        """Handle order status update messages."""
-        action = message.get('action')
-        order_id = message.get('order_id')
+    async def _handle_order_message(self, message):
+        """Handle order status update messages (OrderEvent or dict)."""
+        if isinstance(message, dict):
+            message = OrderEvent.from_dict(message)
+        action = message.action
+        order_id = message.order_id
         
         if order_id in self.active_orders:
             order = self.active_orders[order_id]
             
             if action == "PLACEMENT":
-                order.status = "live"
+                self.store.update(order_id, status="live")
                 logging.info(f"Order {order_id} placed successfully")
                 
             elif action == "UPDATE":
-                new_filled = float(message.get('matched_amount', 0))
+                new_filled = message.matched_amount
                 if new_filled > order.filled_quantity:
-                    order.filled_quantity = new_filled
+                    self.store.update(order_id, filled_quantity=new_filled)
                     logging.info(f"Order {order_id} updated: {order.filled_quantity}/{order.quantity} filled")
                 
-                if order.filled_quantity >= order.quantity:
+                if order.is_filled:
                     if self.callback:
                         await self.callback(order)
-                    del self.active_orders[order_id]
+                    self._untrack(order_id)
                     logging.info(f"Order {order_id} fully filled and removed from tracking")
                     
             elif action == "CANCELLATION":
-                order.status = "cancelled"
+                self.store.update(order_id, status="cancelled")
                 if self.callback:
                     await self.callback(order)
-                del self.active_orders[order_id]
+                self._untrack(order_id)
                 logging.info(f"Order {order_id} cancelled and removed from tracking")
 
     # Utility methods for getting order information
@@ -259,12 +397,12 @@ class OrderTracker:
 
     def get_active_orders_for_token(self, token_id: str) -> List[OrderStatus]:
         """Get all active orders for a specific token."""
-        return [order for order in self.active_orders.values() if order.token_id == token_id]
+        return self.store.select(token_id=token_id)
 
     def get_total_exposure(self, token_id: str) -> float:
-        """Calculate total exposure (quantity * price) for a token."""
-        return sum(
-            order.quantity * order.price 
-            for order in self.active_orders.values() 
-            if order.token_id == token_id
-        ) 
\ No newline at end of file
+        """Total exposure (quantity * price) of the active orders for a token, in O(1)."""
+        return self.store.exposure(token_id).notional
+
+    def get_exposure(self, token_id: str, side: Optional[str] = None) -> Exposure:
+        """Running open/filled quantity and notional for a token (one side or both), in O(1)."""
+        return self.store.exposure(token_id, side) 
\ No newline at end of file
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from py_clob_client.clob_types import OrderArgs, OrderType
+
+from src.core.async_clob_client import AsyncPolymarketClient
+
+# (token_id, side, price in ticks, size in hundredths of a share)
+OrderKey = Tuple[str, str, int, int]
+
+
+class PresignedOrder:
+    """One signed order waiting to be posted."""
+    __slots__ = ("key", "signed_order", "quantity", "nonce", "expires_at", "signed_at")
+
+    def __init__(self, key: OrderKey, signed_order, quantity: float, nonce: int, expires_at: Optional[float]):
+        self.key = key
+        self.signed_order = signed_order
+        self.quantity = quantity
+        self.nonce = nonce
+        self.expires_at = expires_at
+        self.signed_at = time.time()
+
+
+class PresignedOrderCache:
+    """
+    Signs likely limit orders ahead of time so a signal only has to post one.
+
+    The strategy declares candidate orders (token, side, price, size) with
+    set_candidates, e.g. a few ticks around the touch for every order size it could
+    send; refresh() signs the missing ones in the client's signing pool, off the
+    critical path. take() hands out a signed order of exactly the signal's size (the
+    cache key rounds sizes, so a near miss would post a different size than the bot
+    tracks and records) and forgets it: every signed order carries a unique salt and
+    can only be posted once, so the next refresh signs a replacement.
+
+    Entries are dropped when they stop being candidates (sizes change after fills),
+    when the exchange nonce changes (set_nonce, e.g. after cancelling by nonce) and,
+    for GTD orders signed with expiration_seconds, shortly before they expire.
+    """
+
+    def __init__(
+        self,
+        client: AsyncPolymarketClient,
+        tick_size: float = 0.01,
+        expiration_seconds: Optional[int] = None,
+        expiry_margin_seconds: float = 90,
+        max_entries: int = 200,
+    ):
+        """
+        Args:
+            client (AsyncPolymarketClient): Client used for signing.
+            tick_size (float, optional): Price grid of the markets. Defaults to 0.01.
+            expiration_seconds (int, optional): Sign GTD orders valid for this long; GTC
+                orders without expiration by default.
+            expiry_margin_seconds (float, optional): Drop GTD entries this long before they
+                expire (the exchange rejects orders expiring within a minute). Defaults to 90.
+            max_entries (int, optional): Upper bound on candidates kept signed. Defaults to 200.
+        """
+        self.client = client
+        self.tick_size = tick_size
+        self.expiration_seconds = expiration_seconds
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self.max_entries = max_entries
+        self.nonce = 0
+        self.order_type = OrderType.GTD if expiration_seconds else OrderType.GTC
+        self.candidates: Dict[OrderKey, dict] = {}
+        self.entries: Dict[OrderKey, PresignedOrder] = {}
+        self.hits = 0
+        self.misses = 0
+        self._wakeup = asyncio.Event()
+
+    def key(self, token_id: str, side: str, price: float, quantity: float) -> OrderKey:
+        return (token_id, side, int(round(price / self.tick_size)), int(round(quantity * 100)))
+
+    def set_candidates(self, orders: Iterable[dict]):
+        """
+        Replaces the orders to keep signed. orders are signal-like dicts with token_id,
+        side, price and quantity; entries no longer among them are dropped.
+        """
+        candidates = {}
+        for order in orders:
+            key = self.key(order["token_id"], order["side"], order["price"], order["quantity"])
+            candidates.setdefault(key, order)
+            if len(candidates) >= self.max_entries:
+                break
+        self.candidates = candidates
+        for key in [key for key in self.entries if key not in candidates]:
+            del self.entries[key]
+        if any(key not in self.entries for key in candidates):
+            self._wakeup.set()
+
+    def set_nonce(self, nonce: int):
+        """Switches to a new exchange nonce; orders signed with another one are void."""
+        if nonce != self.nonce:
+            self.nonce = nonce
+            self.invalidate()
+
+    def invalidate(self, token_id: Optional[str] = None):
+        """Drops the signed orders of token_id (all tokens by default)."""
+        for key in [key for key in self.entries if token_id is None or key[0] == token_id]:
+            del self.entries[key]
+        self._wakeup.set()
+
+    def expire(self, now: Optional[float] = None):
+        """Drops entries that expire within the safety margin."""
+        now = time.time() if now is None else now
+        for key, entry in list(self.entries.items()):
+            if entry.expires_at is not None and entry.expires_at - self.expiry_margin_seconds <= now:
+                del self.entries[key]
+                self._wakeup.set()
+
+    def take(self, token_id: str, side: str, price: float, quantity: float):
+        """Returns a signed order matching the signal and removes it from the cache, or None."""
+        self.expire()
+        key = self.key(token_id, side, price, quantity)
+        entry = self.entries.get(key)
+        if entry is None or entry.nonce != self.nonce or entry.quantity != float(quantity):
+            self.misses += 1
+            return None
+        del self.entries[key]
+        self.hits += 1
+        self._wakeup.set()
+        return entry.signed_order
+
+    async def _sign(self, key: OrderKey, order: dict) -> Optional[PresignedOrder]:
+        expires_at = time.time() + self.expiration_seconds if self.expiration_seconds else None
+        nonce = self.nonce
+        signed_order = await self.client.create_order(OrderArgs(
+            token_id=order["token_id"],
+            price=order["price"],
+            size=order["quantity"],
+            side=order["side"],
+            nonce=nonce,
+            expiration=int(expires_at) if expires_at else 0,
+        ))
+        if signed_order is None:
+            return None
+        return PresignedOrder(key, signed_order, float(order["quantity"]), nonce, expires_at)
+
+    async def refresh(self) -> int:
+        """Signs every candidate without a valid entry; returns how many were signed."""
+        self.expire()
+        missing = [(key, order) for key, order in self.candidates.items() if key not in self.entries]
+        if not missing:
+            return 0
+        signed = await asyncio.gather(*(self._sign(key, order) for key, order in missing))
+        added = 0
+        for entry in signed:
+            # Skip orders that stopped being candidates or were signed with an old nonce meanwhile
+            if entry is not None and entry.key in self.candidates and entry.nonce == self.nonce:
+                self.entries[entry.key] = entry
+                added += 1
+        return added
+
+    async def run(self, interval_seconds: float = 5):
+        """Keeps the cache filled: refreshes on changes and at least every interval_seconds."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                logging.error(f"Error pre-signing orders: {e}")
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "candidates": len(self.candidates),
+                "hits": self.hits, "misses": self.misses}
@@ -5,23 +5,24 @@ import re
 import json
 from datetime import datetime
 
-from core.clob_client import PolymarketClient
-from core.gamma_client import GammaMarketsClient
+from core.gamma_client import AsyncGammaMarketsClient
+from core.market_catalog import MarketCatalog
 
 GAME_SLUG_RE = re.compile(r"^nba-[^-]+-[^-]+-\d{4}-\d{2}-\d{2}$", re.IGNORECASE)
 
 async def main():
-    clob = PolymarketClient()
-    gamma = GammaMarketsClient()
+    catalog = MarketCatalog(ttl_seconds=3600)
 
-    markets     = gamma.get_markets(
-        closed=False,
-        liquidity_num_min=30_000.0,
-        volume_num_min=5_000.0,
-        start_date_min="2025-04-20",
-        tag_id=1,
-    )
-    nba_markets = clob.filter_markets_by_slug_keyword(markets, keyword="nba")
+    async with AsyncGammaMarketsClient() as gamma:
+        catalog.gamma_client = gamma
+        await catalog.refresh(
+            closed=False,
+            liquidity_num_min=30_000.0,
+            volume_num_min=5_000.0,
+            start_date_min="2025-04-20",
+            tag_id=1,
+        )
+    nba_markets = catalog.search("nba")
     games       = [m for m in nba_markets if GAME_SLUG_RE.match(m.get("slug", ""))]
 
     if not games:
@@ -2,24 +2,28 @@
 
 import asyncio
 from core.clob_client import PolymarketClient
-from core.gamma_client import GammaMarketsClient
+from core.gamma_client import AsyncGammaMarketsClient
+from core.market_catalog import MarketCatalog
 from data_streamer.data_streamer import DataStreamer, MarketDataStreamer
 
 async def main():
 
-    clob_client = PolymarketClient()
-    gamma_client = GammaMarketsClient()
+    # Markets are cached on disk and only downloaded again once the TTL expires
+    catalog = MarketCatalog(ttl_seconds=3600)
+    clob_client = PolymarketClient(catalog=catalog)
 
     # Fetch active events with high liquidity and volume
-    markets = gamma_client.get_markets(
-        closed=False,  # Exclude closed markets
-        liquidity_num_min=30000.0,  # Minimum liquidity
-        volume_num_min=5000.0,  # Minimum trading volume
-        start_date_min="2025-04-20",  # Markets starting after this date
-        tag_id=1,  # Filter by a specific tag
-    )
-
-    nba_markets = clob_client.filter_markets_by_slug_keyword(markets=markets,keyword="nba")
+    async with AsyncGammaMarketsClient() as gamma_client:
+        catalog.gamma_client = gamma_client
+        await catalog.refresh(
+            closed=False,  # Exclude closed markets
+            liquidity_num_min=30000.0,  # Minimum liquidity
+            volume_num_min=5000.0,  # Minimum trading volume
+            start_date_min="2025-04-20",  # Markets starting after this date
+            tag_id=1,  # Filter by a specific tag
+        )
+
+    nba_markets = catalog.search("nba")
 
     if nba_markets:
         print(f"Total markets found: {len(nba_markets)}")
@@ -0,0 +1,27 @@
+import asyncio
+from core.gamma_client import AsyncGammaMarketsClient
+from data_streamer.multi_market_streamer import MultiMarketStreamer
+
+async def main():
+
+    # Every open NBA market with some liquidity, streamed from one process
+    async with AsyncGammaMarketsClient() as gamma_client:
+        markets = await gamma_client.get_markets(
+            closed=False,
+            liquidity_num_min=5000.0,
+            tag_id=1,
+        )
+    nba_markets = gamma_client.filter_markets_by_slug_keyword(markets, keyword="nba")
+
+    streamer = MultiMarketStreamer(
+        markets=nba_markets,
+        interval_seconds=10,       # how often to pull data
+        batch_size=100,            # token ids per order book request
+        storage="csv"
+    )
+
+    # This will loop forever until  Ctrl+C
+    await streamer.stream()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,6 +4,14 @@ class BaseStrategy(ABC):
     def __init__(self):
         # We accumulate incoming market data (each row as a dict)
         self.data = []
+        # Live order books (src.core.order_book.OrderBooks) when the runner provides them
+        self.order_books = None
+
+    def attach_order_books(self, order_books):
+        """
+        Give the strategy read access to the order books maintained by the streamer.
+        """
+        self.order_books = order_books
 
     def update_data(self, row: dict):
         """
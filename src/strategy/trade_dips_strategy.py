@@ -24,12 +24,29 @@ class TradeDipsStrategy(BaseStrategy):
         self.cash = initial_cash
         self.buy_positions = []  # List of (price, shares, cash_value) tuples
         self.exited = False
+        # Running state instead of the full history: rows seen, the latest row,
+        # the previous best_buy prices and the latest one-step returns
+        self.rows = 0
+        self.last_row = None
+        self.last_best_buy = (np.nan, np.nan)
+        self.returns = (0.0, 0.0)
 
     @staticmethod
     def compute_returns(series: pd.Series):
-        returns = series.pct_change().fillna(0)
+        # No forward fill of missing prices (the pandas 2 default), so every pandas version agrees
+        returns = series.pct_change(fill_method=None).fillna(0)
         return returns
 
+    @staticmethod
+    def compute_return(previous: float, current: float) -> float:
+        """
+        One step of compute_returns: current / previous - 1, with the same edge cases
+        (NaN, e.g. from the first row or 0/0, becomes 0 and x/0 is +-inf).
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = np.float64(current) / np.float64(previous) - 1
+        return 0.0 if np.isnan(ret) else float(ret)
+
     @staticmethod
     def compute_positions(returns: pd.Series, buy_threshold: float, sell_threshold: float):
         buy = np.where(returns < buy_threshold)[0]
@@ -49,32 +66,42 @@ class TradeDipsStrategy(BaseStrategy):
         actual_value = shares * price
         return shares, actual_value
 
+    def update_data(self, row: dict):
+        """
+        Updates the running state with a new row in constant time and memory.
+        The returns match compute_returns over the full best_buy history.
+        """
+        prices = tuple(
+            np.nan if row[f"{team}_best_buy"] is None else float(row[f"{team}_best_buy"])
+            for team in (self.token1_id, self.token2_id)
+        )
+        self.returns = tuple(
+            self.compute_return(previous, current) for previous, current in zip(self.last_best_buy, prices)
+        )
+        self.last_best_buy = prices
+        # Missing prices read as NaN, as they would in a DataFrame column
+        self.last_row = {key: np.nan if value is None else value for key, value in row.items()}
+        self.rows += 1
+
     def generate_signal(self) -> dict | None:
-        if not self.data or len(self.data) < 2:
-            logging.info(f"Not enough data yet: {len(self.data)} rows")
+        if self.rows < 2:
+            logging.info(f"Not enough data yet: {self.rows} rows")
             return None
-        
-        df = pd.DataFrame(self.data)
-        if 'timestamp' in df.columns and not np.issubdtype(df['timestamp'].dtype, np.datetime64):
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
+
         team1, team2 = self.token1_id, self.token2_id
-        returns_team1 = self.compute_returns(df[f"{team1}_best_buy"])  # For buying, look at best sell price
-        returns_team2 = self.compute_returns(df[f"{team2}_best_buy"])
-        
-        logging.info(f"Team1 returns: {returns_team1.iloc[-1]:.4f}, Team2 returns: {returns_team2.iloc[-1]:.4f}")
-        
-        buy_team1, sell_team1 = self.compute_positions(returns_team1, self.buy_threshold, self.sell_threshold)
-        buy_team2, sell_team2 = self.compute_positions(returns_team2, self.buy_threshold, self.sell_threshold)
-        
-        current_index = df.index[-1]
-        current_time = df['timestamp'].iloc[-1]
-        current_prices = df.iloc[-1]
+        returns_team1, returns_team2 = self.returns
+
+        logging.info(f"Team1 returns: {returns_team1:.4f}, Team2 returns: {returns_team2:.4f}")
+
+        buy_team1, sell_team1 = returns_team1 < self.buy_threshold, returns_team1 > self.sell_threshold
+        buy_team2, sell_team2 = returns_team2 < self.buy_threshold, returns_team2 > self.sell_threshold
+
+        current_prices = self.last_row
         
         signal = None
         
         if self.selected_team is None:
-            if current_index in buy_team1 and self.cash >= self.min_order_value:
+            if buy_team1 and self.cash >= self.min_order_value:
                 buy_price = current_prices[f"{team1}_best_sell"]
                 shares, actual_value = self.calculate_shares_for_value(buy_price)
                 if shares > 0:
@@ -87,7 +114,7 @@ class TradeDipsStrategy(BaseStrategy):
                         "price": buy_price
                     }
                     logging.info(f"Selected {team1} and generated BUY limit order for {shares:.4f} shares at {buy_price:.4f} (€{actual_value:.2f})")
-            elif current_index in buy_team2 and self.cash >= self.min_order_value:
+            elif buy_team2 and self.cash >= self.min_order_value:
                 buy_price = current_prices[f"{team2}_best_sell"]
                 shares, actual_value = self.calculate_shares_for_value(buy_price)
                 if shares > 0:
@@ -105,7 +132,7 @@ class TradeDipsStrategy(BaseStrategy):
             current_buy_price = current_prices[f"{self.selected_team}_best_buy"]
             current_sell_price = current_prices[f"{self.selected_team}_best_sell"]
             
-            if self.selected_team == team1 and current_index in buy_team1 and self.cash >= self.min_order_value:
+            if self.selected_team == team1 and buy_team1 and self.cash >= self.min_order_value:
                 shares, actual_value = self.calculate_shares_for_value(current_sell_price)
                 if shares > 0:
                     signal = {
@@ -116,7 +143,7 @@ class TradeDipsStrategy(BaseStrategy):
                         "price": current_sell_price
                     }
                     logging.info(f"Generated BUY limit order for {shares:.4f} shares at {current_sell_price:.4f} (€{actual_value:.2f})")
-            elif self.selected_team == team2 and current_index in buy_team2 and self.cash >= self.min_order_value:
+            elif self.selected_team == team2 and buy_team2 and self.cash >= self.min_order_value:
                 shares, actual_value = self.calculate_shares_for_value(current_sell_price)
                 if shares > 0:
                     signal = {
@@ -127,7 +154,7 @@ class TradeDipsStrategy(BaseStrategy):
                         "price": current_sell_price
                     }
                     logging.info(f"Generated BUY limit order for {shares:.4f} shares at {current_sell_price:.4f} (€{actual_value:.2f})")
-            elif self.selected_team == team1 and current_index in sell_team1 and self.buy_positions:
+            elif self.selected_team == team1 and sell_team1 and self.buy_positions:
                 lowest_buy = min(self.buy_positions, key=lambda x: x[0])
                 buy_price, shares, cash_value = lowest_buy
                 self.buy_positions.remove(lowest_buy)
@@ -140,7 +167,7 @@ class TradeDipsStrategy(BaseStrategy):
                 }
                 self.cash += shares * current_buy_price
                 logging.info(f"Generated SELL limit order for {shares:.4f} shares at {current_buy_price:.4f}")
-            elif self.selected_team == team2 and current_index in sell_team2 and self.buy_positions:
+            elif self.selected_team == team2 and sell_team2 and self.buy_positions:
                 lowest_buy = min(self.buy_positions, key=lambda x: x[0])
                 buy_price, shares, cash_value = lowest_buy
                 self.buy_positions.remove(lowest_buy)
@@ -186,6 +213,38 @@ class TradeDipsStrategy(BaseStrategy):
         
         return signal
 
+    def candidate_orders(self, depth: int = 2, tick_size: float = 0.01) -> list:
+        """
+        Limit orders generate_signal could send next, for pre-signing: BUYs of the
+        current order size within depth ticks of each token's best_sell, and SELLs of
+        each open position (and of all of them) within depth ticks of best_buy.
+        """
+        if self.exited or self.last_row is None:
+            return []
+        tokens = [self.selected_team] if self.selected_team else [self.token1_id, self.token2_id]
+
+        def prices_around(price):
+            if not np.isfinite(price):
+                return []
+            ticks = round(price / tick_size)
+            return [round((ticks + k) * tick_size, 10) for k in range(-depth, depth + 1)
+                    if 0 < ticks + k < round(1 / tick_size)]
+
+        candidates = []
+        for token in tokens:
+            for price in prices_around(self.last_row[f"{token}_best_sell"]):
+                shares, _ = self.calculate_shares_for_value(price)
+                if shares > 0:
+                    candidates.append({"token_id": token, "side": "BUY", "price": price, "quantity": shares})
+        if self.selected_team and self.buy_positions:
+            sizes = {shares for _, shares, _ in self.buy_positions}
+            sizes.add(sum(shares for _, shares, _ in self.buy_positions))
+            for price in prices_around(self.last_row[f"{self.selected_team}_best_buy"]):
+                for shares in sorted(sizes):
+                    candidates.append({"token_id": self.selected_team, "side": "SELL", "price": price,
+                                       "quantity": shares})
+        return candidates
+
     def record_buy(self, price: float, shares: float, cash_value: float):
         """Record a buy after execution with actual shares from Polymarket."""
         if self.cash >= cash_value:
@@ -1,7 +1,5 @@
 # src/test_strategy_on_csv.py
-import csv
-import pandas as pd
-from src.strategy.trade_dips_strategy import TradeDipsStrategy
+from src.backtest.trade_dips_backtest import TradeDipsBacktest, load_market
 import logging
 import os
 
@@ -13,50 +11,30 @@ logging.basicConfig(
 )
 
 def run_strategy_on_csv(csv_path: str, token1_id: str, token2_id: str, buy_threshold: float = -0.01, sell_threshold: float = 0.01):
-    # Initialize strategy
-    strategy = TradeDipsStrategy(
-        token1_id=token1_id,
-        token2_id=token2_id,
-        buy_threshold=buy_threshold,
-        sell_threshold=sell_threshold,
-        initial_cash=5.0,
-        shares_per_buy=1.0  # Use $1 worth of tokens for simplicity
-    )
-
-    # Read CSV
+    # Read the recorded market once (CSV, columnar folder or market folder)
     if not os.path.exists(csv_path):
         logging.error(f"CSV file not found at {csv_path}")
         return
 
-    with open(csv_path, "r") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-
-        if not rows:
-            logging.error("CSV file is empty")
-            return
+    data = load_market(csv_path)
+    if not len(data):
+        logging.error("CSV file is empty")
+        return
 
-        logging.info(f"Loaded {len(rows)} rows from {csv_path}")
+    logging.info(f"Loaded {len(data)} rows from {csv_path}")
 
-        # Process each row
-        for row in rows:
-            try:
-                cleaned_row = {
-                    "timestamp": row["timestamp"],
-                    token1_id: float(row["token1_midpoint"]),
-                    token2_id: float(row["token2_midpoint"])
-                }
-                logging.info(f"Processing row: {cleaned_row}")
-                strategy.update_data(cleaned_row)
+    backtest = TradeDipsBacktest(
+        buy_threshold=buy_threshold,
+        sell_threshold=sell_threshold,
+        initial_cash=5.0,
+        max_trades=5  # $1 per buy
+    )
+    result = backtest.run(data, token_ids=[token1_id, token2_id])
 
-                # Generate signal
-                signal = strategy.generate_signal()
-                if signal:
-                    current_price = cleaned_row[signal["token_id"]]
-                    signal["quantity"] = min(1.0 / current_price, strategy.shares_per_buy)  # $1 worth
-                    logging.info(f"Signal generated: {signal}")
-            except Exception as e:
-                logging.error(f"Error processing row {row}: {e}")
+    for trade in result.trades:
+        logging.info(f"Signal generated: {trade}")
+    logging.info(f"Summary: {result.stats}")
+    return result
 
 if __name__ == "__main__":
     # Adjust these to match your setup
@@ -70,4 +48,4 @@ if __name__ == "__main__":
         token2_id=token2_id,
         buy_threshold=-0.01,  # -1%
         sell_threshold=0.01   # +1%
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,59 @@
+import csv
+import os
+import shutil
+import sys
+
+import pytest
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backtest.batch_runner import BatchBacktestRunner, discover_markets
+from src.backtest.trade_dips_backtest import TradeDipsBacktest, load_market
+from src.data_streamer.storage import NpyMarketDataWriter, columnar_directory
+from src.strategy.trade_dips_strategy import TradeDipsStrategy
+
+RECORDED_CSV = os.path.join(os.path.dirname(__file__), "..", "celtics-nets", "celtics-nets_combined.csv")
+PARAMS = dict(buy_threshold=-0.001, sell_threshold=0.001, initial_cash=10.0, max_trades=5)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    for slug in ("game-a", "game-b"):
+        (tmp_path / slug).mkdir()
+        shutil.copy(RECORDED_CSV, tmp_path / slug / f"{slug}_combined.csv")
+
+    # One market stored column-wise only
+    (tmp_path / "game-c").mkdir()
+    with open(RECORDED_CSV, newline="") as f, \
+            NpyMarketDataWriter(columnar_directory(str(tmp_path / "game-c"), "game-c")) as writer:
+        for row in csv.DictReader(f):
+            if row["timestamp"] != "timestamp":
+                writer.append(row)
+
+    (tmp_path / "not-a-market").mkdir()
+    return tmp_path
+
+
+def test_discover_markets(archive):
+    assert [os.path.basename(p) for p in discover_markets(str(archive))] == ["game-a", "game-b", "game-c"]
+
+
+def test_portfolio_report(archive, tmp_path):
+    trades_path = str(tmp_path / "trades.csv")
+    runner = BatchBacktestRunner(str(archive), TradeDipsStrategy, PARAMS, max_workers=2, max_in_flight=2,
+                                 trades_path=trades_path)
+    report = runner.run()
+
+    expected = TradeDipsBacktest(**PARAMS).run(load_market(RECORDED_CSV))
+    assert sorted(report.markets["market"]) == ["game-a", "game-b", "game-c"]
+    assert report.markets["pnl"].tolist() == pytest.approx([expected.stats["pnl"]] * 3)
+    assert report.markets["trades"].tolist() == [expected.stats["trades"]] * 3
+    assert report.summary["pnl"] == pytest.approx(3 * expected.stats["pnl"])
+    assert report.equity["cumulative_pnl"].iloc[-1] == pytest.approx(report.summary["pnl"])
+
+    with open(trades_path, newline="") as f:
+        assert len(list(csv.DictReader(f))) == 3 * expected.stats["trades"]
+
+    report.save(str(tmp_path / "report"))
+    assert sorted(os.listdir(tmp_path / "report")) == ["equity.csv", "markets.csv", "summary.json"]
@@ -0,0 +1,139 @@
+import csv
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_streamer.book_archive import BookArchiveReader, BookArchiveWriter, DeltaMarketDataWriter
+from src.data_streamer.storage import open_writer, read_csv, read_market_data
+
+RECORDED_CSV = os.path.join(os.path.dirname(__file__), "..", "celtics-nets", "celtics-nets_combined.csv")
+
+
+def recorded_rows():
+    with open(RECORDED_CSV, newline="") as f:
+        return [row for row in csv.DictReader(f) if row["timestamp"] != "timestamp"]
+
+
+def assert_same_levels(got, expected):
+    for got_array, expected_array in zip(got, expected):
+        np.testing.assert_allclose(got_array, expected_array)
+
+
+def test_snapshots_round_trip(tmp_path):
+    rows = recorded_rows()
+    source = read_csv(RECORDED_CSV)
+    path = str(tmp_path / "books.pmba")
+
+    with BookArchiveWriter(path, ["token1", "token2"], keyframe_interval=5) as writer:
+        for row in rows:
+            writer.append(row["timestamp"], {"token1": row["token1_orderbook"], "token2": row["token2_orderbook"]})
+
+    with BookArchiveReader(path) as reader:
+        assert len(reader) == len(rows)
+        assert reader.kinds.tolist()[:6] == [0, 1, 1, 1, 1, 0]
+        np.testing.assert_array_equal(reader.timestamps, source["timestamp"])
+        for index in (11, 0, 7, 5):
+            snapshot = reader.snapshot(index)
+            assert_same_levels(snapshot["token1"], source.book("token1", index))
+            assert_same_levels(snapshot["token2"], source.book("token2", index))
+        for index, snapshot in enumerate(reader):
+            assert_same_levels(snapshot["token2"], source.book("token2", index))
+
+
+def test_reopen_appends_after_last_tick(tmp_path):
+    rows = recorded_rows()
+    path = str(tmp_path / "books.pmba")
+    with BookArchiveWriter(path, ["token1"], keyframe_interval=50) as writer:
+        for row in rows[:4]:
+            writer.append(row["timestamp"], {"token1": row["token1_orderbook"]})
+    with BookArchiveWriter(path, ["token1"], keyframe_interval=50) as writer:
+        assert writer.count == 4
+        for row in rows[4:]:
+            writer.append(row["timestamp"], {"token1": row["token1_orderbook"]})
+
+    with BookArchiveReader(path) as reader:
+        assert len(reader) == len(rows)
+        assert reader.kinds[4] == 0
+        assert_same_levels(reader.snapshot(-1)["token1"], read_csv(RECORDED_CSV).book("token1", len(rows) - 1))
+
+
+def test_delta_backend_is_much_smaller(tmp_path):
+    folder = tmp_path / "celtics-nets"
+    folder.mkdir()
+    with DeltaMarketDataWriter(str(folder), "celtics-nets", keyframe_interval=100) as writer:
+        for row in recorded_rows():
+            writer.append(row)
+
+    archive_size = os.path.getsize(folder / "celtics-nets_books.pmba")
+    assert archive_size * 5 < os.path.getsize(RECORDED_CSV)
+
+    source = read_csv(RECORDED_CSV)
+    loaded = read_market_data(str(folder))
+    assert len(loaded) == len(source)
+    assert loaded.token_ids == source.token_ids
+    assert_same_levels(loaded.book("token1", 9), source.book("token1", 9))
+
+
+def test_reopen_truncates_torn_tail(tmp_path):
+    rows = recorded_rows()
+    path = str(tmp_path / "books.pmba")
+    with BookArchiveWriter(path, ["token1"], keyframe_interval=50) as writer:
+        for row in rows[:4]:
+            writer.append(row["timestamp"], {"token1": row["token1_orderbook"]})
+    # A crash in the middle of the fifth record
+    with open(path, "ab") as f:
+        f.write(b"\x01\x04\x00\x00\x00garbage")
+
+    with BookArchiveWriter(path, ["token1"], keyframe_interval=50) as writer:
+        assert writer.count == 4
+        for row in rows[4:]:
+            writer.append(row["timestamp"], {"token1": row["token1_orderbook"]})
+
+    source = read_csv(RECORDED_CSV)
+    with BookArchiveReader(path) as reader:
+        assert len(reader) == len(rows)
+        assert reader.end == os.path.getsize(path)
+        for index, snapshot in enumerate(reader):
+            assert_same_levels(snapshot["token1"], source.book("token1", index))
+
+
+def test_delta_backend_refuses_a_csv_backend_file(tmp_path):
+    folder = tmp_path / "celtics-nets"
+    folder.mkdir()
+    row = recorded_rows()[0]
+    with open_writer("csv", str(folder), "celtics-nets") as writer:
+        writer.append(row)
+    with pytest.raises(ValueError):
+        DeltaMarketDataWriter(str(folder), "celtics-nets")
+    with open(folder / "celtics-nets_combined.csv") as f:
+        assert len(f.readlines()) == 2
+
+
+def test_delta_backend_drops_archive_ticks_beyond_the_csv(tmp_path):
+    folder = tmp_path / "celtics-nets"
+    folder.mkdir()
+    rows = recorded_rows()
+    with DeltaMarketDataWriter(str(folder), "celtics-nets") as writer:
+        for row in rows[:4]:
+            writer.append(row)
+    # A crash after the fifth tick reached the archive but not the CSV
+    with BookArchiveWriter(str(folder / "celtics-nets_books.pmba"), ["token1", "token2"]) as archive:
+        archive.append(rows[4]["timestamp"], {"token1": rows[4]["token1_orderbook"],
+                                              "token2": rows[4]["token2_orderbook"]})
+
+    with DeltaMarketDataWriter(str(folder), "celtics-nets") as writer:
+        for row in rows[4:]:
+            writer.append(row)
+
+    source = read_csv(RECORDED_CSV)
+    loaded = read_market_data(str(folder))
+    assert len(loaded) == len(source)
+    with BookArchiveReader(str(folder / "celtics-nets_books.pmba")) as reader:
+        assert len(reader) == len(source)
+    for index in range(len(source)):
+        assert_same_levels(loaded.book("token1", index), source.book("token1", index))
@@ -0,0 +1,79 @@
+import asyncio
+import csv
+import os
+import sys
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_streamer.csv_tailer import CsvTailer
+
+HEADER = ["timestamp", "token1_midpoint", "token2_midpoint"]
+
+
+def write_rows(path, rows, mode="a"):
+    with open(path, mode, newline="") as f:
+        writer = csv.writer(f)
+        for row in rows:
+            writer.writerow(row)
+
+
+def test_reads_only_appended_rows(tmp_path):
+    path = tmp_path / "market_combined.csv"
+    write_rows(path, [HEADER, ["t0", "0.5", "0.5"]], mode="w")
+    tailer = CsvTailer(str(path))
+
+    assert tailer.read_new_rows() == [{"timestamp": "t0", "token1_midpoint": "0.5", "token2_midpoint": "0.5"}]
+    assert tailer.read_new_rows() == []
+
+    write_rows(path, [["t1", "0.6", "0.4"], HEADER, ["t2", "0.7", "0.3"]])
+    rows = tailer.read_new_rows()
+    assert [row["timestamp"] for row in rows] == ["t1", "t2"]
+    assert tailer.rows_read == 3
+
+
+def test_partial_line_is_held_back(tmp_path):
+    path = tmp_path / "market_combined.csv"
+    write_rows(path, [HEADER], mode="w")
+    tailer = CsvTailer(str(path))
+
+    with open(path, "a") as f:
+        f.write('t0,"0.5')
+    assert tailer.read_new_rows() == []
+
+    with open(path, "a") as f:
+        f.write('",0.5\r\n')
+    assert tailer.read_new_rows() == [{"timestamp": "t0", "token1_midpoint": "0.5", "token2_midpoint": "0.5"}]
+
+
+def test_rotation_restarts_from_beginning(tmp_path):
+    path = tmp_path / "market_combined.csv"
+    write_rows(path, [HEADER, ["t0", "0.5", "0.5"], ["t1", "0.6", "0.4"]], mode="w")
+    tailer = CsvTailer(str(path))
+    assert len(tailer.read_new_rows()) == 2
+
+    replacement = tmp_path / "replacement.csv"
+    write_rows(replacement, [HEADER, ["t9", "0.1", "0.9"]], mode="w")
+    os.replace(replacement, path)
+
+    assert tailer.read_new_rows() == [{"timestamp": "t9", "token1_midpoint": "0.1", "token2_midpoint": "0.9"}]
+
+
+def test_wait_for_rows_wakes_on_notify(tmp_path):
+    path = tmp_path / "market_combined.csv"
+    write_rows(path, [HEADER], mode="w")
+    tailer = CsvTailer(str(path), poll_interval=60)
+
+    async def scenario():
+        async def writer():
+            await asyncio.sleep(0.01)
+            write_rows(path, [["t0", "0.5", "0.5"]])
+            tailer.notify()
+
+        task = asyncio.create_task(writer())
+        rows = await asyncio.wait_for(tailer.wait_for_rows(timeout=5), 1)
+        await task
+        assert await tailer.wait_for_rows(timeout=0.01) == []
+        return rows
+
+    assert [row["timestamp"] for row in asyncio.run(scenario())] == ["t0"]
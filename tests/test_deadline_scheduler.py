@@ -0,0 +1,129 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.execution.deadline_scheduler import DeadlineScheduler
+from src.execution.order_tracker import RECONCILE, TIMEOUT, OrderTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class MockOrderExecutor:
+    """Records cancels and status checks"""
+
+    def __init__(self, not_canceled=None):
+        self.cancelled = []
+        self.not_canceled = not_canceled or {}
+
+    async def cancel_orders(self, order_ids):
+        self.cancelled.append((time.monotonic(), list(order_ids)))
+        return {"canceled": [order_id for order_id in order_ids if order_id not in self.not_canceled],
+                "not_canceled": {order_id: reason for order_id, reason in self.not_canceled.items()
+                                 if order_id in order_ids}}
+
+
+def test_pop_due_in_deadline_order():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(clock)
+    scheduler.schedule(TIMEOUT, "a", 30)
+    scheduler.schedule(TIMEOUT, "b", 10)
+    scheduler.schedule("status", "a", 20)
+    scheduler.schedule(TIMEOUT, "c", 40)
+    scheduler.cancel(TIMEOUT, "c")
+    # Rescheduling replaces the earlier deadline
+    scheduler.schedule(TIMEOUT, "b", 25)
+
+    assert scheduler.next_deadline() == 20
+    clock.now = 25
+    assert scheduler.pop_due() == [("status", "a"), (TIMEOUT, "b")]
+    assert len(scheduler) == 1 and (TIMEOUT, "a") in scheduler
+    clock.now = 100
+    assert scheduler.pop_due() == [(TIMEOUT, "a")]
+    assert scheduler.next_deadline() is None
+
+
+def test_stale_entries_are_compacted():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(clock)
+    for i in range(1000):
+        scheduler.schedule(TIMEOUT, "order", i)
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) <= 65
+    assert scheduler.deadline(TIMEOUT, "order") == 999
+
+
+def test_timeouts_fire_when_due():
+    executor = MockOrderExecutor()
+    tracker = OrderTracker(executor=executor, status_check_interval=3600)
+
+    async def main():
+        task = asyncio.create_task(tracker.scheduler.run(tracker._handle_deadlines))
+        started = time.monotonic()
+        await tracker.track_order("slow", "token", "BUY", 5, 0.4, timeout_minutes=10)
+        await tracker.track_order("fast", "token", "BUY", 5, 0.4, timeout_minutes=0.001)
+        await asyncio.sleep(0.2)
+        task.cancel()
+        return started
+
+    started = asyncio.run(main())
+    (cancelled_at, order_ids), = executor.cancelled
+    assert order_ids == ["fast"]
+    assert 0.06 <= cancelled_at - started < 0.15
+    assert list(tracker.active_orders) == ["slow"]
+    assert (TIMEOUT, "fast") not in tracker.scheduler
+
+
+def test_one_reconciliation_timer_and_fills_drop_deadlines():
+    executor = MockOrderExecutor()
+    tracker = OrderTracker(executor=executor, status_check_interval=10)
+
+    async def main():
+        for order_id in ("a", "b", "c"):
+            await tracker.track_order(order_id, "token", "BUY", 5, 0.4)
+        await tracker._handle_order_message({"action": "UPDATE", "order_id": "b", "matched_amount": 5})
+
+    asyncio.run(main())
+    assert (RECONCILE, None) in tracker.scheduler
+    assert (TIMEOUT, "b") not in tracker.scheduler
+    assert len(tracker.scheduler) == 3  # timeouts of "a" and "c" and the reconciliation
+
+
+def test_orders_matched_while_cancelling_stay_tracked():
+    executor = MockOrderExecutor(not_canceled={"b": "order can't be found - already canceled or matched"})
+    filled = []
+
+    async def on_filled(order):
+        filled.append(order.order_id)
+
+    tracker = OrderTracker(executor=executor, callback=on_filled, status_check_interval=10)
+
+    async def main():
+        for order_id in ("a", "b"):
+            await tracker.track_order(order_id, "token", "BUY", 5, 0.4)
+        tracker.scheduler.cancel(RECONCILE, None)
+        await tracker._handle_deadlines([(TIMEOUT, "a"), (TIMEOUT, "b")])
+        assert list(tracker.active_orders) == ["b"]
+        assert (RECONCILE, None) in tracker.scheduler
+        await tracker._handle_order_message({"action": "UPDATE", "order_id": "b", "matched_amount": 5})
+
+    asyncio.run(main())
+    assert filled == ["b"]
+    assert not tracker.active_orders
+
+
+def test_cleanup_interval_is_deprecated():
+    with pytest.warns(DeprecationWarning):
+        tracker = OrderTracker(cleanup_interval=300)
+    assert not hasattr(tracker, "cleanup_interval")
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+
+import httpx
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.gamma_client import AsyncGammaMarketsClient
+
+TOTAL_MARKETS = 1234
+
+
+def make_client(requested, statuses=None):
+    statuses = statuses or {}
+
+    def handler(request):
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        requested.append(offset)
+        status = statuses.pop(offset, 200)
+        if isinstance(status, Exception):
+            raise status
+        if status != 200:
+            return httpx.Response(status)
+        assert request.url.params["closed"] == "false"
+        markets = [{"id": i, "slug": f"market-{i}"} for i in range(offset, min(offset + limit, TOTAL_MARKETS))]
+        return httpx.Response(200, json=markets)
+
+    gamma = AsyncGammaMarketsClient(max_parallel_pages=4)
+    gamma._client = httpx.AsyncClient(base_url=gamma.base_url, transport=httpx.MockTransport(handler))
+    return gamma
+
+
+def test_concurrent_pages_are_merged_in_order():
+    requested = []
+
+    async def scenario():
+        async with make_client(requested) as gamma:
+            return await gamma.get_markets(limit=100, closed=False)
+
+    markets = asyncio.run(scenario())
+    assert [m["id"] for m in markets] == list(range(TOTAL_MARKETS))
+    # the short page at offset 1200 stops the fan-out: at most one page per worker beyond it
+    assert max(requested) <= 1200 + 4 * 100
+    assert len(requested) == len(set(requested))
+
+
+def test_failed_page_returns_none():
+    requested = []
+
+    async def scenario():
+        async with make_client(requested, statuses={300: 500}) as gamma:
+            return await gamma.get_markets(limit=100, closed=False)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_timed_out_page_returns_none():
+    requested = []
+
+    async def scenario():
+        async with make_client(requested, statuses={300: httpx.ReadTimeout("timed out")}) as gamma:
+            return await gamma.get_markets(limit=100, closed=False)
+
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.latency import LatencyHistogram, LatencyRecorder
+
+
+def test_histogram_percentiles_within_bucket_error():
+    histogram = LatencyHistogram()
+    for value in range(1, 100001):
+        histogram.record(value)
+
+    assert histogram.count == 100000
+    assert histogram.min == 1 and histogram.max == 100000
+    assert histogram.mean == pytest.approx(50000.5)
+    for percent, exact in ((50, 50000), (90, 90000), (99, 99000), (100, 100000)):
+        assert histogram.percentile(percent) == pytest.approx(exact, rel=2 ** -6)
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in (3, 3, 7, 120):
+        histogram.record(value)
+    assert histogram.buckets() == [(3, 2), (7, 1), (120, 1)]
+    assert histogram.percentile(50) == 3
+    assert histogram.percentile(75) == 7
+
+
+def test_merge():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record(10)
+    b.record(5000)
+    b.record(20)
+    a.merge(b)
+    assert (a.count, a.min, a.max, a.total) == (3, 10, 5000, 5030)
+
+
+def test_recorder_stage_and_span_latencies(tmp_path):
+    recorder = LatencyRecorder()
+    ms = 1_000_000
+    for stage, t in (("fetch_start", 0), ("fetched", 40 * ms), ("written", 41 * ms),
+                     ("read", 45 * ms), ("signal", 46 * ms), ("order_sent", 46 * ms),
+                     ("order_acked", 146 * ms)):
+        recorder.mark("t1", stage, t)
+    # Row without an order: only the data and signal stages
+    for stage, t in (("fetch_start", 0), ("fetched", 10 * ms), ("signal", 12 * ms)):
+        recorder.mark("t2", stage, t)
+
+    latencies = recorder.finish("t1")
+    assert latencies["fetched"] == 40 and latencies["order_acked"] == 100
+    assert latencies["tick_to_trade"] == 146 and latencies["read_to_trade"] == 101
+    assert recorder.finish("t2")["signal"] == 2
+    assert recorder.finish("t2") is None
+    assert recorder.histograms["tick_to_signal"].count == 2
+    assert recorder.histograms["tick_to_trade"].count == 1
+
+    path = tmp_path / "latency.json"
+    recorder.export(str(path))
+    with open(path) as f:
+        exported = json.load(f)
+    assert exported["stages"]["tick_to_trade"]["p50_ms"] == pytest.approx(146, rel=2 ** -6)
+    assert "tracked" not in exported["stages"]
+    assert [trace["tick"] for trace in exported["recent"]] == ["t1", "t2"]
+
+
+def test_open_traces_are_bounded():
+    recorder = LatencyRecorder(max_open=3)
+    for i in range(5):
+        recorder.mark(str(i), "fetch_start")
+    assert list(recorder.traces) == ["2", "3", "4"]
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import os
+import sys
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.market_catalog import MarketCatalog
+
+MARKETS = [
+    {
+        "id": "1",
+        "slug": "nba-bos-bkn-2025-04-20",
+        "conditionId": "0xabc",
+        "clobTokenIds": json.dumps(["111", "222"]),
+        "events": [{"tags": [{"id": "1", "slug": "sports", "label": "Sports"}]}],
+    },
+    {
+        "id": "2",
+        "slug": "will-it-rain",
+        "conditionId": "0xdef",
+        "clobTokenIds": json.dumps(["333", "444"]),
+        "tags": [{"id": "7", "slug": "weather"}],
+    },
+]
+
+
+class FakeGamma:
+    def __init__(self):
+        self.calls = []
+
+    async def get_markets(self, **filters):
+        self.calls.append(filters)
+        return MARKETS
+
+
+def test_indexes_and_warm_restart(tmp_path):
+    path = str(tmp_path / "catalog.sqlite")
+    gamma = FakeGamma()
+    catalog = MarketCatalog(path, ttl_seconds=3600, gamma_client=gamma)
+
+    assert asyncio.run(catalog.refresh(closed=False)) is True
+    assert catalog.by_slug("will-it-rain")["id"] == "2"
+    assert catalog.by_token_id("222")["id"] == "1"
+    assert catalog.by_condition_id("0xdef")["slug"] == "will-it-rain"
+    assert [m["id"] for m in catalog.by_tag("sports")] == ["1"]
+    assert [m["id"] for m in catalog.by_tag(7)] == ["2"]
+    assert catalog.tokens_for_slug("nba-bos-bkn-2025-04-20") == ("nba-bos-bkn-2025-04-20", "111", "222")
+    assert catalog.tokens_for_slug("missing") == (None, None, None)
+    assert [m["id"] for m in catalog.search("nba")] == ["1"]
+    catalog.close()
+
+    # A fresh catalog with the same filters is served from disk
+    warm = MarketCatalog(path, ttl_seconds=3600, gamma_client=gamma)
+    assert len(warm) == 2
+    assert asyncio.run(warm.refresh(closed=False)) is False
+    assert warm.by_token_id("333")["slug"] == "will-it-rain"
+
+    # Other filters or an expired TTL download again
+    assert asyncio.run(warm.refresh(closed=True)) is True
+    warm.ttl_seconds = -1
+    assert asyncio.run(warm.refresh(closed=True)) is True
+    assert len(gamma.calls) == 3
+    warm.close()
@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from py_clob_client.clob_types import OrderBookSummary, OrderSummary
+
+from src.core.market_snapshot import MarketSnapshot
+
+
+def test_snapshot_derives_top_of_book():
+    book = OrderBookSummary(
+        market="0xm", asset_id="123", timestamp="1742078172992",
+        bids=[OrderSummary(price="0.01", size="4819"), OrderSummary(price="0.83", size="12"), OrderSummary(price="0.5", size="1")],
+        asks=[OrderSummary(price="0.99", size="5"), OrderSummary(price="0.84", size="30")],
+    )
+    snapshot = MarketSnapshot.from_order_book(book)
+
+    assert snapshot.token_id == "123"
+    assert snapshot.top_of_book() == [0.835, 0.83, 0.84, 0.01]
+    assert snapshot.bids[0] == (0.83, 12.0)
+    assert snapshot.asks == [(0.84, 30.0), (0.99, 5.0)]
+    assert snapshot.book is book
+
+
+def test_one_sided_book():
+    book = OrderBookSummary(market="0xm", asset_id="123", timestamp="1",
+                            bids=[OrderSummary(price="0.2", size="1")], asks=[])
+    snapshot = MarketSnapshot.from_order_book(book)
+    assert snapshot.top_of_book() == [None, 0.2, None, None]
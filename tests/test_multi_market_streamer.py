@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sys
+
+# Add the project root (and src, which the streamer modules import from) to Python path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from py_clob_client.clob_types import OrderBookSummary, OrderSummary
+
+from src.data_streamer.multi_market_streamer import MultiMarketStreamer, markets_from_gamma
+from src.data_streamer.storage import read_csv
+
+
+class FakeBookClient:
+    def __init__(self):
+        self.requests = []
+
+    def get_order_books(self, token_ids):
+        self.requests.append(list(token_ids))
+        return [
+            OrderBookSummary(market="m", asset_id=token_id, timestamp="1",
+                             bids=[OrderSummary(price="0.4", size="1")], asks=[OrderSummary(price="0.6", size="1")])
+            for token_id in token_ids
+            if token_id != "missing"
+        ]
+
+
+def test_markets_from_gamma():
+    markets = markets_from_gamma([
+        {"slug": "a-b", "clobTokenIds": '["1", "2"]'},
+        {"slug": "no-tokens", "clobTokenIds": None},
+    ])
+    assert [tuple(m) for m in markets] == [("a-b", "1", "2")]
+
+
+def test_tick_batches_requests_and_writes_per_market(tmp_path):
+    client = FakeBookClient()
+    markets = [(f"market-{i}", f"{i}a", f"{i}b") for i in range(5)] + [("broken", "5a", "missing")]
+    streamer = MultiMarketStreamer(markets, batch_size=4, max_concurrency=2, root=str(tmp_path), client=client)
+
+    snapshots = asyncio.run(streamer.fetch_snapshots())
+    assert sorted(len(batch) for batch in client.requests) == [4, 4, 4]
+    assert streamer.write_tick("2025-03-15T22:36:15", snapshots) == 5
+    streamer.close()
+
+    data = read_csv(str(tmp_path / "market-3" / "market-3_combined.csv"))
+    assert data["token2_midpoint"].tolist() == [0.5]
+    assert data.token_ids == {"token1": "3a", "token2": "3b"}
+    assert not (tmp_path / "broken").exists()
+    assert streamer.books["4b"].best_ask_price == 0.6
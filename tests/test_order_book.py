@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from py_clob_client.clob_types import OrderBookSummary, OrderSummary
+
+from src.core.order_book import BUY, SELL, OrderBook, OrderBooks
+
+
+def test_best_prices_and_level_updates():
+    book = OrderBook("token")
+    # bids arrive ascending and asks descending, as in OrderBookSummary
+    book.apply_snapshot([("0.01", "100"), ("0.48", "20"), ("0.5", "5")], [("0.99", "50"), ("0.55", "7"), ("0.52", "3")])
+
+    assert book.best_bid() == (0.5, 5.0)
+    assert book.best_ask() == (0.52, 3.0)
+    assert book.midpoint == 0.51
+    assert book.spread == 0.02
+
+    book.set_level(BUY, "0.5", 0)
+    book.set_level(SELL, 0.51, 1)
+    assert book.best_bid() == (0.48, 20.0)
+    assert book.best_ask() == (0.51, 1.0)
+    assert book.levels(SELL, depth=2) == [(0.51, 1.0), (0.52, 3.0)]
+
+
+def test_depth_queries():
+    book = OrderBook("token")
+    book.apply_snapshot([("0.4", "1"), ("0.45", "2"), ("0.5", "3")], [("0.55", "4"), ("0.6", "5")])
+
+    assert book.depth(BUY, 0.45) == 5.0
+    assert book.depth(SELL, 0.6) == 9.0
+    assert book.cumulative_depth(BUY) == [(0.5, 3.0), (0.45, 5.0), (0.4, 6.0)]
+    assert book.snapshot() == {"bids": [(0.5, 3.0), (0.45, 2.0), (0.4, 1.0)], "asks": [(0.55, 4.0), (0.6, 5.0)]}
+
+
+def test_off_grid_prices_refine_the_grid():
+    book = OrderBook("token")
+    book.apply_snapshot([("0.96", "10")], [("0.97", "3")])
+    book.set_level(SELL, "0.965", "2")
+    assert book.tick_size == 0.001
+    assert book.best_ask() == (0.965, 2.0)
+    assert book.best_bid() == (0.96, 10.0)
+    with pytest.raises(ValueError):
+        book.index(1.5)
+
+
+def test_order_books_apply_events_and_summaries():
+    books = OrderBooks()
+    changed = books.apply_event({"event_type": "book", "asset_id": "a", "market": "m",
+                                 "bids": [{"price": "0.3", "size": "1"}], "asks": [{"price": "0.4", "size": "2"}]})
+    assert changed == {"a"}
+    # updates for unknown books are ignored until a snapshot arrives
+    assert books.apply_event({"event_type": "price_change", "price_changes": [
+        {"asset_id": "b", "price": "0.5", "side": "BUY", "size": "1"},
+        {"asset_id": "a", "price": "0.35", "side": "BUY", "size": "4"},
+    ]}) == {"a"}
+    assert books["a"].best_bid() == (0.35, 4.0)
+    assert "b" not in books
+
+    summary = OrderBookSummary(market="m", asset_id="b", timestamp="1",
+                               bids=[OrderSummary(price="0.2", size="1")], asks=[OrderSummary(price="0.25", size="1")])
+    assert books.apply_summary(summary).midpoint == 0.225
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+from py_clob_client.client import ClobClient
+from py_clob_client.clob_types import ApiCreds, CreateOrderOptions, OrderArgs
+from py_clob_client.signing.hmac import build_hmac_signature
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.async_clob_client import AsyncPolymarketClient, merge_post_responses
+from src.execution.order_executor import OrderExecutor
+from src.execution.order_tracker import OrderTracker
+
+HOST = "https://clob.example"
+TOKEN_ID = "62697312879578878537492465609249634498018844363287127652537828808816942160117"
+CREDS = ApiCreds(api_key="key", api_secret="c2VjcmV0c2VjcmV0c2VjcmV0c2VjcmV0", api_passphrase="pass")
+
+
+def clob_client():
+    return ClobClient(HOST, chain_id=137, key="0x" + "11" * 32, creds=CREDS)
+
+
+class SigningClobClient(ClobClient):
+    """Signs with a fixed tick size instead of looking it up on the exchange."""
+
+    def create_order(self, order_args, options=None):
+        return self.builder.create_order(order_args, CreateOrderOptions(tick_size="0.01", neg_risk=False))
+
+
+def test_post_order_sends_signed_body():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"success": True, "orderId": "0xabc", "status": "live"})
+
+    clob = SigningClobClient(HOST, chain_id=137, key="0x" + "11" * 32, creds=CREDS)
+    executor = OrderExecutor(AsyncPolymarketClient(clob, transport=httpx.MockTransport(handler)))
+
+    async def main():
+        try:
+            return await executor.execute_signal(
+                {"token_id": TOKEN_ID, "side": "BUY", "order_type": "limit", "price": 0.45, "quantity": 5})
+        finally:
+            await executor.close()
+
+    response = asyncio.run(main())
+    assert response["orderId"] == "0xabc"
+
+    request = requests[0]
+    assert request.method == "POST" and request.url.path == "/order"
+    body = json.loads(request.content)
+    assert body["owner"] == "key" and body["orderType"] == "GTC"
+    assert body["order"]["tokenId"] == TOKEN_ID and body["order"]["side"] == "BUY"
+    expected = build_hmac_signature(CREDS.api_secret, int(request.headers["POLY_TIMESTAMP"]), "POST", "/order",
+                                    request.content.decode())
+    assert request.headers["POLY_SIGNATURE"] == expected
+    assert request.headers["POLY_API_KEY"] == "key"
+
+
+def test_orders_are_in_flight_concurrently():
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        order_id = json.loads(request.content)["orderID"]
+        return httpx.Response(200, json={"canceled": [order_id], "not_canceled": {}})
+
+    executor = OrderExecutor(AsyncPolymarketClient(clob_client(), transport=httpx.MockTransport(handler)))
+
+    async def main():
+        try:
+            return await asyncio.gather(*(executor.cancel_order(f"0x{i}") for i in range(10)))
+        finally:
+            await executor.close()
+
+    responses = asyncio.run(main())
+    assert [r["canceled"] for r in responses] == [[f"0x{i}"] for i in range(10)]
+    assert in_flight["max"] == 10
+
+
+def test_get_order_status_and_errors():
+    def handler(request):
+        if request.url.path.endswith("/missing"):
+            return httpx.Response(404, json={"error": "not found"})
+        return httpx.Response(200, json={"id": "0x1", "status": "MATCHED", "size_matched": "5", "original_size": "5"})
+
+    executor = OrderExecutor(AsyncPolymarketClient(clob_client(), transport=httpx.MockTransport(handler)))
+
+    async def main():
+        try:
+            return await executor.get_order_status("0x1"), await executor.get_order_status("missing")
+        finally:
+            await executor.close()
+
+    status, missing = asyncio.run(main())
+    assert status == {"status": "filled", "filledQuantity": 5.0}
+    assert missing is None
+
+
+def test_batch_post_maps_results_back_to_signals():
+    batches = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        batches.append(len(body))
+        if len(batches) == 1:
+            return httpx.Response(200, json=[{"success": True, "orderId": f"0x{order['order']['salt']}",
+                                              "status": "live"} for order in body])
+        return httpx.Response(500, json={"error": "busy"})
+
+    clob = SigningClobClient(HOST, chain_id=137, key="0x" + "11" * 32, creds=CREDS)
+    executor = OrderExecutor(AsyncPolymarketClient(clob, transport=httpx.MockTransport(handler)))
+    signals = [{"token_id": TOKEN_ID, "side": "BUY", "order_type": "limit", "price": 0.40, "quantity": 5 + i}
+               for i in range(20)]
+    signals.insert(3, {"token_id": TOKEN_ID, "side": "BUY", "order_type": "stop"})
+
+    async def main():
+        try:
+            return await executor.execute_signals(signals)
+        finally:
+            await executor.close()
+
+    responses = asyncio.run(main())
+    assert sorted(batches) == [5, 15]
+    assert len(responses) == 21 and responses[3] is None
+    assert sum(response is not None for response in responses) == 15
+    assert all(response["status"] == "live" for response in responses if response)
+
+
+def test_merge_post_responses_keeps_one_result_per_order():
+    orders = list(range(40))
+    responses = [[{"orderId": i} for i in range(15)], None, [{"orderId": 0}]]
+
+    results = merge_post_responses(orders, responses)
+    assert len(results) == 40
+    assert results[:15] == [{"orderId": i} for i in range(15)]
+    # A failed batch and a batch answered with the wrong count map to None
+    assert results[15:] == [None] * 25
+
+
+def test_flatten_fifty_orders_in_one_request():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        ids = json.loads(request.content)
+        return httpx.Response(200, json={"canceled": ids[1:], "not_canceled": {ids[0]: "already matched"}})
+
+    executor = OrderExecutor(AsyncPolymarketClient(clob_client(), transport=httpx.MockTransport(handler)))
+    tracker = OrderTracker(executor=executor)
+
+    async def main():
+        for i in range(50):
+            await tracker.track_order(f"0x{i}", TOKEN_ID, "BUY", 5, 0.4)
+        try:
+            await tracker.cancel_orders(list(tracker.active_orders))
+        finally:
+            await executor.close()
+
+    asyncio.run(main())
+    assert len(requests) == 1 and requests[0].method == "DELETE" and requests[0].url.path == "/orders"
+    # The matched order stays tracked until its fill is seen
+    assert list(tracker.active_orders) == ["0x0"]
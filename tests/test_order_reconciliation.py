@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+
+import httpx
+from py_clob_client.client import ClobClient
+from py_clob_client.clob_types import ApiCreds
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.async_clob_client import AsyncPolymarketClient
+from src.execution.order_executor import OrderExecutor
+from src.execution.order_tracker import RECONCILE, OrderTracker
+
+CREDS = ApiCreds(api_key="key", api_secret="c2VjcmV0c2VjcmV0c2VjcmV0c2VjcmV0", api_passphrase="pass")
+
+
+def paged(items, cursor, page_size=2):
+    """One page of items in the exchange's next_cursor format (cursor = start index)."""
+    start = 0 if cursor == "MA==" else int(cursor)
+    end = start + page_size
+    return {"data": items[start:end], "next_cursor": str(end) if end < len(items) else "LTE="}
+
+
+def test_reconcile_applies_fills_and_cancels_in_one_sweep():
+    open_orders = [
+        {"id": "partial", "status": "LIVE", "size_matched": "2", "original_size": "10"},
+        {"id": "resting", "status": "LIVE", "size_matched": "0", "original_size": "5"},
+        {"id": "someone-else", "status": "LIVE", "size_matched": "0", "original_size": "1"},
+    ]
+    trades = [
+        {"status": "CONFIRMED", "taker_order_id": "taker", "size": "5", "maker_orders": []},
+        {"status": "MATCHED", "taker_order_id": "x", "size": "3",
+         "maker_orders": [{"order_id": "maker", "matched_amount": "3"}]},
+        {"status": "MATCHED", "taker_order_id": "y", "size": "1",
+         "maker_orders": [{"order_id": "maker", "matched_amount": "1"}, {"order_id": "gone", "matched_amount": "1"}]},
+        {"status": "FAILED", "taker_order_id": "gone", "size": "3", "maker_orders": []},
+        # 1 / 0.45 shares were signed as 2.22
+        {"status": "MATCHED", "taker_order_id": "fraction", "size": "2.22", "maker_orders": []},
+    ]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        items = open_orders if request.url.path == "/data/orders" else trades
+        return httpx.Response(200, json=paged(items, request.url.params["next_cursor"]))
+
+    clob = ClobClient("https://clob.example", chain_id=137, key="0x" + "11" * 32, creds=CREDS)
+    executor = OrderExecutor(AsyncPolymarketClient(clob, transport=httpx.MockTransport(handler)))
+    filled = []
+
+    async def on_fill(order):
+        filled.append(order.order_id)
+
+    tracker = OrderTracker(executor=executor, callback=on_fill)
+
+    async def main():
+        try:
+            for order_id, quantity in (("partial", 10), ("resting", 5), ("taker", 5), ("maker", 4), ("gone", 4),
+                                       ("fraction", 1 / 0.45)):
+                await tracker.track_order(order_id, "token", "BUY", quantity, 0.5)
+            return await tracker.reconcile()
+        finally:
+            await executor.close()
+
+    changes = asyncio.run(main())
+    assert changes == {"partially_filled": 1, "filled": 3, "cancelled": 1}
+    # The partly matched cancel reaches the callback too
+    assert sorted(filled) == ["fraction", "gone", "maker", "taker"]
+    assert sorted(tracker.active_orders) == ["partial", "resting"]
+    assert tracker.active_orders["partial"].filled_quantity == 2
+    assert tracker.get_exposure("token").filled_quantity == 2 + 5 + 4 + 1 + 2.22
+    # Two paginated sweeps: 2 pages of open orders and 3 pages of trades
+    assert sorted(request.url.path for request in requests) == ["/data/orders"] * 2 + ["/data/trades"] * 3
+    assert all("after" in request.url.params for request in requests if request.url.path == "/data/trades")
+
+
+def test_failed_sweep_changes_nothing():
+    class FailingExecutor:
+        async def get_open_orders(self):
+            return None
+
+        async def get_trades(self, after=None):
+            return []
+
+    tracker = OrderTracker(executor=FailingExecutor(), status_check_interval=0)
+
+    async def main():
+        await tracker.track_order("a", "token", "BUY", 5, 0.5)
+        await tracker._handle_deadlines(tracker.scheduler.pop_due())
+
+    asyncio.run(main())
+    assert list(tracker.active_orders) == ["a"]
+    assert (RECONCILE, None) in tracker.scheduler
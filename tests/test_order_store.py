@@ -0,0 +1,88 @@
+import asyncio
+import os
+import random
+import sys
+
+import pytest
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.execution.order_store import OrderStore
+from src.execution.order_tracker import OrderStatus, OrderTracker
+
+
+def order(order_id, token_id="A", side="BUY", quantity=10.0, price=0.5, status="live"):
+    return OrderStatus(order_id=order_id, token_id=token_id, side=side, quantity=quantity, price=price, status=status)
+
+
+def test_order_status_is_slotted():
+    assert not hasattr(order("1"), "__dict__")
+
+
+def test_indexes_and_aggregates():
+    store = OrderStore()
+    store.add(order("1", "A", "BUY", 10, 0.5))
+    store.add(order("2", "A", "SELL", 4, 0.6))
+    store.add(order("3", "B", "BUY", 2, 0.3, status="pending"))
+
+    store.fill("1", 4)
+    store.update("1", status="matched")
+    assert [o.order_id for o in store.select(token_id="A", status="matched")] == ["1"]
+    assert [o.order_id for o in store.select(side="BUY")] == ["1", "3"]
+
+    buys = store.exposure("A", "BUY")
+    assert (buys.orders, buys.open_quantity, buys.filled_quantity) == (1, 6, 4)
+    assert buys.open_notional == pytest.approx(3.0) and buys.filled_notional == pytest.approx(2.0)
+    assert store.exposure("A").notional == pytest.approx(5.0 + 2.4)
+
+    # Filled quantity outlives the order
+    store.remove("1")
+    buys = store.exposure("A", "BUY")
+    assert (buys.orders, buys.notional, buys.filled_quantity) == (0, 0.0, 4)
+    assert store.select(status="matched") == []
+    assert store.exposure("C").orders == 0
+
+
+def test_running_totals_match_a_full_scan():
+    rng = random.Random(7)
+    store = OrderStore()
+    for i in range(3000):
+        store.add(order(str(i), rng.choice("ABC"), rng.choice(["BUY", "SELL"]),
+                        rng.randint(1, 50), rng.randint(1, 99) / 100))
+    for _ in range(5000):
+        order_id = str(rng.randrange(3000))
+        if order_id not in store:
+            continue
+        action = rng.random()
+        if action < 0.5:
+            store.fill(order_id, rng.random() * 5)
+        elif action < 0.8:
+            store.update(order_id, status=rng.choice(["live", "matched"]))
+        else:
+            store.remove(order_id)
+
+    for token in "ABC":
+        for side in ("BUY", "SELL"):
+            active = store.select(token_id=token, side=side)
+            exposure = store.exposure(token, side)
+            assert exposure.orders == len(active)
+            assert exposure.notional == pytest.approx(sum(o.quantity * o.price for o in active))
+            assert exposure.open_quantity == pytest.approx(
+                sum(max(o.quantity - o.filled_quantity, 0) for o in active))
+
+
+def test_tracker_keeps_store_in_sync():
+    tracker = OrderTracker()
+
+    async def main():
+        await tracker.track_order("1", "A", "BUY", 10, 0.5)
+        await tracker.track_order("2", "A", "BUY", 5, 0.4)
+        await tracker._handle_trade_message({"maker_orders": [{"order_id": "1", "matched_amount": "4", "price": "0.5"}]})
+        await tracker._handle_order_message({"action": "CANCELLATION", "order_id": "2"})
+
+    asyncio.run(main())
+    assert tracker.get_total_exposure("A") == pytest.approx(5.0)
+    assert tracker.get_exposure("A", "BUY").open_quantity == pytest.approx(6)
+    assert [o.order_id for o in tracker.get_active_orders_for_token("A")] == ["1"]
+    assert tracker.store.select(status="matched")[0].filled_quantity == 4
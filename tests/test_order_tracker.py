@@ -62,6 +62,20 @@ class MockOrderExecutor:
             return True
         return False
 
+    async def get_open_orders(self):
+        """Open mock orders in the exchange's format"""
+        return [{"id": order_id, "status": "LIVE", "size_matched": str(order["filledQuantity"])}
+                for order_id, order in self.orders.items() if order["status"] == "live"]
+
+    async def get_trades(self, after=None):
+        """The mock exchange records no trades"""
+        return []
+
+    async def cancel_orders(self, order_ids):
+        """Cancel several mock orders"""
+        canceled = [order_id for order_id in order_ids if await self.cancel_order(order_id)]
+        return {"canceled": canceled, "not_canceled": {}}
+
 async def handle_order_filled(order: OrderStatus):
     """Callback for when an order is filled"""
     logging.info(f"Order filled callback: {order.order_id}, {order.token_id}, {order.filled_quantity} at {order.price}")
@@ -0,0 +1,71 @@
+import json
+import os
+import shutil
+import sys
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backtest.parameter_sweep import ParameterSweep, evaluate, parameter_grid, random_parameters
+
+RECORDED_CSV = os.path.join(os.path.dirname(__file__), "..", "celtics-nets", "celtics-nets_combined.csv")
+
+
+def copy_markets(tmp_path, count=2):
+    paths = []
+    for i in range(count):
+        folder = tmp_path / f"game-{i}"
+        folder.mkdir()
+        path = folder / f"game-{i}_combined.csv"
+        shutil.copy(RECORDED_CSV, path)
+        paths.append(str(path))
+    return paths
+
+
+def test_parameter_sets():
+    grid = parameter_grid(buy_threshold=[-0.01, -0.02], sell_threshold=[0.01, 0.02, 0.03])
+    assert len(grid) == 6
+    assert grid[0] == {"buy_threshold": -0.01, "sell_threshold": 0.01}
+
+    sample = random_parameters({"buy_threshold": (-0.05, -0.01), "max_trades": (2, 5), "initial_cash": [4.0]},
+                               samples=5, seed=1)
+    assert len(sample) == 5
+    assert all(-0.05 <= p["buy_threshold"] <= -0.01 and p["max_trades"] in (2, 3, 4, 5) for p in sample)
+
+
+def test_sweep_ranks_and_resumes(tmp_path):
+    markets = copy_markets(tmp_path)
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    grid = parameter_grid(buy_threshold=[-0.001, -0.5], sell_threshold=[0.001, 0.5])
+
+    table = ParameterSweep(markets, grid[:2], checkpoint_path=checkpoint, max_workers=2).run()
+    assert len(table) == 2
+    with open(checkpoint) as f:
+        assert len(f.readlines()) == 2
+
+    # Resuming only evaluates the two new parameter sets
+    table = ParameterSweep(markets, grid, checkpoint_path=checkpoint, max_workers=2).run()
+    with open(checkpoint) as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 4 and len(table) == 4
+    assert list(table["pnl"]) == sorted(table["pnl"], reverse=True)
+    assert set(table["markets"]) == {2}
+
+    expected = evaluate(grid[0], markets)
+    row = table[(table["buy_threshold"] == -0.001) & (table["sell_threshold"] == 0.001)].iloc[0]
+    assert row["pnl"] == expected["pnl"] and row["trades"] == expected["trades"]
+
+
+def test_checkpoint_is_per_market_set_and_costs_rank_ascending(tmp_path):
+    markets = copy_markets(tmp_path, count=3)
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    grid = parameter_grid(buy_threshold=[-0.001, -0.5], sell_threshold=[0.001])
+
+    ParameterSweep(markets[:2], grid, checkpoint_path=checkpoint, max_workers=2).run()
+    # Other markets: the checkpointed results are not reused
+    table = ParameterSweep(markets, grid, checkpoint_path=checkpoint, max_workers=2).run(sort_by="max_drawdown")
+    with open(checkpoint) as f:
+        assert len(f.readlines()) == 4
+    assert set(table["markets"]) == {3}
+    assert "market_set" not in table.columns
+    assert list(table["max_drawdown"]) == sorted(table["max_drawdown"])
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+from py_clob_client.client import ClobClient
+from py_clob_client.clob_types import ApiCreds, CreateOrderOptions
+
+# Add the project root (and src, which trading_bot's streamers import from) to Python path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from src.core.async_clob_client import AsyncPolymarketClient
+from src.execution.order_executor import OrderExecutor
+from src.execution.presigned_orders import PresignedOrderCache
+from src.strategy.trade_dips_strategy import TradeDipsStrategy
+
+HOST = "https://clob.example"
+TOKEN1 = "62697312879578878537492465609249634498018844363287127652537828808816942160117"
+TOKEN2 = "58869207313910862764544355046372409163802584381615059274538220105674199390869"
+CREDS = ApiCreds(api_key="key", api_secret="c2VjcmV0c2VjcmV0c2VjcmV0c2VjcmV0", api_passphrase="pass")
+
+
+class CountingClobClient(ClobClient):
+    """Signs with a fixed tick size and counts signatures."""
+
+    signed = 0
+
+    def create_order(self, order_args, options=None):
+        self.signed += 1
+        return self.builder.create_order(order_args, CreateOrderOptions(tick_size="0.01", neg_risk=False))
+
+
+def make_executor(handler=None):
+    handler = handler or (lambda request: httpx.Response(200, json={"orderId": "0x1", "status": "live"}))
+    clob = CountingClobClient(HOST, chain_id=137, key="0x" + "11" * 32, creds=CREDS)
+    return OrderExecutor(AsyncPolymarketClient(clob, transport=httpx.MockTransport(handler)), presign_orders=True)
+
+
+def row(token1_buy, token1_sell, token2_buy, token2_sell):
+    return {"timestamp": "2025-03-15T22:00:00", TOKEN1: 0.5, TOKEN2: 0.5,
+            f"{TOKEN1}_best_buy": token1_buy, f"{TOKEN1}_best_sell": token1_sell,
+            f"{TOKEN2}_best_buy": token2_buy, f"{TOKEN2}_best_sell": token2_sell}
+
+
+def test_signal_is_posted_from_presigned_order():
+    posted = []
+
+    def handler(request):
+        posted.append(json.loads(request.content))
+        return httpx.Response(200, json={"orderId": "0x1", "status": "live"})
+
+    executor = make_executor(handler)
+    strategy = TradeDipsStrategy(TOKEN1, TOKEN2, buy_threshold=-0.04, sell_threshold=0.04, initial_cash=4, max_trades=2)
+    strategy.update_data(row(0.50, 0.51, 0.48, 0.49))
+    strategy.update_data(row(0.44, 0.45, 0.48, 0.49))
+
+    async def main():
+        try:
+            executor.presigned.set_candidates(strategy.candidate_orders())
+            await executor.presigned.refresh()
+            signed_ahead = executor.client.clob.signed
+            signal = strategy.generate_signal()
+            response = await executor.execute_signal(signal)
+            return signal, response, signed_ahead
+        finally:
+            await executor.close()
+
+    signal, response, signed_ahead = asyncio.run(main())
+    assert signal["token_id"] == TOKEN1 and signal["price"] == 0.45
+    assert response["status"] == "live"
+    # Nothing was signed on the critical path
+    assert executor.client.clob.signed == signed_ahead == 10
+    assert executor.presigned.stats()["hits"] == 1
+    assert posted[0]["order"]["tokenId"] == TOKEN1 and posted[0]["orderType"] == "GTC"
+    # A signed order is used once
+    assert executor.presigned.take(TOKEN1, "BUY", 0.45, signal["quantity"]) is None
+
+
+def test_entries_follow_candidates_nonce_and_expiry():
+    executor = make_executor()
+    cache = PresignedOrderCache(executor.client, expiration_seconds=600)
+    candidates = [{"token_id": TOKEN1, "side": "BUY", "price": p, "quantity": 2.0} for p in (0.44, 0.45)]
+
+    async def main():
+        try:
+            cache.set_candidates(candidates)
+            assert await cache.refresh() == 2
+            assert await cache.refresh() == 0
+            # Same key, different size: posting it would send 2.0 shares
+            assert cache.take(TOKEN1, "BUY", 0.45, 2.004) is None
+            assert cache.key(TOKEN1, "BUY", 0.45, 2.004) in cache.entries
+            # Sizes changed after a fill: old entries go
+            cache.set_candidates(candidates[:1])
+            assert list(cache.entries) == [cache.key(TOKEN1, "BUY", 0.44, 2.0)]
+            # New nonce: everything is re-signed with it
+            cache.set_nonce(1)
+            assert cache.entries == {}
+            assert await cache.refresh() == 1
+            entry = next(iter(cache.entries.values()))
+            assert entry.nonce == 1 and entry.signed_order.order["nonce"] == 1
+            assert entry.signed_order.order["expiration"] > 0
+            cache.expire(now=entry.expires_at - 60)
+            assert cache.entries == {}
+        finally:
+            await executor.close()
+
+    asyncio.run(main())
+    assert cache.order_type == "GTD"
+
+
+def test_candidate_orders_cover_sells_of_open_positions():
+    strategy = TradeDipsStrategy(TOKEN1, TOKEN2, buy_threshold=-0.04, sell_threshold=0.04, initial_cash=4, max_trades=2)
+    strategy.update_data(row(0.50, 0.51, 0.48, 0.49))
+    strategy.selected_team = TOKEN1
+    strategy.record_buy(0.5, 4.0, 2.0)
+    candidates = strategy.candidate_orders(depth=1)
+
+    assert {(c["side"], c["price"]) for c in candidates} == {
+        ("BUY", 0.50), ("BUY", 0.51), ("BUY", 0.52), ("SELL", 0.49), ("SELL", 0.50), ("SELL", 0.51)}
+    assert all(c["token_id"] == TOKEN1 for c in candidates)
+
+
+def test_trading_bot_sells_from_presigned_order(tmp_path, monkeypatch):
+    from trading_bot import TradingBot
+
+    monkeypatch.chdir(tmp_path)
+    executor = make_executor()
+    bot = TradingBot("test-market", TOKEN1, TOKEN2, feed="ws", initial_cash=4, sell_threshold=0.01,
+                     executor=executor)
+    bot.strategy.selected_team = TOKEN1
+    bot.strategy.record_buy(0.45, 2.2222, 1.0)
+    bot.open_trades = 1
+
+    def csv_row(timestamp, midpoint, best_buy, best_sell):
+        return {"timestamp": timestamp, "token1_midpoint": midpoint, "token1_best_buy": best_buy,
+                "token1_best_sell": best_sell, "token2_midpoint": 0.5, "token2_best_buy": 0.49,
+                "token2_best_sell": 0.51}
+
+    async def main():
+        try:
+            await bot.process_row(csv_row("2025-03-15T22:00:00", 0.50, 0.49, 0.51))
+            await executor.presigned.refresh()
+            # best_buy up 2%: the position is sold there, one tick above the last row
+            await bot.process_row(csv_row("2025-03-15T22:01:00", 0.53, 0.50, 0.56))
+        finally:
+            await executor.close()
+
+    asyncio.run(main())
+    (order,) = bot.order_tracker.get_active_orders()
+    assert order.side == "SELL" and order.price == 0.50 and order.quantity == 2.2222
+    assert executor.presigned.stats()["hits"] == 1
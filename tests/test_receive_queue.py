@@ -0,0 +1,182 @@
+import asyncio
+import json
+import os
+import random
+import sys
+
+import pytest
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.order_book import OrderBooks
+from src.core.polymarket_websocket_client import PolymarketWebSocketClient
+from src.core.receive_queue import BLOCK, ReceiveQueue
+from src.core.ws_events import EventDecoder, parse_event
+
+
+def book(asset_id, bid="0.40", ask="0.60"):
+    return parse_event({"event_type": "book", "asset_id": asset_id, "market": "m",
+                        "bids": [{"price": bid, "size": "10"}], "asks": [{"price": ask, "size": "10"}]})
+
+
+def price_change(*changes):
+    return parse_event({"event_type": "price_change", "market": "m", "price_changes": [
+        {"asset_id": asset_id, "side": side, "price": price, "size": size} for asset_id, side, price, size in changes
+    ]})
+
+
+def describe(event):
+    if isinstance(event, dict):
+        return event["event_type"]
+    if event.event_type == "book":
+        return ("book", event.asset_id)
+    return ("price_change", sorted((change.price, change.size) for change in event.changes))
+
+
+def drain(queue):
+    messages = []
+    while len(queue):
+        messages.append(queue.get_nowait())
+    return messages
+
+
+def test_full_queue_drops_oldest():
+    queue = ReceiveQueue(maxsize=2)
+    for i in range(5):
+        queue.put_nowait({"n": i})
+    assert drain(queue) == [{"n": 3}, {"n": 4}]
+    assert queue.stats() == {"depth": 0, "max_depth": 2, "received": 5, "delivered": 2, "dropped": 3,
+                             "conflated": 0, "stale_dropped": 0}
+
+
+def test_block_policy_waits_for_the_consumer():
+    queue = ReceiveQueue(maxsize=1, overflow=BLOCK)
+
+    async def main():
+        await queue.put("a")
+        blocked = asyncio.create_task(queue.put("b"))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        assert await queue.get() == "a"
+        await blocked
+        return await queue.get()
+
+    assert asyncio.run(main()) == "b"
+    assert queue.dropped == 0
+    with pytest.raises(ValueError):
+        ReceiveQueue(overflow="drop_newest")
+
+
+def test_conflation_keeps_latest_state_per_asset():
+    queue = ReceiveQueue(conflate=True)
+    queue.put_nowait([book("yes"), book("no")])
+    queue.put_nowait([price_change(("yes", "BUY", "0.41", "5"), ("no", "SELL", "0.59", "1"))])
+    queue.put_nowait([price_change(("yes", "BUY", "0.41", "7"), ("yes", "BUY", "0.42", "1"))])
+    queue.put_nowait([book("no", bid="0.30")])
+    queue.put_nowait([{"event_type": "last_trade_price", "asset_id": "yes"}])
+    queue.put_nowait([price_change(("yes", "BUY", "0.42", "0"))])
+
+    messages = drain(queue)
+    assert queue.conflated == 2
+    assert [[describe(event) for event in message] for message in messages] == [
+        [("book", "yes")],
+        [("book", "no")],
+        [("price_change", [("0.41", "7"), ("0.42", "1")])],
+        # The newer snapshot replaced the pending update of "no"
+        [("book", "no")],
+        ["last_trade_price"],
+        # Not merged into the earlier update: a trade of "yes" was queued in between
+        [("price_change", [("0.42", "0")])],
+    ]
+    assert messages[3][0].bids == [{"price": "0.30", "size": "10"}]
+
+
+def test_full_conflating_queue_never_applies_updates_over_lost_state():
+    queue = ReceiveQueue(maxsize=3, conflate=True)
+    queue.put_nowait([price_change(("a", "BUY", "0.41", "5"))])
+    queue.put_nowait([{"event_type": "last_trade_price", "asset_id": "b"}])
+    queue.put_nowait([book("b")])
+    # Full: the trade print goes before any book state
+    queue.put_nowait([book("c")])
+    assert queue.dropped == 1 and queue.stale_dropped == 0
+    # Only book state left: the update of "a" is lost, so "a" is stale
+    queue.put_nowait([{"event_type": "tick_size_change", "asset_id": "a"}])
+    assert queue.dropped == 1 and queue.stale_dropped == 1
+    queue.put_nowait([price_change(("a", "BUY", "0.42", "1"), ("b", "SELL", "0.59", "3"))])
+    assert queue.dropped == 2 and queue.stale_dropped == 2
+
+    messages = drain(queue)
+    assert [[describe(event) for event in message] for message in messages] == [
+        [("book", "b")],
+        [("book", "c")],
+        [("price_change", [("0.59", "3")])],
+    ]
+    assert queue.stats()["stale_dropped"] == 2
+
+    # The next snapshot makes the asset usable again
+    queue.put_nowait([book("a")])
+    queue.put_nowait([price_change(("a", "BUY", "0.44", "1"))])
+    assert [[describe(event) for event in message] for message in drain(queue)] == [
+        [("book", "a")], [("price_change", [("0.44", "1")])]]
+    assert queue.stale_dropped == 2
+
+
+def test_conflated_stream_builds_the_same_books():
+    rng = random.Random(7)
+    events = [book("a"), book("b")]
+    for _ in range(500):
+        if rng.random() < 0.05:
+            events.append(book(rng.choice("ab"), bid=f"0.{rng.randint(30, 45)}"))
+        else:
+            events.append(price_change(*[(rng.choice("ab"), rng.choice(("BUY", "SELL")),
+                                          f"0.{rng.randint(30, 70)}", str(rng.randint(0, 3)))
+                                         for _ in range(rng.randint(1, 3))]))
+
+    direct, conflated = OrderBooks(), OrderBooks()
+    queue = ReceiveQueue(conflate=True)
+    for event in events:
+        direct.apply_event(event)
+        queue.put_nowait([event])
+    for message in drain(queue):
+        for event in message:
+            conflated.apply_event(event)
+
+    assert queue.conflated > 400
+    for asset_id in "ab":
+        assert conflated[asset_id].snapshot() == direct[asset_id].snapshot()
+
+
+def test_slow_consumer_does_not_stall_socket_reads():
+    frames = [json.dumps({"event_type": "order", "id": str(i)}) for i in range(20)]
+    handled = []
+
+    class Connection:
+        def __aiter__(self):
+            return self._frames()
+
+        async def _frames(self):
+            for frame in frames:
+                yield frame
+            client.running = False
+
+    async def slow_handler(message):
+        await asyncio.sleep(0.001)
+        handled.append(message)
+
+    client = PolymarketWebSocketClient(message_callback=slow_handler, decoder=EventDecoder(typed=False))
+    client.connection = Connection()
+    client.running = True
+
+    async def main():
+        consumer = asyncio.create_task(client.consume())
+        await client.listen("user")
+        read_before_handled = client.stats()["received"]
+        while len(handled) < len(frames):
+            await asyncio.sleep(0.001)
+        consumer.cancel()
+        return read_before_handled
+
+    assert asyncio.run(main()) == 20
+    assert [m[0]["id"] for m in handled] == [str(i) for i in range(20)]
+    assert client.stats()["max_depth"] > 1
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+from py_clob_client.clob_types import OrderBookSummary, OrderSummary
+
+# Add the project root (and src, which trading_bot's streamers import from) to Python path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from src.backtest.replay_engine import ReplayEngine
+from src.data_streamer.storage import CsvMarketDataWriter, read_market_data
+
+RECORDED_CSV = os.path.join(os.path.dirname(__file__), "..", "celtics-nets", "celtics-nets_combined.csv")
+START = datetime(2025, 3, 15, 22, 0)
+
+
+def summary(asset_id, bids, asks):
+    # The exchange sends bids ascending and asks descending
+    return OrderBookSummary(
+        market="0x1", asset_id=asset_id, timestamp="0",
+        bids=[OrderSummary(price=str(p), size=str(s)) for p, s in sorted(bids)],
+        asks=[OrderSummary(price=str(p), size=str(s)) for p, s in sorted(asks, reverse=True)],
+    )
+
+
+def write_market(path, books):
+    """books: one (bids, asks) pair of token1 per tick; token2 gets a fixed book."""
+    with CsvMarketDataWriter(str(path)) as writer:
+        for i, (bids, asks) in enumerate(books):
+            writer.append({
+                "timestamp": (START + timedelta(minutes=i)).isoformat(),
+                "token1_midpoint": 0.5, "token1_best_buy": max(bids)[0], "token1_best_sell": min(asks)[0],
+                "token1_spread": 0.01, "token2_midpoint": 0.5, "token2_best_buy": 0.49,
+                "token2_best_sell": 0.51, "token2_spread": 0.02,
+                "token1_orderbook": summary("A", bids, asks),
+                "token2_orderbook": summary("B", [(0.49, 10)], [(0.51, 10)]),
+            })
+    return read_market_data(str(path))
+
+
+def replay(data, orders, timeout_minutes=30):
+    """Sends orders {tick: signal} and returns (engine, stats, completed orders)."""
+    engine = ReplayEngine(data)
+    exchange = engine.exchange
+    completed = []
+
+    async def on_fill(order):
+        completed.append(order)
+
+    exchange.callback = on_fill
+
+    async def on_row(row):
+        signal = orders.get(exchange.index)
+        if signal:
+            response = await exchange.execute_signal(dict({"order_type": "limit"}, **signal))
+            await exchange.track_order(response["orderId"], signal["token_id"], signal["side"],
+                                       signal["quantity"], signal["price"], timeout_minutes=timeout_minutes)
+
+    stats = asyncio.run(engine.run(on_row))
+    return engine, stats, completed
+
+
+def test_marketable_order_walks_the_book(tmp_path):
+    books = [([(0.49, 10)], [(0.51, 3), (0.52, 4), (0.53, 9)])] * 3
+    data = write_market(tmp_path / "m.csv", books)
+    engine, stats, completed = replay(data, {0: {"token_id": "A", "side": "BUY", "quantity": 5, "price": 0.52}})
+
+    fills = engine.exchange.fills
+    assert [(f["index"], f["price"], f["quantity"], f["kind"]) for f in fills] == [
+        (1, 0.51, 3.0, "taker"), (1, 0.52, 2.0, "taker")]
+    assert len(completed) == 1 and completed[0].filled_quantity == 5
+    assert stats["open_orders"] == 0
+
+
+def test_queue_position_partial_fills_and_trade_through(tmp_path):
+    asks = [(0.52, 10)]
+    books = [
+        ([(0.50, 10)], asks),
+        ([(0.50, 10)], asks),              # order arrives behind 10
+        ([(0.50, 14)], asks),              # 4 join behind us
+        ([(0.50, 6)], asks),               # 8 traded ahead of us, 2 left
+        ([(0.50, 1)], asks),               # 5 more: the queue is gone, 3 fill
+        ([(0.49, 5)], asks),               # level consumed, market trades below it
+    ]
+    data = write_market(tmp_path / "m.csv", books)
+    engine, stats, completed = replay(data, {0: {"token_id": "A", "side": "BUY",
+                                                 "quantity": 5, "price": 0.50}})
+
+    assert [(f["index"], f["quantity"], f["kind"]) for f in engine.exchange.fills] == [
+        (4, 3.0, "queue"), (5, 2.0, "through")]
+    assert len(completed) == 1 and completed[0].filled_quantity == 5
+
+
+def test_timeout_cancels_without_callback(tmp_path):
+    books = [([(0.50, 10)], [(0.52, 10)])] * 6
+    data = write_market(tmp_path / "m.csv", books)
+    engine, stats, completed = replay(
+        data, {0: {"token_id": "A", "side": "BUY", "quantity": 5, "price": 0.45}}, timeout_minutes=2)
+
+    assert completed == []
+    assert stats["timed_out"] == 1 and stats["cancelled"] == 1 and stats["open_orders"] == 0
+    assert engine.exchange.cancelled[0].status == "cancelled"
+
+
+def test_killed_market_order_is_cancelled_not_timed_out(tmp_path):
+    books = [([(0.50, 10)], [(0.52, 3)])] * 3
+    data = write_market(tmp_path / "m.csv", books)
+    engine, stats, completed = replay(data, {0: {"token_id": "A", "side": "BUY", "quantity": 5, "price": 0.52,
+                                                 "order_type": "market"}})
+
+    assert completed == [] and engine.exchange.fills == []
+    assert stats["cancelled"] == 1 and stats["timed_out"] == 0
+
+
+def test_replays_trading_bot_on_recorded_game(tmp_path, monkeypatch):
+    from trading_bot import TradingBot
+
+    monkeypatch.chdir(tmp_path)
+    data = read_market_data(RECORDED_CSV)
+    engine = ReplayEngine(data)
+    bot = TradingBot("celtics-nets", data.token_ids["token1"], data.token_ids["token2"], feed="ws",
+                     max_trades=4, initial_cash=4.0, buy_threshold=-0.001, sell_threshold=0.001,
+                     executor=engine.exchange)
+    engine.exchange.attach(bot)
+
+    stats = asyncio.run(engine.run(bot.process_row))
+    assert stats["ticks"] == 12
+    assert stats["elapsed_ms"] < 1000
+    assert bot.latency.snapshot()
+    filled_buys = sum(f["quantity"] for f in engine.exchange.fills if f["side"] == "BUY")
+    recorded = sum(shares for _, shares, _ in bot.strategy.buy_positions)
+    assert recorded <= filled_buys + 1e-9
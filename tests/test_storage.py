@@ -0,0 +1,91 @@
+import csv
+import os
+import sys
+
+import numpy as np
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_streamer import storage
+from src.data_streamer.storage import (
+    CsvMarketDataWriter,
+    NpyMarketDataWriter,
+    book_levels,
+    read_csv,
+    read_market_data,
+)
+
+RECORDED_CSV = os.path.join(os.path.dirname(__file__), "..", "celtics-nets", "celtics-nets_combined.csv")
+TOKEN1_ID = "62697312879578878537492465609249634498018844363287127652537828808816942160117"
+
+
+def test_book_levels_from_recorded_repr():
+    book = ("OrderBookSummary(market='0x1', asset_id='1', timestamp='1', "
+            "bids=[OrderSummary(price='0.01', size='10'), OrderSummary(price='0.5', size='2.5')], "
+            "asks=[OrderSummary(price='0.99', size='7'), OrderSummary(price='0.52', size='3')], hash='x')")
+    levels = book_levels(book)
+    assert levels.bid_prices.tolist() == [0.5, 0.01]
+    assert levels.bid_sizes.tolist() == [2.5, 10.0]
+    assert levels.ask_prices.tolist() == [0.52, 0.99]
+    assert levels.ask_sizes.tolist() == [3.0, 7.0]
+
+
+def test_read_recorded_csv():
+    data = read_csv(RECORDED_CSV)
+    # the file contains a second header row from a streamer restart
+    assert len(data) == 12
+    assert data.token_ids["token1"] == TOKEN1_ID
+    assert data["token1_best_buy"][0] == 0.83
+    book = data.book("token1", 0)
+    assert book.bid_prices[0] == 0.83
+    assert book.ask_prices[0] == 0.84
+
+
+def test_columnar_round_trip_matches_csv(tmp_path):
+    source = read_csv(RECORDED_CSV)
+    directory = tmp_path / "celtics-nets_columnar"
+    csv_path = tmp_path / "copy_combined.csv"
+
+    with open(RECORDED_CSV, newline="") as f:
+        rows = [row for row in csv.DictReader(f) if row["timestamp"] != "timestamp"]
+
+    with NpyMarketDataWriter(str(directory), chunk_rows=5) as writer, CsvMarketDataWriter(str(csv_path)) as csv_writer:
+        for row in rows:
+            writer.append(row)
+            csv_writer.append(row)
+
+    assert len(list(directory.glob("chunk_*.npz"))) == 3
+    loaded = read_market_data(str(directory))
+    assert len(loaded) == len(source)
+    assert loaded.token_ids == source.token_ids
+    np.testing.assert_array_equal(loaded["timestamp"], source["timestamp"])
+    np.testing.assert_array_equal(loaded["token2_midpoint"], source["token2_midpoint"])
+    for index in (0, 6, 11):
+        for got, expected in zip(loaded.book("token2", index), source.book("token2", index)):
+            np.testing.assert_array_equal(got, expected)
+
+    assert len(read_csv(str(csv_path))) == len(source)
+
+
+def test_npy_writer_writes_rows_that_come_slower_than_max_delay(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(storage.time, "monotonic", lambda: clock[0])
+    with open(RECORDED_CSV, newline="") as f:
+        rows = [row for row in csv.DictReader(f) if row["timestamp"] != "timestamp"]
+    directory = tmp_path / "columnar"
+    writer = NpyMarketDataWriter(str(directory), max_delay_seconds=5)
+
+    # One row a minute: each one is written as it arrives
+    for n, row in enumerate(rows[:3], start=1):
+        clock[0] += 60
+        writer.append(row)
+        assert writer.pending == 0 and len(list(directory.glob("chunk_*.npz"))) == n
+    # A burst is buffered until an append comes max_delay_seconds after the last write
+    for row in rows[3:6]:
+        clock[0] += 1
+        writer.append(row)
+    assert writer.pending == 3
+    clock[0] += 3
+    writer.append(rows[6])
+    assert writer.pending == 0 and len(read_market_data(str(directory))) == 7
@@ -0,0 +1,98 @@
+import logging
+import os
+import random
+import sys
+
+import numpy as np
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backtest.trade_dips_backtest import TradeDipsBacktest, load_market, max_drawdown
+from src.data_streamer.storage import MarketData
+from src.strategy.trade_dips_strategy import TradeDipsStrategy
+
+RECORDED_CSV = os.path.join(os.path.dirname(__file__), "..", "celtics-nets", "celtics-nets_combined.csv")
+
+
+def random_market(seed: int, ticks: int = 400) -> MarketData:
+    rng = random.Random(seed)
+    columns = {"timestamp": np.arange(ticks).astype("datetime64[s]")}
+    for token in ("token1", "token2"):
+        prices, price = [], 0.5
+        for _ in range(ticks):
+            draw = rng.random()
+            if draw < 0.02:
+                prices.append(np.nan)
+                continue
+            price = min(0.98, max(0.01, round(price + rng.choice([-0.03, -0.01, 0.0, 0.0, 0.01, 0.03]), 2)))
+            prices.append(price)
+        bids = np.array(prices)
+        columns[f"{token}_best_buy"] = bids
+        columns[f"{token}_best_sell"] = np.round(bids + 0.01, 2)
+    return MarketData(columns, {})
+
+
+def replay_strategy(data: MarketData, params: dict):
+    """Feeds the strategy row by row, filling every BUY at its price on the same tick."""
+    strategy = TradeDipsStrategy("token1", "token2", **params)
+    signals, equity = [], []
+    for i in range(len(data)):
+        row = {"timestamp": data["timestamp"][i]}
+        for token in ("token1", "token2"):
+            for field in ("best_buy", "best_sell"):
+                row[f"{token}_{field}"] = float(data[f"{token}_{field}"][i])
+        strategy.update_data(row)
+        signal = strategy.generate_signal()
+        if signal:
+            signals.append((i, signal))
+            if signal["side"] == "BUY":
+                strategy.record_buy(signal["price"], signal["quantity"], signal["quantity"] * signal["price"])
+        shares = sum(s for _, s, _ in strategy.buy_positions)
+        mark = row[f"{strategy.selected_team}_best_buy"] if shares > 0 else 0.0
+        equity.append(strategy.cash + shares * mark)
+    return signals, np.array(equity), strategy
+
+
+def assert_matches_strategy(data: MarketData, params: dict):
+    result = TradeDipsBacktest(**params).run(data, token_ids=["token1", "token2"])
+    signals, equity, strategy = replay_strategy(data, params)
+
+    # The last trade on a tick is the signal the strategy emits
+    last_trade = {trade["index"]: trade for trade in result.trades}
+    assert sorted(last_trade) == [i for i, _ in signals]
+    for i, signal in signals:
+        trade = last_trade[i]
+        assert (trade["token_id"], trade["side"]) == (signal["token_id"], signal["side"])
+        assert trade["price"] == signal["price"] and trade["quantity"] == signal["quantity"]
+    np.testing.assert_allclose(result.equity, equity, rtol=1e-12, equal_nan=True)
+    assert result.stats["final_cash"] == strategy.cash or np.isnan(strategy.cash)
+    return result
+
+
+def test_matches_strategy_on_random_markets():
+    logging.disable(logging.CRITICAL)
+    try:
+        trades = 0
+        for seed in range(12):
+            params = dict(buy_threshold=-0.02, sell_threshold=0.02, initial_cash=10.0,
+                          take_profit_pct=random.Random(seed).choice([0.05, 0.2, 0.5]),
+                          stop_loss_pct=random.Random(seed + 1).choice([0.05, 0.25]), max_trades=4)
+            trades += len(assert_matches_strategy(random_market(seed), params).trades)
+        assert trades > 0
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_recorded_csv():
+    data = load_market(RECORDED_CSV)
+    result = TradeDipsBacktest(buy_threshold=-0.001, sell_threshold=0.001).run(data)
+    assert len(result.equity) == len(data) == 12
+    assert result.stats["initial_cash"] == 10.0
+    assert result.trades and result.trades[0]["token_id"] in data.token_ids.values()
+    assert_matches_strategy(data, dict(buy_threshold=-0.001, sell_threshold=0.001))
+
+
+def test_max_drawdown():
+    assert max_drawdown(np.array([10.0, 12.0, np.nan, 9.0, 11.0])) == 0.25
+    assert max_drawdown(np.array([10.0, 10.0])) == 0.0
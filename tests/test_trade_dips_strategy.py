@@ -0,0 +1,275 @@
+import logging
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_streamer.storage import read_csv
+from src.strategy.trade_dips_strategy import TradeDipsStrategy
+
+RECORDED_CSV = os.path.join(os.path.dirname(__file__), "..", "celtics-nets", "celtics-nets_combined.csv")
+TEAM1, TEAM2 = "team1", "team2"
+
+
+class DataFrameTradeDipsStrategy(TradeDipsStrategy):
+    """
+    Reference: the DataFrame version of the strategy, which keeps the whole history
+    and recomputes the returns with pandas on every tick. generate_signal is the
+    original implementation, copied unchanged.
+    """
+
+    def update_data(self, row: dict):
+        self.data.append(row)
+
+    @staticmethod
+    def compute_returns(series: pd.Series):
+        # The original series.pct_change().fillna(0), with the no-fill default of
+        # pandas 3 spelled out so the reference does not change with pandas 2
+        returns = series.pct_change(fill_method=None).fillna(0)
+        return returns
+
+    def generate_signal(self) -> dict | None:
+        if not self.data or len(self.data) < 2:
+            logging.info(f"Not enough data yet: {len(self.data)} rows")
+            return None
+        
+        df = pd.DataFrame(self.data)
+        if 'timestamp' in df.columns and not np.issubdtype(df['timestamp'].dtype, np.datetime64):
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+        
+        team1, team2 = self.token1_id, self.token2_id
+        returns_team1 = self.compute_returns(df[f"{team1}_best_buy"])  # For buying, look at best sell price
+        returns_team2 = self.compute_returns(df[f"{team2}_best_buy"])
+        
+        logging.info(f"Team1 returns: {returns_team1.iloc[-1]:.4f}, Team2 returns: {returns_team2.iloc[-1]:.4f}")
+        
+        buy_team1, sell_team1 = self.compute_positions(returns_team1, self.buy_threshold, self.sell_threshold)
+        buy_team2, sell_team2 = self.compute_positions(returns_team2, self.buy_threshold, self.sell_threshold)
+        
+        current_index = df.index[-1]
+        current_time = df['timestamp'].iloc[-1]
+        current_prices = df.iloc[-1]
+        
+        signal = None
+        
+        if self.selected_team is None:
+            if current_index in buy_team1 and self.cash >= self.min_order_value:
+                buy_price = current_prices[f"{team1}_best_sell"]
+                shares, actual_value = self.calculate_shares_for_value(buy_price)
+                if shares > 0:
+                    self.selected_team = team1
+                    signal = {
+                        "token_id": team1,
+                        "order_type": "limit",
+                        "side": "BUY",
+                        "quantity": shares,
+                        "price": buy_price
+                    }
+                    logging.info(f"Selected {team1} and generated BUY limit order for {shares:.4f} shares at {buy_price:.4f} (€{actual_value:.2f})")
+            elif current_index in buy_team2 and self.cash >= self.min_order_value:
+                buy_price = current_prices[f"{team2}_best_sell"]
+                shares, actual_value = self.calculate_shares_for_value(buy_price)
+                if shares > 0:
+                    self.selected_team = team2
+                    signal = {
+                        "token_id": team2,
+                        "order_type": "limit",
+                        "side": "BUY",
+                        "quantity": shares,
+                        "price": buy_price
+                    }
+                    logging.info(f"Selected {team2} and generated BUY limit order for {shares:.4f} shares at {buy_price:.4f} (€{actual_value:.2f})")
+        
+        elif self.selected_team is not None:
+            current_buy_price = current_prices[f"{self.selected_team}_best_buy"]
+            current_sell_price = current_prices[f"{self.selected_team}_best_sell"]
+            
+            if self.selected_team == team1 and current_index in buy_team1 and self.cash >= self.min_order_value:
+                shares, actual_value = self.calculate_shares_for_value(current_sell_price)
+                if shares > 0:
+                    signal = {
+                        "token_id": team1,
+                        "order_type": "limit",
+                        "side": "BUY",
+                        "quantity": shares,
+                        "price": current_sell_price
+                    }
+                    logging.info(f"Generated BUY limit order for {shares:.4f} shares at {current_sell_price:.4f} (€{actual_value:.2f})")
+            elif self.selected_team == team2 and current_index in buy_team2 and self.cash >= self.min_order_value:
+                shares, actual_value = self.calculate_shares_for_value(current_sell_price)
+                if shares > 0:
+                    signal = {
+                        "token_id": team2,
+                        "order_type": "limit",
+                        "side": "BUY",
+                        "quantity": shares,
+                        "price": current_sell_price
+                    }
+                    logging.info(f"Generated BUY limit order for {shares:.4f} shares at {current_sell_price:.4f} (€{actual_value:.2f})")
+            elif self.selected_team == team1 and current_index in sell_team1 and self.buy_positions:
+                lowest_buy = min(self.buy_positions, key=lambda x: x[0])
+                buy_price, shares, cash_value = lowest_buy
+                self.buy_positions.remove(lowest_buy)
+                signal = {
+                    "token_id": team1,
+                    "order_type": "limit",
+                    "side": "SELL",
+                    "quantity": shares,
+                    "price": current_buy_price
+                }
+                self.cash += shares * current_buy_price
+                logging.info(f"Generated SELL limit order for {shares:.4f} shares at {current_buy_price:.4f}")
+            elif self.selected_team == team2 and current_index in sell_team2 and self.buy_positions:
+                lowest_buy = min(self.buy_positions, key=lambda x: x[0])
+                buy_price, shares, cash_value = lowest_buy
+                self.buy_positions.remove(lowest_buy)
+                signal = {
+                    "token_id": team2,
+                    "order_type": "limit",
+                    "side": "SELL",
+                    "quantity": shares,
+                    "price": current_buy_price
+                }
+                self.cash += shares * current_buy_price
+                logging.info(f"Generated SELL limit order for {shares:.4f} shares at {current_buy_price:.4f}")
+            
+            # Take-profit or stop-loss
+            position_value = sum(shares * current_buy_price for _, shares, _ in self.buy_positions)
+            current_pnl = position_value + self.cash - self.initial_cash
+            if current_pnl >= self.take_profit_pct * self.initial_cash and self.buy_positions:
+                total_shares = sum(shares for _, shares, _ in self.buy_positions)
+                signal = {
+                    "token_id": self.selected_team,
+                    "order_type": "limit",
+                    "side": "SELL",
+                    "quantity": total_shares,
+                    "price": current_buy_price
+                }
+                self.cash += total_shares * current_buy_price
+                self.buy_positions.clear()
+                self.exited = True
+                logging.info(f"Take-profit triggered for {self.selected_team}, selling {total_shares:.4f} shares at {current_buy_price:.4f}")
+            elif current_pnl <= -self.stop_loss_pct * self.initial_cash and self.buy_positions:
+                total_shares = sum(shares for _, shares, _ in self.buy_positions)
+                signal = {
+                    "token_id": self.selected_team,
+                    "order_type": "limit",
+                    "side": "SELL",
+                    "quantity": total_shares,
+                    "price": current_buy_price
+                }
+                self.cash += total_shares * current_buy_price
+                self.buy_positions.clear()
+                self.exited = True
+                logging.info(f"Stop-loss triggered for {self.selected_team}, selling {total_shares:.4f} shares at {current_buy_price:.4f}")
+        
+        return signal
+
+
+def recorded_rows():
+    data = read_csv(RECORDED_CSV, parse_books=False)
+    rows = []
+    for i in range(len(data)):
+        row = {"timestamp": data["timestamp"][i]}
+        for token, team in (("token1", TEAM1), ("token2", TEAM2)):
+            row[f"{team}_best_buy"] = float(data[f"{token}_best_buy"][i])
+            row[f"{team}_best_sell"] = float(data[f"{token}_best_sell"][i])
+        rows.append(row)
+    return rows
+
+
+def random_walk(seed: int, ticks: int = 150):
+    rng = random.Random(seed)
+    prices = [0.5, 0.5]
+    for i in range(ticks):
+        row = {"timestamp": i}
+        for k, team in enumerate((TEAM1, TEAM2)):
+            draw = rng.random()
+            if draw < 0.03:
+                prices[k] = 0.0
+            elif draw < 0.05:
+                prices[k] = None
+            else:
+                step = rng.choice([-0.03, -0.01, 0.0, 0.0, 0.01, 0.03])
+                prices[k] = min(0.98, max(0.01, round((prices[k] or 0.5) + step, 2)))
+            row[f"{team}_best_buy"] = prices[k]
+            row[f"{team}_best_sell"] = None if prices[k] is None else round(prices[k] + 0.01, 2)
+        yield row
+
+
+def same(a, b):
+    return a == b or (a != a and b != b)
+
+
+def run_both(rows, **params):
+    incremental = TradeDipsStrategy(TEAM1, TEAM2, **params)
+    reference = DataFrameTradeDipsStrategy(TEAM1, TEAM2, **params)
+    signals = 0
+    for row in rows:
+        incremental.update_data(row)
+        reference.update_data(row)
+        expected, actual = reference.generate_signal(), incremental.generate_signal()
+        assert (expected is None) == (actual is None)
+        if expected is None:
+            continue
+        assert all(same(expected[key], actual[key]) for key in expected), (expected, actual)
+        signals += 1
+        if expected["side"] == "BUY" and expected["price"] > 0:
+            value = expected["quantity"] * expected["price"]
+            reference.record_buy(expected["price"], expected["quantity"], value)
+            incremental.record_buy(expected["price"], expected["quantity"], value)
+        assert incremental.cash == reference.cash
+        assert incremental.buy_positions == reference.buy_positions
+        assert incremental.selected_team == reference.selected_team
+    assert len(incremental.data) == 0
+    return signals
+
+
+def test_compute_return_matches_pct_change():
+    series = pd.Series([0.5, 0.5, 0.4, 0.0, 0.0, 0.3, np.nan, 0.3, 0.6])
+    expected = TradeDipsStrategy.compute_returns(series).tolist()
+    actual = [0.0] + [TradeDipsStrategy.compute_return(a, b) for a, b in zip(series[:-1], series[1:])]
+    assert actual == expected
+
+
+def test_returns_do_not_fill_missing_prices():
+    # Written out so the expectation does not depend on the installed pandas' pct_change defaults;
+    # filling the gap would give -0.25 for 0.3 (against the 0.4 before it)
+    series = pd.Series([0.5, 0.4, np.nan, 0.3, 0.15])
+    assert TradeDipsStrategy.compute_returns(series).tolist() == pytest.approx([0.0, -0.2, 0.0, 0.0, -0.5])
+    strategy = TradeDipsStrategy(TEAM1, TEAM2, buy_threshold=-0.1, sell_threshold=0.1)
+    returns = []
+    for price in series:
+        strategy.update_data({f"{TEAM1}_best_buy": price, f"{TEAM2}_best_buy": 0.5})
+        returns.append(strategy.returns[0])
+    assert returns == pytest.approx([0.0, -0.2, 0.0, 0.0, -0.5])
+
+
+def test_matches_dataframe_version_across_a_price_gap():
+    # team1 dips right after a missing price: neither version may compare 0.45 with 0.5
+    rows = [{"timestamp": i, f"{TEAM1}_best_buy": price, f"{TEAM1}_best_sell": sell,
+             f"{TEAM2}_best_buy": 0.5, f"{TEAM2}_best_sell": 0.51}
+            for i, (price, sell) in enumerate([(0.5, 0.51), (None, None), (0.45, 0.46), (0.40, 0.41)])]
+    assert run_both(rows, buy_threshold=-0.05, sell_threshold=0.05) == 1
+
+
+def test_matches_dataframe_version_on_recorded_csv():
+    run_both(recorded_rows(), buy_threshold=-0.001, sell_threshold=0.001)
+
+
+def test_matches_dataframe_version_on_random_walks():
+    logging.disable(logging.CRITICAL)
+    try:
+        signals = 0
+        for seed in range(10):
+            signals += run_both(random_walk(seed), buy_threshold=-0.02, sell_threshold=0.02,
+                                take_profit_pct=0.1, stop_loss_pct=0.1)
+        assert signals > 0
+    finally:
+        logging.disable(logging.NOTSET)
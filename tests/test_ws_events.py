@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.order_book import OrderBooks
+from src.core.ws_events import (
+    DECODERS,
+    BookEvent,
+    EventDecoder,
+    OrderEvent,
+    PriceChangeEvent,
+    TradeEvent,
+    get_decoder,
+)
+from src.execution.order_tracker import OrderTracker
+
+BOOK = {"event_type": "book", "asset_id": "yes", "market": "0xabc", "timestamp": "1",
+        "bids": [{"price": "0.48", "size": "100"}], "asks": [{"price": "0.52", "size": "50"}]}
+
+
+def test_get_decoder_prefers_fastest_and_rejects_unknown():
+    assert get_decoder("json") is json.loads
+    assert get_decoder() in DECODERS.values()
+    if "orjson" in DECODERS:
+        assert get_decoder() is not json.loads
+    with pytest.raises(ValueError):
+        get_decoder("simdjson-not-installed")
+
+
+@pytest.mark.parametrize("name", sorted(DECODERS))
+def test_event_decoder_builds_typed_events(name):
+    decode = EventDecoder(name)
+    frame = json.dumps([
+        BOOK,
+        {"event_type": "price_change", "market": "0xabc", "timestamp": "2",
+         "price_changes": [{"asset_id": "yes", "side": "BUY", "price": "0.49", "size": "10"}]},
+        {"event_type": "price_change", "asset_id": "no", "market": "0xabc",
+         "changes": [{"side": "SELL", "price": "0.51", "size": "0"}]},
+        {"event_type": "last_trade_price", "asset_id": "yes"},
+    ]).encode()
+
+    book, new_layout, old_layout, other = decode(frame)
+    assert isinstance(book, BookEvent) and book.bids == [{"price": "0.48", "size": "100"}]
+    assert isinstance(new_layout, PriceChangeEvent)
+    assert [(c.asset_id, c.side, c.price) for c in new_layout.changes] == [("yes", "BUY", "0.49")]
+    assert [(c.asset_id, c.side, c.size) for c in old_layout.changes] == [("no", "SELL", "0")]
+    assert other == {"event_type": "last_trade_price", "asset_id": "yes"}
+    assert decode(b"PONG") == []
+    assert EventDecoder(name, typed=False)(json.dumps(BOOK)) == [BOOK]
+
+
+def test_user_events_accept_both_field_layouts():
+    exchange = OrderEvent.from_dict({"event_type": "order", "type": "UPDATE", "id": "o1", "size_matched": "4"})
+    named = OrderEvent.from_dict({"event_type": "order", "action": "UPDATE", "order_id": "o1", "matched_amount": 4})
+    assert (exchange.order_id, exchange.action, exchange.matched_amount) == ("o1", "UPDATE", 4.0)
+    assert (named.order_id, named.action, named.matched_amount) == ("o1", "UPDATE", 4.0)
+
+    trade = TradeEvent.from_dict({"event_type": "trade", "taker_order_id": "t", "size": "5",
+                                  "maker_orders": [{"order_id": "m", "matched_amount": "2", "price": "0.5"}]})
+    assert trade.size == 5.0
+    assert [(m.order_id, m.matched_amount) for m in trade.maker_orders] == [("m", 2.0)]
+
+
+def test_order_books_apply_typed_and_raw_events_alike():
+    decode = EventDecoder()
+    change = {"event_type": "price_change", "market": "0xabc", "timestamp": "2",
+              "price_changes": [{"asset_id": "yes", "side": "SELL", "price": "0.51", "size": "7"}]}
+    typed, raw = OrderBooks(), OrderBooks()
+    for message in (BOOK, change):
+        for event in decode(json.dumps(message)):
+            assert typed.apply_event(event) == {"yes"}
+        assert raw.apply_event(message) == {"yes"}
+
+    assert typed["yes"].best_ask_price == raw["yes"].best_ask_price == 0.51
+    assert typed["yes"].snapshot() == raw["yes"].snapshot()
+
+
+def test_tracker_handles_decoded_order_updates():
+    class Executor:
+        pass
+
+    filled = []
+
+    async def on_fill(order):
+        filled.append(order.order_id)
+
+    tracker = OrderTracker(executor=Executor(), callback=on_fill)
+    decode = EventDecoder()
+
+    async def main():
+        await tracker.track_order("o1", "yes", "BUY", 5, 0.5)
+        await tracker.handle_ws_message(decode(json.dumps(
+            {"event_type": "order", "type": "UPDATE", "id": "o1", "size_matched": "2"})))
+        assert tracker.active_orders["o1"].filled_quantity == 2
+        await tracker.handle_ws_message(decode(json.dumps(
+            {"event_type": "order", "type": "UPDATE", "id": "o1", "size_matched": "5"})))
+
+    asyncio.run(main())
+    assert filled == ["o1"]
+    assert "o1" not in tracker.active_orders
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+import sys
+
+import websockets
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.core.polymarket_websocket_client as ws_module
+from src.core.ws_pool import HashRing, PolymarketWebSocketPool
+from src.core.ws_session import MARKET, WebSocketSession
+
+ASSETS = [f"asset-{i}" for i in range(40)]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+        self.frames = asyncio.Queue()
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+    async def ping(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self.frames.get()
+        if isinstance(frame, Exception):
+            raise frame
+        return frame
+
+
+def fake_connect(monkeypatch):
+    connections = []
+
+    async def connect(url):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(ws_module.websockets, "connect", connect)
+    return connections
+
+
+def subscribed(connection):
+    """Asset ids a connection is subscribed to after its messages so far."""
+    assets = []
+    for message in connection.sent:
+        if message.get("operation") == "unsubscribe":
+            assets = [a for a in assets if a not in message["assets_ids"]]
+        else:
+            assets += message["assets_ids"]
+    return assets
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_hash_ring_moves_only_the_new_nodes_share():
+    ring = HashRing(range(4))
+    keys = [f"token-{i}" for i in range(2000)]
+    before = {key: ring.node_for(key) for key in keys}
+    ring.add(4)
+    after = {key: ring.node_for(key) for key in keys}
+
+    moved = [key for key in keys if before[key] != after[key]]
+    assert all(after[key] == 4 for key in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.3
+    assert HashRing(range(4)).node_for("token-7") == before["token-7"]
+    ring.remove(4)
+    assert {key: ring.node_for(key) for key in keys} == before
+
+
+def test_pool_spreads_assets_and_merges_shard_streams(monkeypatch):
+    connections = fake_connect(monkeypatch)
+    received = []
+
+    async def handler(message):
+        received.extend(event["n"] for event in message)
+
+    pool = PolymarketWebSocketPool(shards=2, message_callback=handler, max_assets_per_shard=15, conflate=False)
+
+    async def main():
+        await pool.start(asset_ids=ASSETS[:20])
+        await settle()
+        # Over capacity: a third shard is added and takes over its share
+        await pool.add_subscriptions(assets_ids=ASSETS[20:40])
+        await settle()
+        for n, connection in enumerate(connections):
+            connection.frames.put_nowait(json.dumps([{"event_type": "last_trade_price", "n": n}]))
+        while len(received) < len(connections):
+            await asyncio.sleep(0.001)
+        stats = pool.stats()
+        shard_connections = {shard_id: client.connection for shard_id, client in pool.shards.items()}
+        await pool.stop()
+        return stats, shard_connections
+
+    stats, shard_connections = asyncio.run(main())
+    assert len(pool.shards) == len(connections) == 3
+    per_shard = {shard_id: subscribed(connection) for shard_id, connection in shard_connections.items()}
+    assert sorted(a for assets in per_shard.values() for a in assets) == sorted(ASSETS)
+    for shard_id, assets in per_shard.items():
+        assert assets and all(pool.shard_for(asset_id) == shard_id for asset_id in assets)
+    assert sorted(received) == [0, 1, 2]
+    assert sum(shard["assets"] for shard in stats["shards"].values()) == len(ASSETS)
+
+
+def test_moved_asset_ignores_its_old_shard(monkeypatch):
+    fake_connect(monkeypatch)
+    received = []
+
+    async def handler(message):
+        received.extend((event["asset_id"], event["n"]) for event in message)
+
+    pool = PolymarketWebSocketPool(shards=2, message_callback=handler, conflate=False)
+
+    async def main():
+        await pool.start(asset_ids=ASSETS)
+        await settle()
+        before = dict(pool.assignments)
+        await pool.add_shard()
+        await settle()
+        moved = next(a for a in ASSETS if pool.shard_for(a) == 2)
+        # A late update from the old shard, then one from the new shard
+        pool.shards[before[moved]].connection.frames.put_nowait(json.dumps([{"event_type": "last_trade_price",
+                                                             "asset_id": moved, "n": "old"}]))
+        await settle()
+        pool.shards[2].connection.frames.put_nowait(json.dumps([{"event_type": "last_trade_price",
+                                                                 "asset_id": moved, "n": "new"}]))
+        while not received:
+            await asyncio.sleep(0.001)
+        await settle()
+        stats = pool.stats()
+        await pool.stop()
+        return moved, stats
+
+    moved, stats = asyncio.run(main())
+    assert received == [(moved, "new")]
+    assert stats["stale"] == 1
+
+
+def test_shards_reconnect_independently(monkeypatch):
+    connections = fake_connect(monkeypatch)
+    pool = PolymarketWebSocketPool(shards=3)
+
+    async def main():
+        original_sleep = asyncio.sleep
+        await pool.start(asset_ids=ASSETS)
+        await settle()
+        dropped = pool.shards[1].connection
+        shard_assets = subscribed(dropped)
+        monkeypatch.setattr(ws_module.asyncio, "sleep", lambda delay: original_sleep(0))
+        dropped.frames.put_nowait(websockets.exceptions.ConnectionClosed(None, None))
+        while len(connections) < 4:
+            await original_sleep(0.001)
+        await settle()
+        await pool.stop()
+        return shard_assets
+
+    shard_assets = asyncio.run(main())
+    # Only the dropped shard reconnected, replaying just its own assets
+    assert len(connections) == 4
+    assert connections[3].sent == [{"type": "market", "assets_ids": shard_assets}]
+    assert [len(c.sent) for c in connections[:3]] == [1, 1, 1]
+
+
+def test_session_uses_a_pool_and_shrinks_it_when_assets_go(monkeypatch):
+    connections = fake_connect(monkeypatch)
+    session = WebSocketSession(market_shards=2)
+    pool = session.clients[MARKET]
+    pool.max_assets_per_shard = 10
+
+    async def main():
+        await session.subscribe(assets_ids=ASSETS)
+        await settle()
+        grown = len(pool.shards)
+        await session.unsubscribe(assets_ids=ASSETS[5:])
+        await settle()
+        await session.stop()
+        return grown
+
+    assert asyncio.run(main()) == 4
+    assert len(pool.shards) == 2
+    assert sorted(pool.assignments) == sorted(ASSETS[:5])
+    remaining = [a for shard_id in pool.shards for a in pool.assets_of(shard_id)]
+    assert sorted(remaining) == sorted(ASSETS[:5])
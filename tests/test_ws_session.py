@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+import sys
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.core.polymarket_websocket_client as ws_module
+from src.core.polymarket_websocket_client import PolymarketWebSocketClient
+from src.core.ws_session import MARKET, USER, WebSocketSession
+
+
+class FakeConnection:
+    def __init__(self, url):
+        self.url = url
+        self.sent = []
+        self.frames = asyncio.Queue()
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+    async def ping(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self.frames.get()
+        if isinstance(frame, Exception):
+            raise frame
+        return frame
+
+
+def fake_connect(monkeypatch):
+    connections = []
+
+    async def connect(url):
+        connections.append(FakeConnection(url))
+        return connections[-1]
+
+    monkeypatch.setattr(ws_module.websockets, "connect", connect)
+    return connections
+
+
+def test_subscriptions_change_without_reconnecting_and_replay_after_one(monkeypatch):
+    connections = fake_connect(monkeypatch)
+    client = PolymarketWebSocketClient()
+
+    async def main():
+        client.running = True
+        client.asset_ids = dict.fromkeys(["a"])
+        await client.connect("market")
+        await client.subscribe("market", assets_ids=list(client.asset_ids))
+        await client.add_subscriptions(assets_ids=["b", "c", "a"])
+        await client.remove_subscriptions(assets_ids=["a", "unknown"])
+        await client.connect("market")
+        await client.subscribe("market", assets_ids=list(client.asset_ids))
+
+    asyncio.run(main())
+    first, second = connections
+    assert first.sent == [
+        {"type": "market", "assets_ids": ["a"]},
+        {"operation": "subscribe", "assets_ids": ["b", "c"]},
+        {"operation": "unsubscribe", "assets_ids": ["a"]},
+    ]
+    assert list(client.asset_ids) == ["b", "c"]
+    assert second.sent == [{"type": "market", "assets_ids": ["b", "c"]}]
+
+
+def test_reconnect_replays_current_subscription(monkeypatch):
+    connections = fake_connect(monkeypatch)
+    client = PolymarketWebSocketClient(api_key="key", api_secret="secret", api_passphrase="pass")
+    client.running = True
+    client.markets = dict.fromkeys(["m1", "m2"])
+
+    async def main():
+        original_sleep = asyncio.sleep
+        monkeypatch.setattr(ws_module.asyncio, "sleep", lambda delay: original_sleep(0))
+        assert await client.reconnect("user")
+
+    asyncio.run(main())
+    assert connections[0].url.endswith("/ws/user")
+    assert connections[0].sent == [{"type": "user", "markets": ["m1", "m2"],
+                                    "auth": {"apiKey": "key", "secret": "secret", "passphrase": "pass"}}]
+
+
+def test_session_shares_channels_and_counts_references(monkeypatch):
+    connections = fake_connect(monkeypatch)
+    session = WebSocketSession()
+    received = {"streamer": [], "scanner": []}
+
+    async def streamer(message):
+        received["streamer"].append(message)
+
+    async def scanner(message):
+        received["scanner"].append(message)
+
+    async def main():
+        session.add_handler(MARKET, streamer)
+        session.add_handler(MARKET, scanner)
+        await session.subscribe(assets_ids=["yes", "no"])
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await session.subscribe(assets_ids=["no", "other"])
+        await session.unsubscribe(assets_ids=["no"])
+        await session.unsubscribe(assets_ids=["no", "yes"])
+        connections[0].frames.put_nowait(json.dumps({"event_type": "last_trade_price", "asset_id": "other"}))
+        while not received["scanner"]:
+            await asyncio.sleep(0.001)
+        subscriptions = session.subscriptions()
+        await session.stop()
+        return subscriptions
+
+    subscriptions = asyncio.run(main())
+    assert len(connections) == 1 and connections[0].url.endswith("/ws/market")
+    assert connections[0].sent == [
+        {"type": "market", "assets_ids": ["yes", "no"]},
+        {"operation": "subscribe", "assets_ids": ["other"]},
+        # "no" is released only when its second subscriber lets go
+        {"operation": "unsubscribe", "assets_ids": ["no", "yes"]},
+    ]
+    assert subscriptions == {USER: [], MARKET: ["other"]}
+    assert received["streamer"] == received["scanner"] == [[{"event_type": "last_trade_price",
+                                                            "asset_id": "other"}]]
+    assert not session.is_running(USER)
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import sys
+
+# Add the project root to Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.latency import LatencyRecorder
+from src.data_streamer.storage import NpyMarketDataWriter, read_csv
+from src.data_streamer.ws_streamer import WebSocketMarketDataStreamer
+
+TOKEN1_ID = "111"
+TOKEN2_ID = "222"
+
+
+def book_event(asset_id, bids, asks):
+    return {
+        "event_type": "book",
+        "asset_id": asset_id,
+        "market": "0xabc",
+        "bids": [{"price": p, "size": s} for p, s in bids],
+        "asks": [{"price": p, "size": s} for p, s in asks],
+    }
+
+
+class FakeWebSocketClient:
+    def __init__(self):
+        self.subscribed = None
+
+    async def start(self, channel_type, markets=None, asset_ids=None):
+        self.subscribed = (channel_type, asset_ids)
+
+    async def stop(self):
+        pass
+
+
+def make_streamer(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.chdir(tmp_path)
+    streamer = WebSocketMarketDataStreamer("test-market", TOKEN1_ID, TOKEN2_ID, **kwargs)
+    streamer.ws_client = FakeWebSocketClient()
+    return streamer
+
+
+def test_books_follow_snapshots_and_price_changes(tmp_path, monkeypatch):
+    streamer = make_streamer(tmp_path, monkeypatch)
+
+    async def scenario():
+        await streamer.handle_message([
+            book_event(TOKEN1_ID, [("0.5", "10"), ("0.52", "5")], [("0.55", "7"), ("0.54", "3")]),
+            book_event(TOKEN2_ID, [("0.45", "4")], [("0.48", "2")]),
+        ])
+        # legacy format: asset_id on the event
+        await streamer.handle_message([{
+            "event_type": "price_change", "asset_id": TOKEN1_ID,
+            "changes": [{"price": "0.53", "side": "BUY", "size": "1"}, {"price": "0.54", "side": "SELL", "size": "0"}],
+        }])
+        # current format: asset_id on every change
+        await streamer.handle_message({
+            "event_type": "price_change", "market": "0xabc",
+            "price_changes": [{"asset_id": TOKEN2_ID, "price": "0.46", "side": "SELL", "size": "9"}],
+        })
+
+    asyncio.run(scenario())
+    assert streamer.top_of_book(TOKEN1_ID) == [0.54, 0.53, 0.55, 0.02]
+    assert streamer.top_of_book(TOKEN2_ID) == [0.455, 0.45, 0.46, 0.01]
+
+    row = streamer.build_row()
+    assert row["token1_best_buy"] == 0.53
+    assert [level.price for level in row["token1_orderbook"].bids] == ["0.5", "0.52", "0.53"]
+    assert [level.price for level in row["token1_orderbook"].asks] == ["0.55"]
+
+
+def test_stream_writes_on_change(tmp_path, monkeypatch):
+    written = []
+    latency = LatencyRecorder()
+    streamer = make_streamer(tmp_path, monkeypatch, interval_seconds=30, min_emit_interval=0.001,
+                             on_write=lambda: written.append(True), latency=latency)
+
+    async def scenario():
+        task = asyncio.create_task(streamer.stream())
+        await asyncio.sleep(0.01)
+        await streamer.handle_message([
+            book_event(TOKEN1_ID, [("0.5", "10")], [("0.55", "7")]),
+            book_event(TOKEN2_ID, [("0.45", "4")], [("0.48", "2")]),
+        ])
+        for _ in range(100):
+            if written:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(scenario())
+    assert streamer.ws_client.subscribed == ("market", [TOKEN1_ID, TOKEN2_ID])
+    assert len(written) == 1
+    data = read_csv(streamer.filename)
+    assert data["token1_midpoint"].tolist() == [0.525]
+    assert data.book("token2", 0).ask_prices.tolist() == [0.48]
+
+    # The book change starts the tick, so the end-to-end spans get recorded
+    (tick, trace), = latency.traces.items()
+    assert trace["fetch_start"] == trace["fetched"] <= trace["written"]
+    latency.mark(tick, "signal")
+    assert "tick_to_signal" in latency.finish(tick)
+
+
+def test_on_write_waits_for_durable_rows(tmp_path, monkeypatch):
+    written = []
+    streamer = make_streamer(tmp_path, monkeypatch, on_write=lambda: written.append(True))
+    writer = NpyMarketDataWriter(str(tmp_path / "columnar"), chunk_rows=2, max_delay_seconds=3600)
+    asyncio.run(streamer.handle_message([
+        book_event(TOKEN1_ID, [("0.5", "10")], [("0.55", "7")]),
+        book_event(TOKEN2_ID, [("0.45", "4")], [("0.48", "2")]),
+    ]))
+    for _ in range(2):
+        assert written == []
+        row = streamer.build_row()
+        writer.append(row)
+        streamer._appended(writer, row["timestamp"])
+
+    assert written == [True] and writer.pending == 0
@@ -1,8 +1,12 @@
 # src/bot_runner.py
 import asyncio
-import csv
 import os
+import time
 from src.data_streamer.data_streamer import MarketDataStreamer
+from src.data_streamer.ws_streamer import WebSocketMarketDataStreamer
+from src.data_streamer.csv_tailer import CsvTailer
+from src.core.latency import LatencyRecorder
+from src.core.ws_session import WebSocketSession
 from src.strategy.trade_dips_strategy import TradeDipsStrategy
 from src.execution.order_executor import OrderExecutor
 from src.execution.order_tracker import OrderTracker, OrderStatus
@@ -14,6 +18,13 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()]
 )
 
+def _to_float(value) -> float:
+    """Row value as a float; an empty book side ("" in the CSV, None from the ws feed) reads as NaN."""
+    if value is None or value == "":
+        return float("nan")
+    return float(value)
+
+
 class TradingBot:
     def __init__(
         self,
@@ -25,10 +36,13 @@ class TradingBot:
         initial_cash: float = 2.0,
         buy_threshold: float = -0.04,
         sell_threshold: float = 0.04,
+        feed: str = "rest",
+        latency_export_seconds: int = 60,
         ws_url: str = "wss://ws-subscriptions-clob.polymarket.com/ws/",
         api_key: str = None,
         api_secret: str = None,
-        api_passphrase: str = None
+        api_passphrase: str = None,
+        executor: OrderExecutor = None
     ):
         self.market_slug = market_slug
         self.token1_id = token1_id
@@ -42,12 +56,40 @@ class TradingBot:
         self.api_secret = api_secret
         self.api_passphrase = api_passphrase
         
-        self.streamer = MarketDataStreamer(
-            slug=market_slug,
-            token1=token1_id,
-            token2=token2_id,
-            interval_seconds=interval_seconds
+        self.csv_file = os.path.join(os.getcwd(), market_slug, f"{market_slug}_combined.csv")
+        # Per-stage tick-to-trade timings, exported next to the market file
+        self.latency = LatencyRecorder()
+        self.latency_file = os.path.join(os.getcwd(), market_slug, f"{market_slug}_latency.json")
+        self.latency_export_seconds = latency_export_seconds
+        # Follows the streamer's CSV by byte offset; the streamer wakes it after each write
+        self.tailer = CsvTailer(self.csv_file)
+        # One user and one market channel connection shared by the streamer and the order tracker
+        self.ws_session = WebSocketSession(
+            api_key=api_key,
+            api_secret=api_secret,
+            api_passphrase=api_passphrase,
+            ws_url=ws_url
         )
+        # "rest" polls the CLOB every interval, "ws" follows the market channel and writes on every change
+        if feed == "ws":
+            self.streamer = WebSocketMarketDataStreamer(
+                slug=market_slug,
+                token1=token1_id,
+                token2=token2_id,
+                interval_seconds=interval_seconds,
+                on_write=self.tailer.notify,
+                latency=self.latency,
+                session=self.ws_session
+            )
+        else:
+            self.streamer = MarketDataStreamer(
+                slug=market_slug,
+                token1=token1_id,
+                token2=token2_id,
+                interval_seconds=interval_seconds,
+                on_write=self.tailer.notify,
+                latency=self.latency
+            )
         self.strategy = TradeDipsStrategy(
             token1_id=token1_id,
             token2_id=token2_id,
@@ -56,21 +98,17 @@ class TradingBot:
             initial_cash=initial_cash,
             max_trades=max_trades
         )
-        self.executor = OrderExecutor()
-        self.csv_file = os.path.join(os.getcwd(), market_slug, f"{market_slug}_combined.csv")
-        self.last_row_count = 0
+        self.strategy.attach_order_books(self.streamer.books)
+        # Signs the orders the strategy could send next in the background
+        self.executor = executor or OrderExecutor(presign_orders=True)
         self.open_trades = 0
         
-        # Use the proper OrderTracker with your existing PolymarketWebSocketClient
+        # Order updates arrive on the user channel of the shared WebSocket session
         self.order_tracker = OrderTracker(
             callback=self.handle_order_filled,
             executor=self.executor,
             status_check_interval=10,
-            cleanup_interval=300,
-            ws_url=ws_url,
-            api_key=api_key,
-            api_secret=api_secret,
-            api_passphrase=api_passphrase
+            session=self.ws_session
         )
 
     async def stream_data(self):
@@ -85,69 +123,93 @@ class TradingBot:
                 await asyncio.sleep(10)
                 continue
 
-            with open(self.csv_file, "r") as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-                new_rows = rows[self.last_row_count:]
-
-                if not new_rows:
-                    logging.info("No new rows to process")
-                    await asyncio.sleep(10)
-                    continue
-
-                logging.info(f"Processing {len(new_rows)} new rows")
-                for row in new_rows:
-                    try:
-                        cleaned_row = {
-                            "timestamp": row["timestamp"],
-                            self.token1_id: float(row["token1_midpoint"]),
-                            self.token2_id: float(row["token2_midpoint"])
-                        }
-                        logging.info(f"Processing row: {cleaned_row}")
-                        self.strategy.update_data(cleaned_row)
-
-                        signal = self.strategy.generate_signal()
-                        if signal:
-                            if signal["side"] == "BUY":
-                                if self.open_trades < self.max_trades and self.strategy.cash >= self.strategy.order_value:
-                                    response = self.executor.execute_signal(signal)
-                                    if response and response.get("status") == "live":
-                                        # Start tracking the order
-                                        await self.order_tracker.track_order(
-                                            order_id=response["orderId"],
-                                            token_id=signal["token_id"],
-                                            side=signal["side"],
-                                            quantity=signal["quantity"],
-                                            price=signal["price"],
-                                            timeout_minutes=45
-                                        )
-                                        self.open_trades += 1
-                                        logging.info(f"Limit order placed and tracking started: {signal}")
-                                    else:
-                                        logging.error(f"Limit order failed: {signal}, Response: {response}")
-                                else:
-                                    logging.info(f"Buy signal ignored: Max trades ({self.max_trades}) or insufficient cash ({self.strategy.cash})")
-                            elif signal["side"] == "SELL" and self.open_trades > 0:
-                                response = self.executor.execute_signal(signal)
-                                if response and response.get("status") == "live":
-                                    # Start tracking the sell order
-                                    await self.order_tracker.track_order(
-                                        order_id=response["orderId"],
-                                        token_id=signal["token_id"],
-                                        side=signal["side"],
-                                        quantity=signal["quantity"],
-                                        price=signal["price"],
-                                        timeout_minutes=45
-                                    )
-                                    logging.info(f"Sell limit order placed and tracking started: {signal}")
-                                else:
-                                    logging.error(f"Sell limit order failed: {signal}, Response: {response}")
-                    except Exception as e:
-                        logging.error(f"Error processing row {row}: {e}")
-
-                self.last_row_count = len(rows)
-
-            await asyncio.sleep(1)
+            new_rows = await self.tailer.wait_for_rows(timeout=10)
+            if not new_rows:
+                logging.info("No new rows to process")
+                continue
+            read_at = time.perf_counter_ns()
+            for row in new_rows:
+                self.latency.mark(row["timestamp"], "read", read_at)
+
+            logging.info(f"Processing {len(new_rows)} new rows")
+            for row in new_rows:
+                try:
+                    await self.process_row(row)
+                except Exception as e:
+                    logging.error(f"Error processing row {row}: {e}")
+
+    async def process_row(self, row: dict):
+        try:
+            await self._process_row(row)
+        finally:
+            self.latency.finish(row["timestamp"])
+
+    async def execute_signal(self, signal: dict, tick: str):
+        """Sends a signal to the executor, timing the call for the latency histograms."""
+        self.latency.mark(tick, "order_sent")
+        response = await self.executor.execute_signal(signal)
+        self.latency.mark(tick, "order_acked")
+        return response
+
+    async def _process_row(self, row: dict):
+        tick = row["timestamp"]
+        cleaned_row = {
+            "timestamp": row["timestamp"],
+            self.token1_id: _to_float(row["token1_midpoint"]),
+            self.token2_id: _to_float(row["token2_midpoint"]),
+            # Top of book in the "{token_id}_best_buy" / "_best_sell" layout the strategy reads
+            f"{self.token1_id}_best_buy": _to_float(row["token1_best_buy"]),
+            f"{self.token1_id}_best_sell": _to_float(row["token1_best_sell"]),
+            f"{self.token2_id}_best_buy": _to_float(row["token2_best_buy"]),
+            f"{self.token2_id}_best_sell": _to_float(row["token2_best_sell"]),
+        }
+        logging.info(f"Processing row: {cleaned_row}")
+        self.strategy.update_data(cleaned_row)
+        # Candidates from the state the signal is generated from: generate_signal takes
+        # the position it sells out of the strategy, which would void its signed order
+        self.update_presigned()
+
+        signal = self.strategy.generate_signal()
+        self.latency.mark(tick, "signal")
+        if signal:
+            if signal["side"] == "BUY":
+                if self.open_trades < self.max_trades and self.strategy.cash >= self.strategy.order_value:
+                    response = await self.execute_signal(signal, tick)
+                    if response and response.get("status") == "live":
+                        # Start tracking the order
+                        await self.order_tracker.track_order(
+                            order_id=response["orderId"],
+                            token_id=signal["token_id"],
+                            side=signal["side"],
+                            quantity=signal["quantity"],
+                            price=signal["price"],
+                            timeout_minutes=45
+                        )
+                        self.latency.mark(tick, "tracked")
+                        self.open_trades += 1
+                        logging.info(f"Limit order placed and tracking started: {signal}")
+                    else:
+                        logging.error(f"Limit order failed: {signal}, Response: {response}")
+                else:
+                    logging.info(f"Buy signal ignored: Max trades ({self.max_trades}) or insufficient cash ({self.strategy.cash})")
+            elif signal["side"] == "SELL" and self.open_trades > 0:
+                response = await self.execute_signal(signal, tick)
+                if response and response.get("status") == "live":
+                    # Start tracking the sell order
+                    await self.order_tracker.track_order(
+                        order_id=response["orderId"],
+                        token_id=signal["token_id"],
+                        side=signal["side"],
+                        quantity=signal["quantity"],
+                        price=signal["price"],
+                        timeout_minutes=45
+                    )
+                    self.latency.mark(tick, "tracked")
+                    logging.info(f"Sell limit order placed and tracking started: {signal}")
+                else:
+                    logging.error(f"Sell limit order failed: {signal}, Response: {response}")
+            # The signal changed cash and positions: sign the orders that can come next
+            self.update_presigned()
 
     async def handle_order_filled(self, order: OrderStatus):
         """Handle completed order callback from OrderTracker."""
@@ -161,17 +223,28 @@ class TradingBot:
         else:  # SELL
             self.open_trades -= 1
             logging.info(f"Sell order filled: {order.filled_quantity} shares at {order.price}")
+        # Cash and positions changed, so do the order sizes worth pre-signing
+        self.update_presigned()
+
+    def update_presigned(self):
+        """Points the executor's pre-signing cache, if it has one, at the strategy's next orders."""
+        if self.executor.presigned is not None:
+            self.executor.presigned.set_candidates(self.strategy.candidate_orders())
 
     async def run(self):
         """Run the trading bot with order tracking."""
-        await asyncio.gather(
+        tasks = [
             self.stream_data(),
             self.process_csv(),
-            self.order_tracker.start()
-        )
+            self.order_tracker.start(),
+            self.latency.export_periodically(self.latency_file, self.latency_export_seconds),
+        ]
+        if self.executor.presigned is not None:
+            tasks.append(self.executor.presigned.run())
+        await asyncio.gather(*tasks)
 
     async def place_order(self, signal: dict):
-        response = self.executor.execute_signal(signal)
+        response = await self.executor.execute_signal(signal)
         if response and response.get("status") == "live":
             await self.order_tracker.track_order(
                 order_id=response["orderId"],